@@ -1,14 +1,20 @@
-import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 
-from ...deps import get_ai_client
+from ...config import Settings
+from ...deps import get_ai_client, get_reports_store, get_settings_dep
 from ...models.ai import (
+    BatchOpenReportRequest,
+    BatchStatus,
     OpenReportRequest,
     OpenReportResponse,
     SearchForReportRequest,
     SearchForReportResponse,
 )
 from ...services.ai_client import AiClient
+from ...services.batch_runner import expand_batch_items, get_batch_runner
+from ...services.reports_store import ReportsStore
+from ...services.timing import TimingTrace
+from ..errors import ai_service_error
 
 
 router = APIRouter()
@@ -21,12 +27,19 @@ router = APIRouter()
 )
 async def search_for_report(
     body: SearchForReportRequest,
+    response: Response,
     client: AiClient = Depends(get_ai_client),
 ) -> SearchForReportResponse:
+    trace = TimingTrace()
     try:
-        data = await client.search_for_report(body)
+        data = await client.search_for_report(body, trace=trace)
     except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+        raise HTTPException(
+            status_code=500,
+            detail=str(exc),
+            headers={"Server-Timing": trace.server_timing_header()},
+        ) from exc
+    response.headers["Server-Timing"] = trace.server_timing_header()
     return SearchForReportResponse(**data)
 
 
@@ -37,16 +50,58 @@ async def search_for_report(
 )
 async def generate_open_report(
     body: OpenReportRequest,
+    response: Response,
+    debug: bool = False,
     client: AiClient = Depends(get_ai_client),
 ) -> OpenReportResponse:
+    trace = TimingTrace()
     try:
-        content = await client.generate_open_report(body)
-    except (httpx.ConnectError, httpx.ConnectTimeout) as exc:
-        raise HTTPException(
-            status_code=503,
-            detail="无法连接到 AI 服务，请检查网络连接或代理设置（如设置了 HTTP_PROXY/HTTPS_PROXY）。",
-        ) from exc
+        content = await client.generate_open_report(body, trace=trace)
     except Exception as exc:  # noqa: BLE001
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-    return OpenReportResponse(content=content)
+        raise ai_service_error(exc, trace) from exc
+    response.headers["Server-Timing"] = trace.server_timing_header()
+    return OpenReportResponse(
+        content=content,
+        debug={"timing": trace.as_dict()} if debug else None,
+    )
 
+
+@router.post(
+    "/batch-open-report",
+    response_model=BatchStatus,
+    status_code=202,
+    summary="Generate many open reports in the background and save them as reports",
+)
+async def submit_batch_open_report(
+    body: BatchOpenReportRequest,
+    settings: Settings = Depends(get_settings_dep),
+    store: ReportsStore = Depends(get_reports_store),
+) -> BatchStatus:
+    requests = expand_batch_items(body)
+    if not requests:
+        raise HTTPException(status_code=400, detail="批量任务为空：请提供 items，或 template + variables。")
+    return get_batch_runner().submit(requests, settings, store, concurrency=body.concurrency)
+
+
+@router.get(
+    "/batch-open-report/{batch_id}",
+    response_model=BatchStatus,
+    summary="Get progress of a batch generation",
+)
+async def get_batch_open_report(batch_id: str) -> BatchStatus:
+    status = get_batch_runner().get(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status
+
+
+@router.delete(
+    "/batch-open-report/{batch_id}",
+    response_model=BatchStatus,
+    summary="Cancel the unfinished items of a batch generation",
+)
+async def cancel_batch_open_report(batch_id: str) -> BatchStatus:
+    status = await get_batch_runner().cancel(batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status
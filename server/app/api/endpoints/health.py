@@ -1,5 +1,12 @@
 from fastapi import APIRouter
 
+from ...services.hedging import get_hedge_policy
+from ...services.markdown_render import get_render_cache
+from ...services.prompt_layout import get_prompt_cache_stats
+from ...services.report_export import get_export_service
+from ...services.upstream_pool import get_upstream_pool
+from ...services.warmup import get_startup_stats
+
 
 router = APIRouter()
 
@@ -9,3 +16,15 @@ async def api_health() -> dict:
     """Health check under /api/health."""
     return {"status": "ok"}
 
+
+@router.get("/metrics")
+async def api_metrics() -> dict:
+    """Runtime metrics: upstream backends, hedging, prompt cache, startup, render and export caches."""
+    return {
+        "upstream_pool": get_upstream_pool().snapshot(),
+        "hedging": get_hedge_policy().snapshot(),
+        "prompt_cache": get_prompt_cache_stats().snapshot(),
+        "startup": get_startup_stats().snapshot(),
+        "markdown_render": get_render_cache().snapshot(),
+        "export": get_export_service().snapshot(),
+    }
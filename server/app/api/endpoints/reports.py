@@ -1,14 +1,34 @@
+import re
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
 
-from ...deps import get_reports_store
-from ...models.reports import Report, ReportCreate, ReportUpdate
+from ...deps import get_ai_client, get_reports_store
+from ...models.ai import RegenerateSectionRequest
+from ...models.reports import (
+    RenderedBlock,
+    RenderedReport,
+    RenderMarkdownRequest,
+    Report,
+    ReportCreate,
+    ReportUpdate,
+)
+from ...services.ai_client import AiClient
+from ...services.markdown_render import RenderedDocument, get_render_cache, omit_known
+from ...services.markdown_sections import build_outline, find_section, section_text, splice_section
+from ...services.report_export import EXPORT_FORMATS, ExportUnavailableError, get_export_service
 from ...services.reports_store import ReportsStore
+from ...services.timing import TimingTrace
+from ..errors import ai_service_error
 
 
 router = APIRouter()
 
+# 导出文件名中不允许出现的字符（Windows 文件名规则）
+_UNSAFE_FILENAME = re.compile(r'[\\/:*?"<>|]+')
+
 
 @router.get("", response_model=List[Report], summary="List all reports")
 def list_reports(store: ReportsStore = Depends(get_reports_store)) -> list[Report]:
@@ -43,6 +63,7 @@ def update_report(
     report = store.update_report(report_id, body)
     if report is None:
         raise HTTPException(status_code=404, detail="Report not found")
+    get_render_cache().invalidate(report_id)
     return report
 
 
@@ -54,5 +75,129 @@ def delete_report(
     deleted = store.delete_report(report_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Report not found")
+    get_render_cache().invalidate(report_id)
     return Response(status_code=204)
 
+
+def _rendered_response(
+    document: RenderedDocument, report_id: str | None, partial: bool, known: List[str]
+) -> RenderedReport:
+    # 整篇模式下 html 已包含全部块，块列表只给出标题与哈希
+    omitted = known if partial else [block.hash for block in document.blocks]
+    blocks = omit_known(document.blocks, omitted)
+    return RenderedReport(
+        report_id=report_id,
+        content_hash=document.content_hash,
+        html=None if partial else document.html,
+        blocks=[RenderedBlock(**block) for block in blocks],
+    )
+
+
+@router.post("/render", response_model=RenderedReport, summary="Render markdown to sanitized HTML blocks")
+def render_markdown_blocks(body: RenderMarkdownRequest) -> RenderedReport:
+    """编辑中（未保存）内容的增量预览：只返回客户端尚未持有（按哈希）的块的 HTML。"""
+    document = get_render_cache().render(body.content)
+    return _rendered_response(document, None, partial=True, known=body.known)
+
+
+@router.get(
+    "/{report_id}/html",
+    response_model=RenderedReport,
+    summary="Get a report rendered to sanitized HTML (cached)",
+)
+def get_report_html(
+    report_id: str,
+    request: Request,
+    response: Response,
+    partial: bool = False,
+    known: List[str] = Query(default=[]),
+    store: ReportsStore = Depends(get_reports_store),
+) -> RenderedReport | Response:
+    """整篇或按块返回渲染结果；整篇时 ETag 为内容哈希，内容未变时返回 304。
+
+    按块返回的内容取决于 known，同一内容哈希对应不同的响应体，因此不带 ETag。
+    """
+    report = store.get_report(report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    document = get_render_cache().render(report.content, report_id=report_id)
+    if partial:
+        return _rendered_response(document, report_id, partial, known)
+    etag = f'"{document.content_hash}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return _rendered_response(document, report_id, partial, known)
+
+
+@router.get("/{report_id}/export", summary="Export a report as DOCX or PDF (cached by content)")
+async def export_report(
+    report_id: str,
+    format: str = Query(default="docx", pattern="^(docx|pdf)$"),
+    store: ReportsStore = Depends(get_reports_store),
+) -> FileResponse:
+    report = store.get_report(report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    service = get_export_service()
+    try:
+        path = await service.export(report.title, report.content, format)
+    except ExportUnavailableError as exc:
+        raise HTTPException(status_code=501, detail=str(exc)) from exc
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=500, detail=f"导出失败: {exc}") from exc
+    # 文件发送完毕后才允许缓存淘汰它
+    return FileResponse(
+        path,
+        media_type=EXPORT_FORMATS[format],
+        filename=f"{_UNSAFE_FILENAME.sub('_', report.title or report_id)}.{format}",
+        background=BackgroundTask(service.release, path),
+    )
+
+
+@router.post(
+    "/{report_id}/regenerate-section",
+    response_model=Report,
+    summary="Regenerate one section of a report with AI and save it",
+)
+async def regenerate_section(
+    report_id: str,
+    body: RegenerateSectionRequest,
+    response: Response,
+    store: ReportsStore = Depends(get_reports_store),
+    client: AiClient = Depends(get_ai_client),
+) -> Report:
+    report = store.get_report(report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    section = find_section(report.content, body.heading_path)
+    if section is None:
+        raise HTTPException(status_code=404, detail="Section not found")
+
+    trace = TimingTrace()
+    try:
+        new_section = await client.regenerate_section(
+            report.title,
+            build_outline(report.content, highlight=section),
+            section_text(report.content, section),
+            body,
+            trace=trace,
+        )
+    except Exception as exc:  # noqa: BLE001
+        raise ai_service_error(exc, trace) from exc
+
+    # 生成期间报告可能已被修改：基于最新内容重新定位后再拼接
+    latest = store.get_report(report_id)
+    if latest is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    section = find_section(latest.content, body.heading_path)
+    if section is None:
+        raise HTTPException(status_code=409, detail="Section changed during regeneration")
+    updated = store.update_report(
+        report_id, ReportUpdate(content=splice_section(latest.content, section, new_section))
+    )
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    get_render_cache().invalidate(report_id)
+    response.headers["Server-Timing"] = trace.server_timing_header()
+    return updated
@@ -0,0 +1,29 @@
+import httpx
+from fastapi import HTTPException
+
+from ..services.timing import TimingTrace
+
+
+def ai_service_error(exc: Exception, trace: TimingTrace) -> HTTPException:
+    """把调用 AI 服务时的异常映射为 HTTP 错误，并附带 Server-Timing。
+
+    - 连接失败：503；
+    - 上游限流且重试后仍未恢复：透传 429 与 Retry-After，而不是笼统的 500；
+    - 其他：500。
+    """
+    headers = {"Server-Timing": trace.server_timing_header()}
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return HTTPException(
+            status_code=503,
+            detail="无法连接到 AI 服务，请检查网络连接或代理设置（如设置了 HTTP_PROXY/HTTPS_PROXY）。",
+            headers=headers,
+        )
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+        if exc.response.headers.get("Retry-After"):
+            headers["Retry-After"] = exc.response.headers["Retry-After"]
+        return HTTPException(
+            status_code=429,
+            detail="AI 服务当前请求过多，请稍后重试。",
+            headers=headers,
+        )
+    return HTTPException(status_code=500, detail=str(exc), headers=headers)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
+import json
 import os
 from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, List
 
 from dotenv import load_dotenv
 from pydantic import BaseModel
@@ -25,6 +27,62 @@ class Settings(BaseModel):
     ai_api_key: str | None = os.getenv("YEYSAI_API_KEY")
     ai_model: str = os.getenv("YEYSAI_MODEL", "gpt-4o-mini")
 
+    # 可选：多个 OpenAI 兼容后端（JSON 列表），配置后按 EWMA 延迟路由并自动故障转移，
+    # 未配置的字段回落到上面的单后端配置（api_key 只对 base_url 与 YEYSAI_BASE_URL 相同的后端回落），
+    # name 不能重复。例如：
+    #   YEYSAI_ENDPOINTS=[{"name":"vllm-1","base_url":"http://10.0.0.5:8000/v1","model":"qwen2.5-72b","weight":2},
+    #                     {"name":"yeysai","base_url":"https://yeysai.com/v1","api_key":"sk-xxx"}]
+    ai_endpoints: List[Dict[str, Any]] = json.loads(os.getenv("YEYSAI_ENDPOINTS") or "[]")
+
+    # 上游调用的自适应并发控制（AIMD）与重试
+    #   YEYSAI_INITIAL_CONCURRENCY: 启动时的并发上限
+    #   YEYSAI_MAX_CONCURRENCY:     并发上限的增长天花板
+    #   YEYSAI_MAX_RETRIES:         429/5xx/连接失败时的最大重试次数
+    ai_initial_concurrency: int = int(os.getenv("YEYSAI_INITIAL_CONCURRENCY", "4"))
+    ai_max_concurrency: int = int(os.getenv("YEYSAI_MAX_CONCURRENCY", "16"))
+    ai_max_retries: int = int(os.getenv("YEYSAI_MAX_RETRIES", "3"))
+
+    # 对冲请求（降低长尾延迟）：主请求超过历史第 P 百分位延迟仍未返回时补发一个备份请求，
+    # 先返回者胜出、另一个被取消；YEYSAI_HEDGE_BUDGET 为额外负载上限（0.1 即 10%）
+    ai_hedge_enabled: bool = os.getenv("YEYSAI_HEDGE_ENABLED", "").lower() in {"1", "true", "yes"}
+    ai_hedge_percentile: float = float(os.getenv("YEYSAI_HEDGE_PERCENTILE", "95"))
+    ai_hedge_budget: float = float(os.getenv("YEYSAI_HEDGE_BUDGET", "0.1"))
+
+    # 投机并行：开启联网检索时，普通生成与“检索 + 检索版生成”同时启动；
+    # 检索版在截止时间（秒）内完成则采用检索版，否则采用已在运行的普通生成结果
+    ai_speculative_enabled: bool = os.getenv("YEYSAI_SPECULATIVE_ENABLED", "").lower() in {"1", "true", "yes"}
+    ai_speculative_deadline: float = float(os.getenv("YEYSAI_SPECULATIVE_DEADLINE", "45"))
+
+    # 可选：HTTP 搜索接口地址（提供 GET /search?q=...），未配置时使用 DuckDuckGo。
+    # 离线压测时指向 tools/fake_upstream.py 的本地替身服务
+    search_api_url: str | None = os.getenv("DQ_REPORT_SEARCH_API_URL")
+
+    # 测井报告井数据来源（二选一，均未配置时不获取井数据）：
+    #   DQ_REPORT_WELL_API_URL:  专业软件井数据接口地址（提供 /api/well/{well_id}/... ）
+    #   DQ_REPORT_WELL_DATA_DIR: 本地替身目录，文件为 {well_id}/{接口名}.json
+    #   DQ_REPORT_WELL_DATA_TTL: 井数据缓存时长（秒）
+    well_api_base_url: str | None = os.getenv("DQ_REPORT_WELL_API_URL")
+    well_data_dir: Path | None = (
+        Path(os.environ["DQ_REPORT_WELL_DATA_DIR"]) if os.getenv("DQ_REPORT_WELL_DATA_DIR") else None
+    )
+    well_data_ttl: float = float(os.getenv("DQ_REPORT_WELL_DATA_TTL", "600"))
+
+    # 报告导出（DOCX/PDF）：
+    #   DQ_REPORT_EXPORT_WORKERS:  同时进行的转换数（PDF 每个转换启动一个 soffice 进程）
+    #   DQ_REPORT_EXPORT_TIMEOUT:  单次 soffice 转换超时（秒）
+    #   DQ_REPORT_EXPORT_CACHE_MB: 导出产物磁盘缓存上限
+    #   DQ_REPORT_OFFICE_SCRIPTS_DIR: skills 中的 office 脚本目录（复用 soffice.py 的沙箱环境配置）
+    export_workers: int = int(os.getenv("DQ_REPORT_EXPORT_WORKERS", "2"))
+    export_timeout: float = float(os.getenv("DQ_REPORT_EXPORT_TIMEOUT", "120"))
+    export_cache_mb: int = int(os.getenv("DQ_REPORT_EXPORT_CACHE_MB", "512"))
+    office_scripts_dir: Path | None = Path(
+        os.getenv("DQ_REPORT_OFFICE_SCRIPTS_DIR")
+        or (Path(__file__).resolve().parents[2] / "skills-main" / "skills" / "docx" / "scripts" / "office")
+    )
+
+    # 启动后在后台预热：导入文件解析库、初始化搜索会话、与上游后端建立连接（设为 0 关闭）
+    warmup_enabled: bool = os.getenv("DQ_REPORT_WARMUP", "1").lower() in {"1", "true", "yes"}
+
     # Data directory for JSON storage and uploaded files
     data_dir: Path = Path(
         os.getenv("DQ_REPORT_DATA_DIR")
@@ -1,4 +1,4 @@
-from fastapi import Depends
+from fastapi import Depends, Request
 
 from .config import Settings, get_settings
 from .services.ai_client import AiClient
@@ -11,10 +11,17 @@ def get_settings_dep() -> Settings:
 
 
 def get_ai_client(
+    request: Request,
     settings: Settings = Depends(get_settings_dep),
 ) -> AiClient:
-    """Provide a configured AI client."""
-    return AiClient(settings=settings)
+    """Provide a configured AI client.
+
+    上游限流按用户公平排队：优先使用 X-User-Id 请求头，否则使用客户端 IP。
+    """
+    user_key = request.headers.get("X-User-Id") or (
+        request.client.host if request.client else "anonymous"
+    )
+    return AiClient(settings=settings, user_key=user_key)
 
 
 def get_reports_store(
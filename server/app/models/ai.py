@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class Material(BaseModel):
@@ -46,6 +47,8 @@ class OpenReportResponse(BaseModel):
     """Simplified AI response body."""
 
     content: str
+    # 仅在请求带 ?debug=true 时返回：分阶段耗时等调试信息
+    debug: Optional[Dict[str, Any]] = None
 
 
 class SearchForReportRequest(BaseModel):
@@ -65,3 +68,51 @@ class SearchForReportResponse(BaseModel):
     query: str
     results: List[SearchResultItem]
 
+
+class BatchOpenReportRequest(BaseModel):
+    """批量生成请求：直接给出多个 OpenReportRequest，或给出模板 + 每口井的变量。
+
+    模板中的 ``{变量名}`` 占位符（title / outline / draft / user_config 中的字符串）
+    会被 variables 中对应的值替换，未提供的占位符保持原样。
+    """
+
+    items: List[OpenReportRequest] = []
+    template: Optional[OpenReportRequest] = None
+    variables: List[Dict[str, str]] = []
+    # 可选：本批次的最大并发数，缺省且最多为上游后端池的并发上限
+    concurrency: Optional[int] = Field(default=None, ge=1, le=256)
+
+
+class BatchItemStatus(BaseModel):
+    """批量任务中单个报告的进度。"""
+
+    index: int
+    title: Optional[str] = None
+    status: str = "pending"  # pending / running / succeeded / failed
+    report_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchStatus(BaseModel):
+    """批量任务整体进度。"""
+
+    batch_id: str
+    status: str  # running / completed
+    total: int
+    pending: int
+    running: int
+    succeeded: int
+    failed: int
+    create_time: datetime
+    update_time: datetime
+    items: List[BatchItemStatus]
+
+
+class RegenerateSectionRequest(BaseModel):
+    """对已保存报告的单个小节重新生成，其余部分保持不变。"""
+
+    # 标题路径，例如 ["五、解释成果及分析", "5.1 储层识别"]；可省略中间层级
+    heading_path: List[str]
+    instruction: Optional[str] = None
+    materials: List[Material] = []
+    user_config: Optional[Dict[str, Any]] = None
@@ -36,3 +36,27 @@ class Report(ReportBase):
     create_time: datetime
     update_time: datetime
 
+
+class RenderMarkdownRequest(BaseModel):
+    """Render arbitrary (e.g. unsaved) markdown for preview."""
+
+    content: str
+    known: List[str] = Field(default=[], description="Block hashes the client already has")
+
+
+class RenderedBlock(BaseModel):
+    """One top-level block (split at #/## headings) of a rendered report."""
+
+    title: str
+    level: int
+    hash: str
+    html: Optional[str] = None
+
+
+class RenderedReport(BaseModel):
+    """Sanitized HTML of a report; in partial mode only changed blocks carry html."""
+
+    report_id: Optional[str] = None
+    content_hash: str
+    html: Optional[str] = None
+    blocks: List[RenderedBlock] = []
@@ -1,14 +1,128 @@
 from __future__ import annotations
 
+import asyncio
+import random
+import time
 import traceback
-from textwrap import dedent
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Tuple, TypeVar
 
 import httpx
 
 from ..config import Settings
-from ..models.ai import OpenReportRequest, PrefetchedSearch, SearchForReportRequest, SearchResultItem
+from ..models.ai import (
+    Material,
+    OpenReportRequest,
+    PrefetchedSearch,
+    RegenerateSectionRequest,
+    SearchForReportRequest,
+    SearchResultItem,
+)
+from .concurrency import parse_retry_after
+from .hedging import HedgePolicy, get_hedge_policy
+from .markdown_sections import parse_heading
+from .prompt_layout import (
+    TIER_CONTEXT,
+    TIER_MATERIALS,
+    TIER_PREFERENCES,
+    TIER_REQUEST,
+    PromptLayout,
+    extract_usage,
+    get_prompt_cache_stats,
+    stable_json,
+    static_block,
+)
 from .search_client import SearchClient, SearchResult
+from .timing import TimingTrace
+from .upstream_pool import UpstreamEndpoint, UpstreamPool, get_upstream_pool
+from .well_report import ChapterParallelGenerator, is_chapter_parallel_request
+
+# 上游过载信号：触发并发上限收缩
+_OVERLOAD_STATUS = {429, 503}
+# 可安全重试的状态码（chat/completions 无副作用，重试是幂等的）
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+# Retry-After 超过该值时不再原地等待，直接把 429 交给调用方
+_MAX_RETRY_AFTER = 30.0
+
+T = TypeVar("T")
+
+# 系统提示词在模块加载时规范化一次，所有请求共享逐字节相同的前缀（利于上游前缀缓存）
+_SIMPLE_SYSTEM_PROMPT = static_block(
+    """
+    你是一名专业的技术报告与工作报告写作助手，擅长根据给定材料与草稿，
+    用规范、清晰、结构化的 Markdown 格式生成或润色“开放报告”类文档。
+
+    要求：
+    - 内容逻辑清晰、结构完整，标题层级合理（使用 #, ##, ### 等）
+    - 语言正式、专业，但尽量通俗易懂
+    - 尽量保留用户草稿中的关键信息与专业术语
+    - 如有表格类结构，可使用 Markdown 表格语法
+    """
+)
+
+_RESEARCH_SYSTEM_PROMPT = static_block(
+    """
+    你是一名专业的技术报告与工作报告写作助手，
+    现在需要在综合“用户提供的材料”和“互联网检索结果”的基础上，
+    生成一篇结构化的“开放报告”（Markdown 格式）。
+
+    要求：
+    - 报告结构完整，标题层级清晰（使用 #, ##, ### 等）
+    - 语言正式、专业，但尽量通俗易懂
+    - 明确区分“用户提供的材料信息”和“从外部检索获得的补充信息”
+    - 当某个结论明显来自检索结果时，可以在句末用 [参考] 标注
+    - 如有需要，可在文末添加“参考资料”小节，列出主要外部信息来源的标题或简要描述
+    """
+)
+
+_SECTION_SYSTEM_PROMPT = static_block(
+    """
+    你是一名专业的技术报告写作助手，现在只需要修订报告中的一个小节。
+
+    要求：
+    - 只输出修订后的本节 Markdown，第一行保留本节原标题（标题级别不变）
+    - 本节内的下级标题层级保持合理，不要输出报告的其他小节
+    - 内容与报告整体大纲保持衔接，避免与其他小节重复
+    - 语言正式、专业，但尽量通俗易懂
+    """
+)
+
+
+def _materials_block(header: str, materials: List[Material], limit: int) -> str:
+    if not materials:
+        return ""
+    parts = [header]
+    for idx, m in enumerate(materials, start=1):
+        snippet = (m.summary or m.text[:limit]).strip()
+        parts.append(f"[材料 {idx} - {m.name or m.file_id}]\n{snippet}")
+    return "\n\n".join(parts)
+
+
+def _preferences_block(header: str, user_config: Dict[str, Any]) -> str:
+    return f"{header}\n{stable_json(user_config)}"
+
+
+async def _first_success(tasks: Iterable["asyncio.Task[T]"]) -> Tuple["asyncio.Task[T]", T]:
+    """等待第一个成功完成的任务；全部失败时抛出最先出现的异常。"""
+    pending = set(tasks)
+    error: BaseException | None = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is None:
+                return task, task.result()
+            error = error or exc
+    assert error is not None
+    raise error
+
+
+async def _cancel_pending(tasks: Iterable["asyncio.Task[Any]"]) -> None:
+    """取消仍在运行的任务（例如并行竞速中的落败者），并等待其清理完毕。"""
+    losers = [task for task in tasks if not task.done()]
+    for task in losers:
+        task.cancel()
+    if losers:
+        await asyncio.gather(*losers, return_exceptions=True)
 
 
 class AiClient:
@@ -21,29 +135,48 @@ class AiClient:
       3) 调用模型综合搜索结果和原始材料生成报告。
     """
 
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        user_key: str = "default",
+        pool: UpstreamPool | None = None,
+        hedge_policy: HedgePolicy | None = None,
+    ) -> None:
         self._settings = settings
-        self._search_client = SearchClient()
-
-    async def generate_open_report(self, payload: OpenReportRequest) -> str:
+        self._search_client = SearchClient(settings.search_api_url)
+        # user_key 用于限流排队时的按用户公平调度
+        self._user_key = user_key
+        self._pool = pool or get_upstream_pool()
+        self._hedge_policy = hedge_policy or get_hedge_policy()
+
+    async def generate_open_report(
+        self, payload: OpenReportRequest, trace: TimingTrace | None = None
+    ) -> str:
         """根据配置选择普通模式或深度检索模式.
 
         - 若 payload.search_results 非空：直接使用预取的检索结果，跳过搜索
         - 若 web_search_enabled 且无 search_results：执行搜索后生成
+          （开启 ai_speculative_enabled 时与普通生成并行，见 _generate_speculative）
+        - 测井解释报告且 user_config.chapter_parallel 为真：按章节并行生成
         - 异常时回退到普通模式
+        - 传入 trace 时记录各阶段耗时（search / prompt / upstream_ttfb / upstream / parse）
         """
+        trace = trace or TimingTrace()
+        if is_chapter_parallel_request(payload):
+            return await ChapterParallelGenerator(self).generate(payload, trace)
+
         prefetched = payload.search_results
         use_prefetched = prefetched is not None
 
         if use_prefetched:
             if len(prefetched.results or []) > 0:
                 try:
-                    return await self._generate_with_prefetched_research(payload)
+                    return await self._generate_with_prefetched_research(payload, trace)
                 except Exception as exc:  # noqa: BLE001
                     print("prefetched_research failed, fallback to simple:", type(exc).__name__, repr(exc))
                     traceback.print_exc()
-                    return await self._generate_simple(payload)
-            return await self._generate_simple(payload)
+                    return await self._generate_simple(payload, trace)
+            return await self._generate_simple(payload, trace)
 
         use_deep_research = bool(
             payload.user_config
@@ -51,16 +184,21 @@ class AiClient:
             and payload.user_config.get("web_search_enabled")
         )
         if use_deep_research:
+            if self._settings.ai_speculative_enabled:
+                return await self._generate_speculative(payload, trace)
             try:
-                return await self._generate_with_research(payload)
+                return await self._generate_with_research(payload, trace)
             except Exception as exc:  # noqa: BLE001
                 print("deep_research failed, fallback to simple:", type(exc).__name__, repr(exc))
                 traceback.print_exc()
-                return await self._generate_simple(payload)
-        return await self._generate_simple(payload)
+                return await self._generate_simple(payload, trace)
+        return await self._generate_simple(payload, trace)
 
-    async def search_for_report(self, payload: SearchForReportRequest) -> dict:
+    async def search_for_report(
+        self, payload: SearchForReportRequest, trace: TimingTrace | None = None
+    ) -> dict:
         """仅执行检索，返回 query 与 results，供前端展示并确认。"""
+        trace = trace or TimingTrace()
         req = OpenReportRequest(
             task_type=payload.task_type,
             title=payload.title,
@@ -72,7 +210,8 @@ class AiClient:
         query = self._build_simple_query(req)
         print(f"[search-for-report] query={query!r}")
 
-        results = await self._search_client.search(query, max_results=5)
+        with trace.measure("search"):
+            results = await self._search_client.search(query, max_results=5)
         print(f"[search-for-report] results count={len(results)}")
 
         items = [
@@ -81,59 +220,114 @@ class AiClient:
         ]
         return {"query": query, "results": items}
 
+    async def regenerate_section(
+        self,
+        report_title: str,
+        outline: str,
+        section_markdown: str,
+        payload: RegenerateSectionRequest,
+        trace: TimingTrace | None = None,
+    ) -> str:
+        """只把目标小节和全文标题大纲发给模型，返回改写后的小节（含标题行）。"""
+        trace = trace or TimingTrace()
+        with trace.measure("prompt"):
+            system_prompt, user_message = self._build_section_messages(
+                report_title, outline, section_markdown, payload
+            )
+        content = await self._chat_completion(
+            system_prompt, user_message, timeout=60.0, trace=trace, stage="section"
+        )
+        # 统一使用原标题行，保证标题级别与路径不变，后续仍可按同一路径定位本节
+        # 只去掉模型重复输出的本节标题（同级或同名），以下级标题开头的正文原样保留
+        content = content.strip()
+        heading_line = section_markdown.split("\n", 1)[0]
+        original = parse_heading(heading_line)
+        first_line, _, rest = content.partition("\n")
+        first = parse_heading(first_line)
+        if original is not None and first is not None and (first[0] == original[0] or first[1] == original[1]):
+            content = rest.lstrip("\n")
+        return f"{heading_line}\n\n{content}".rstrip()
+
+    def _build_section_messages(
+        self,
+        report_title: str,
+        outline: str,
+        section_markdown: str,
+        payload: RegenerateSectionRequest,
+    ) -> Tuple[str, str]:
+        layout = PromptLayout(_SECTION_SYSTEM_PROMPT)
+        layout.add(
+            TIER_MATERIALS,
+            _materials_block("以下是若干参考材料的摘要：", payload.materials, 1200),
+        )
+        layout.add(TIER_CONTEXT, f"报告整体大纲（仅供定位，标注了本节位置）:\n{outline}")
+        layout.add(TIER_CONTEXT, f"本节当前内容:\n{section_markdown}")
+        layout.add(TIER_REQUEST, f"报告标题: {report_title}")
+        if payload.user_config:
+            layout.add(
+                TIER_PREFERENCES,
+                _preferences_block("写作偏好配置(语气/篇幅/侧重点等，可参考但不必逐字遵循):", payload.user_config),
+            )
+        if payload.instruction:
+            layout.add(TIER_PREFERENCES, f"修改要求:\n{payload.instruction}")
+        return layout.build()
+
     # ====== 基础单轮生成 ======
 
-    async def _generate_simple(self, payload: OpenReportRequest) -> str:
-        base_url = self._settings.ai_base_url.rstrip("/")
-        url = f"{base_url}/chat/completions"
-
-        system_prompt = dedent(
-            """
-            你是一名专业的技术报告与工作报告写作助手，擅长根据给定材料与草稿，
-            用规范、清晰、结构化的 Markdown 格式生成或润色“开放报告”类文档。
-
-            要求：
-            - 内容逻辑清晰、结构完整，标题层级合理（使用 #, ##, ### 等）
-            - 语言正式、专业，但尽量通俗易懂
-            - 尽量保留用户草稿中的关键信息与专业术语
-            - 如有表格类结构，可使用 Markdown 表格语法
-            """
-        ).strip()
-
-        parts: list[str] = []
-        parts.append(f"任务类型: {payload.task_type}")
-        if payload.title:
-            parts.append(f"\n报告标题(可调整): {payload.title}")
+    async def _generate_simple(self, payload: OpenReportRequest, trace: TimingTrace) -> str:
+        with trace.measure("prompt"):
+            system_prompt, user_message = self._build_simple_messages(payload)
+        return await self._chat_completion(
+            system_prompt, user_message, timeout=60.0, trace=trace
+        )
+
+    def _build_simple_messages(self, payload: OpenReportRequest) -> Tuple[str, str]:
+        layout = PromptLayout(_SIMPLE_SYSTEM_PROMPT)
+        layout.add(
+            TIER_MATERIALS,
+            _materials_block(
+                "以下是若干参考材料的摘要，请在内容上尽量与之保持一致：", payload.materials, 1200
+            ),
+        )
         if payload.outline:
-            parts.append(f"\n报告大纲(可参考):\n{payload.outline}")
+            layout.add(TIER_CONTEXT, f"报告大纲(可参考):\n{payload.outline}")
         if payload.draft:
-            parts.append(
-                "\n当前草稿内容(需要在此基础上优化/续写):\n"
-                f"{payload.draft}"
-            )
-
-        if payload.materials:
-            parts.append("\n以下是若干参考材料的摘要，请在内容上尽量与之保持一致：")
-            for idx, m in enumerate(payload.materials, start=1):
-                snippet = (m.summary or m.text[:1200]).strip()
-                parts.append(
-                    f"\n[材料 {idx} - {m.name or m.file_id}]\n{snippet}"
-                )
-
+            layout.add(TIER_CONTEXT, f"当前草稿内容(需要在此基础上优化/续写):\n{payload.draft}")
+        layout.add(TIER_REQUEST, f"任务类型: {payload.task_type}")
+        if payload.title:
+            layout.add(TIER_REQUEST, f"报告标题(可调整): {payload.title}")
         if payload.user_config:
-            parts.append(
-                "\n写作偏好配置(语气/篇幅/侧重点等，可参考但不必逐字遵循):\n"
-                f"{payload.user_config}"
+            layout.add(
+                TIER_PREFERENCES,
+                _preferences_block("写作偏好配置(语气/篇幅/侧重点等，可参考但不必逐字遵循):", payload.user_config),
             )
+        return layout.build()
 
-        user_message = "\n\n".join(parts)
-
-        headers = {"Content-Type": "application/json"}
-        if self._settings.ai_api_key:
-            headers["Authorization"] = f"Bearer {self._settings.ai_api_key}"
+    async def complete(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        timeout: float = 60.0,
+        trace: TimingTrace | None = None,
+        stage: str = "",
+    ) -> str:
+        """单轮对话补全，供章节生成等上层流程复用限流、路由、重试与对冲逻辑。"""
+        return await self._chat_completion(
+            system_prompt, user_message, timeout=timeout, trace=trace or TimingTrace(), stage=stage
+        )
 
+    async def _chat_completion(
+        self,
+        system_prompt: str,
+        user_message: str,
+        *,
+        timeout: float,
+        trace: TimingTrace,
+        stage: str = "",
+    ) -> str:
+        """调用 OpenAI 兼容的 /chat/completions，并记录 TTFB、总耗时与解析耗时。"""
         body = {
-            "model": self._settings.ai_model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message},
@@ -142,17 +336,191 @@ class AiClient:
             "top_p": 0.95,
         }
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            resp = await client.post(url, headers=headers, json=body)
-            resp.raise_for_status()
+        if self._settings.ai_hedge_enabled:
+            resp = await self._hedged_post(
+                body, timeout=timeout, trace=trace, kind=stage or "simple"
+            )
+        else:
+            resp = await self._post_with_retries(body, timeout=timeout, trace=trace)
+
+        with trace.measure("parse"):
             data = resp.json()
+            usage = extract_usage(data)
+            if usage is not None:
+                trace.add_usage(usage)
+                get_prompt_cache_stats().record(usage)
+            try:
+                return data["choices"][0]["message"]["content"]
+            except Exception as exc:  # noqa: BLE001
+                suffix = f" ({stage})" if stage else ""
+                raise RuntimeError(
+                    f"Unexpected AI response format{suffix}: {data}"
+                ) from exc
 
+    async def _hedged_post(
+        self,
+        body: Dict[str, Any],
+        *,
+        timeout: float,
+        trace: TimingTrace,
+        kind: str,
+    ) -> httpx.Response:
+        """对冲模式：主请求超过历史分位延迟未返回时补发备份请求，取先成功者并取消另一个。
+
+        计时从主请求真正发出（拿到并发槽）时开始，本地排队期间不对冲；备份请求只发一次，
+        不做内部重试，使额外负载严格受对冲预算约束，并避开主请求已使用的后端。
+        对冲次数记录在 trace（hedge_delay）与 HedgePolicy 的统计中。
+        """
+        policy = self._hedge_policy
+        policy.on_request()
+        delay = policy.hedge_delay(kind)
+
+        sent = asyncio.Event()
+        primary_endpoints: set[str] = set()
+
+        def on_send(endpoint: UpstreamEndpoint) -> None:
+            primary_endpoints.add(endpoint.name)
+            sent.set()
+
+        primary = asyncio.create_task(
+            self._post_with_retries(body, timeout=timeout, trace=trace, on_send=on_send)
+        )
+        tasks = [primary]
+        try:
+            sent_wait = asyncio.create_task(sent.wait())
+            try:
+                await asyncio.wait([primary, sent_wait], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                await _cancel_pending([sent_wait])
+            start = time.perf_counter()
+
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if not primary.done() and policy.try_acquire():
+                    trace.record("hedge_delay", delay * 1000)
+                    tasks.append(
+                        asyncio.create_task(
+                            self._post_with_retries(
+                                body,
+                                timeout=timeout,
+                                trace=trace,
+                                max_retries=0,
+                                exclude=set(primary_endpoints),
+                            )
+                        )
+                    )
+
+            winner, resp = await _first_success(tasks)
+            if winner is not primary:
+                policy.on_hedge_win()
+            policy.observe(kind, time.perf_counter() - start)
+            return resp
+        finally:
+            await _cancel_pending(tasks)
+
+    async def _post_with_retries(
+        self,
+        body: Dict[str, Any],
+        *,
+        timeout: float,
+        trace: TimingTrace,
+        max_retries: int | None = None,
+        exclude: Iterable[str] = (),
+        on_send: Callable[[UpstreamEndpoint], None] | None = None,
+    ) -> httpx.Response:
+        """按延迟选择后端并在其并发限制下发送请求。
+
+        429/5xx/传输失败时优先故障转移到其他健康后端（同一生成路径、不降级）；
+        没有可用的其他后端时，按 Retry-After 或抖动指数退避在原后端重试。
+        max_retries 缺省取 ai_max_retries；exclude 中的后端不参与选择（没有其他健康后端时除外）；
+        on_send 在每次拿到并发槽、即将发送时以所选后端调用。
+        """
+        if max_retries is None:
+            max_retries = self._settings.ai_max_retries
+        max_retries = max(0, max_retries)
+        resp: httpx.Response | None = None
+        error: httpx.TransportError | None = None
+        tried: set[str] = set(exclude)
+        for attempt in range(max_retries + 1):
+            endpoint = self._pool.pick(exclude=tried)
+            retry_after: float | None = None
+            resp, error = None, None
+            async with endpoint.limiter.slot(self._user_key) as started:
+                if on_send is not None:
+                    on_send(endpoint)
+                endpoint.inflight += 1
+                start = time.perf_counter()
+                try:
+                    resp = await self._post_once(endpoint, body, timeout=timeout, trace=trace)
+                except httpx.TransportError as exc:
+                    error = exc
+                    self._pool.report_failure(endpoint)
+                else:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    if resp.status_code in _OVERLOAD_STATUS:
+                        endpoint.limiter.on_overload(started, retry_after)
+                    elif resp.is_success:
+                        endpoint.limiter.on_success()
+                        self._pool.report_success(endpoint, (time.perf_counter() - start) * 1000)
+                    if resp.status_code in _RETRYABLE_STATUS and resp.status_code != 429:
+                        self._pool.report_failure(endpoint)
+                finally:
+                    endpoint.inflight -= 1
+
+            retryable = resp is None or resp.status_code in _RETRYABLE_STATUS
+            if not retryable or attempt >= max_retries:
+                break
+
+            tried.add(endpoint.name)
+            if self._pool.has_alternative(tried):
+                print(f"[ai-client] failover from {endpoint.name} ({attempt + 1}/{max_retries})")
+                continue
+
+            # 唯一可用后端读超时：不再原地等待第二个完整超时
+            if error is not None and not isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+                break
+            if (retry_after or 0.0) > _MAX_RETRY_AFTER:
+                break
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, 0.5)
+            else:
+                delay = random.uniform(0, min(8.0, 0.5 * 2**attempt))
+            print(f"[ai-client] upstream retry {attempt + 1}/{max_retries} in {delay:.2f}s")
+            with trace.measure("retry_wait"):
+                await asyncio.sleep(delay)
+
+        if resp is None:
+            assert error is not None
+            raise error
+        resp.raise_for_status()
+        return resp
+
+    async def _post_once(
+        self,
+        endpoint: UpstreamEndpoint,
+        body: Dict[str, Any],
+        *,
+        timeout: float,
+        trace: TimingTrace,
+    ) -> httpx.Response:
+        headers = {"Content-Type": "application/json", **endpoint.auth_headers()}
+        client = endpoint.client()
+        start = time.perf_counter()
+        request = client.build_request(
+            "POST",
+            endpoint.url,
+            headers=headers,
+            json={"model": endpoint.model, **body},
+            timeout=timeout,
+        )
+        resp = await client.send(request, stream=True)
         try:
-            return data["choices"][0]["message"]["content"]
-        except Exception as exc:  # noqa: BLE001
-            raise RuntimeError(
-                f"Unexpected AI response format: {data}"
-            ) from exc
+            trace.record("upstream_ttfb", (time.perf_counter() - start) * 1000)
+            await resp.aread()
+        finally:
+            await resp.aclose()
+            trace.record("upstream", (time.perf_counter() - start) * 1000)
+        return resp
 
     # ====== 深度检索版生成（简化：单次 DuckDuckGo 查询） ======
 
@@ -172,122 +540,125 @@ class AiClient:
                 parts.append(snippet)
         return " ".join(parts).strip() or "智能报告 行业分析"
 
-    async def _generate_with_prefetched_research(self, payload: OpenReportRequest) -> str:
+    async def _generate_with_prefetched_research(
+        self, payload: OpenReportRequest, trace: TimingTrace
+    ) -> str:
         """使用前端预取的检索结果生成报告。"""
         pref = payload.search_results
         results = [SearchResult(r.title, r.snippet, r.url) for r in pref.results]
         research_bundles: list[Tuple[Dict[str, Any], List[SearchResult]]] = [
             ({"query": pref.query, "reason": "用户确认的检索结果"}, results)
         ]
-        return await self._generate_report_with_research(payload, research_bundles)
+        return await self._generate_report_with_research(payload, research_bundles, trace)
 
-    async def _generate_with_research(self, payload: OpenReportRequest) -> str:
-        """单次检索：构建 query -> DuckDuckGo -> 综合写报告。"""
+    async def _search_research_bundles(
+        self, payload: OpenReportRequest, trace: TimingTrace
+    ) -> List[Tuple[Dict[str, Any], List[SearchResult]]]:
+        """单次检索：构建 query -> DuckDuckGo；无结果时返回空列表。"""
         query = self._build_simple_query(payload)
         print(f"[open-report] simple_search query={query!r}")
 
-        results = await self._search_client.search(query, max_results=5)
+        with trace.measure("search"):
+            results = await self._search_client.search(query, max_results=5)
         print(f"[open-report] search results count={len(results)}")
 
         if not results:
+            return []
+        return [({"query": query, "reason": "单次检索验证"}, results)]
+
+    async def _generate_with_research(self, payload: OpenReportRequest, trace: TimingTrace) -> str:
+        """单次检索：构建 query -> DuckDuckGo -> 综合写报告。"""
+        research_bundles = await self._search_research_bundles(payload, trace)
+        if not research_bundles:
             print("[open-report] no search results, fallback to _generate_simple")
-            return await self._generate_simple(payload)
+            return await self._generate_simple(payload, trace)
+        return await self._generate_report_with_research(payload, research_bundles, trace)
 
-        research_bundles: list[Tuple[Dict[str, Any], List[SearchResult]]] = [
-            ({"query": query, "reason": "单次检索验证"}, results)
-        ]
-        return await self._generate_report_with_research(payload, research_bundles)
+    async def _generate_speculative(self, payload: OpenReportRequest, trace: TimingTrace) -> str:
+        """投机并行：检索增强生成与普通生成同时启动。
+
+        - 检索版在截止时间内成功：取消普通生成，返回检索版；
+        - 检索版失败（含无检索结果）：直接等待已在运行的普通生成；
+        - 超过截止时间仍未完成：两者谁先成功返回谁。
+        最坏耗时因此约为一次生成，而不是“检索超时 + 检索版超时 + 普通生成”。
+        """
+
+        async def _research() -> str:
+            research_bundles = await self._search_research_bundles(payload, trace)
+            if not research_bundles:
+                raise RuntimeError("no search results")
+            return await self._generate_report_with_research(payload, research_bundles, trace)
+
+        simple = asyncio.create_task(self._generate_simple(payload, trace))
+        research = asyncio.create_task(_research())
+        tasks = [simple, research]
+        try:
+            await asyncio.wait({research}, timeout=self._settings.ai_speculative_deadline)
+            if research.done():
+                exc = research.exception()
+                if exc is None:
+                    print("[open-report] speculative: research answer within deadline")
+                    return research.result()
+                print("[open-report] speculative: research failed, use simple:", repr(exc))
+                return await simple
+            print("[open-report] speculative: research deadline exceeded, use first finished")
+            _, content = await _first_success(tasks)
+            return content
+        finally:
+            await _cancel_pending(tasks)
 
     async def _generate_report_with_research(
         self,
         payload: OpenReportRequest,
         research_bundles: List[Tuple[Dict[str, Any], List[SearchResult]]],
+        trace: TimingTrace,
     ) -> str:
         """第二轮调用：综合搜索结果 + 原始材料，生成最终报告。"""
-        base_url = self._settings.ai_base_url.rstrip("/")
-        url = f"{base_url}/chat/completions"
-
-        system_prompt = dedent(
-            """
-            你是一名专业的技术报告与工作报告写作助手，
-            现在需要在综合“用户提供的材料”和“互联网检索结果”的基础上，
-            生成一篇结构化的“开放报告”（Markdown 格式）。
-
-            要求：
-            - 报告结构完整，标题层级清晰（使用 #, ##, ### 等）
-            - 语言正式、专业，但尽量通俗易懂
-            - 明确区分“用户提供的材料信息”和“从外部检索获得的补充信息”
-            - 当某个结论明显来自检索结果时，可以在句末用 [参考] 标注
-            - 如有需要，可在文末添加“参考资料”小节，列出主要外部信息来源的标题或简要描述
-            """
-        ).strip()
-
-        parts: list[str] = []
-        parts.append(f"任务类型: {payload.task_type}")
-        if payload.title:
-            parts.append(f"\n报告标题(可调整): {payload.title}")
-        if payload.outline:
-            parts.append(f"\n用户提供的大纲(可参考):\n{payload.outline}")
-        if payload.draft:
-            parts.append(
-                "\n用户提供的草稿(需要在此基础上优化/补充):\n"
-                f"{payload.draft}"
+        with trace.measure("prompt"):
+            system_prompt, user_message = self._build_research_messages(
+                payload, research_bundles
             )
+        return await self._chat_completion(
+            system_prompt, user_message, timeout=90.0, trace=trace, stage="research stage"
+        )
 
-        if payload.materials:
-            parts.append("\n以下是用户上传材料的摘要：")
-            for idx, m in enumerate(payload.materials, start=1):
-                snippet = (m.summary or m.text[:800]).strip()
-                parts.append(
-                    f"\n[材料 {idx} - {m.name or m.file_id}]\n{snippet}"
-                )
+    def _build_research_messages(
+        self,
+        payload: OpenReportRequest,
+        research_bundles: List[Tuple[Dict[str, Any], List[SearchResult]]],
+    ) -> Tuple[str, str]:
+        layout = PromptLayout(_RESEARCH_SYSTEM_PROMPT)
+        layout.add(
+            TIER_MATERIALS,
+            _materials_block("以下是用户上传材料的摘要：", payload.materials, 800),
+        )
+        if payload.outline:
+            layout.add(TIER_CONTEXT, f"用户提供的大纲(可参考):\n{payload.outline}")
+        if payload.draft:
+            layout.add(TIER_CONTEXT, f"用户提供的草稿(需要在此基础上优化/补充):\n{payload.draft}")
 
-        parts.append("\n下面是根据任务自动检索到的外部信息（已按检索任务分组）：")
+        research: list[str] = ["下面是根据任务自动检索到的外部信息（已按检索任务分组）："]
         for i, (q, results) in enumerate(research_bundles, start=1):
-            parts.append(
-                f"\n=== 检索任务 {i} ===\n"
+            research.append(
+                f"=== 检索任务 {i} ===\n"
                 f"查询语句: {q.get('query')}\n"
                 f"目的: {q.get('reason') or '（未说明）'}\n"
                 "主要检索结果摘要："
             )
             for j, res in enumerate(results, start=1):
-                parts.append(
-                    f"\n- 结果 {j}: {res.title}\n"
+                research.append(
+                    f"- 结果 {j}: {res.title}\n"
                     f"  摘要: {res.snippet}\n"
                     f"  链接: {res.url}"
                 )
+        layout.add(TIER_CONTEXT, "\n\n".join(research))
 
+        layout.add(TIER_REQUEST, f"任务类型: {payload.task_type}")
+        if payload.title:
+            layout.add(TIER_REQUEST, f"报告标题(可调整): {payload.title}")
         if payload.user_config:
-            parts.append(
-                "\n用户的写作偏好(语气/篇幅/侧重点等，可适度参考):\n"
-                f"{payload.user_config}"
+            layout.add(
+                TIER_PREFERENCES,
+                _preferences_block("用户的写作偏好(语气/篇幅/侧重点等，可适度参考):", payload.user_config),
             )
-
-        user_message = "\n\n".join(parts)
-
-        headers = {"Content-Type": "application/json"}
-        if self._settings.ai_api_key:
-            headers["Authorization"] = f"Bearer {self._settings.ai_api_key}"
-
-        body = {
-            "model": self._settings.ai_model,
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-            "temperature": 0.7,
-            "top_p": 0.95,
-        }
-
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            resp = await client.post(url, headers=headers, json=body)
-            resp.raise_for_status()
-            data = resp.json()
-
-        try:
-            return data["choices"][0]["message"]["content"]
-        except Exception as exc:  # noqa: BLE001
-            raise RuntimeError(
-                f"Unexpected AI response format (research stage): {data}"
-            ) from exc
-
+        return layout.build()
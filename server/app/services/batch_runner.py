@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from ..config import Settings
+from ..models.ai import BatchItemStatus, BatchOpenReportRequest, BatchStatus, OpenReportRequest
+from ..models.reports import ReportCreate
+from .ai_client import AiClient
+from .reports_store import ReportsStore
+from .upstream_pool import UpstreamPool, get_upstream_pool
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+def expand_batch_items(body: BatchOpenReportRequest) -> List[OpenReportRequest]:
+    """展开批量请求：items 原样保留，template 按每组 variables 填充占位符后追加。"""
+    items = list(body.items)
+    if body.template is not None:
+        template = body.template.model_dump()
+        for variables in body.variables:
+            items.append(OpenReportRequest(**_fill_placeholders(template, variables)))
+    return items
+
+
+def _fill_placeholders(value: Any, variables: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        return _PLACEHOLDER.sub(lambda m: str(variables.get(m.group(1), m.group(0))), value)
+    if isinstance(value, dict):
+        return {k: _fill_placeholders(v, variables) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill_placeholders(v, variables) for v in value]
+    return value
+
+
+class _Batch:
+    def __init__(self, batch_id: str, requests: List[OpenReportRequest]) -> None:
+        now = datetime.now(timezone.utc)
+        self.batch_id = batch_id
+        self.requests = requests
+        self.items = [
+            BatchItemStatus(index=idx, title=req.title) for idx, req in enumerate(requests)
+        ]
+        self.create_time = now
+        self.update_time = now
+        self.task: Optional[asyncio.Task[None]] = None
+
+    def touch(self) -> None:
+        self.update_time = datetime.now(timezone.utc)
+
+    def to_status(self) -> BatchStatus:
+        counts = {"pending": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for item in self.items:
+            counts[item.status] += 1
+        done = counts["pending"] == 0 and counts["running"] == 0
+        return BatchStatus(
+            batch_id=self.batch_id,
+            status="completed" if done else "running",
+            total=len(self.items),
+            create_time=self.create_time,
+            update_time=self.update_time,
+            items=[item.model_copy() for item in self.items],
+            **counts,
+        )
+
+
+class BatchRunner:
+    """批量报告生成：有界并发调度、结果直接写入 ReportsStore，并在内存中记录进度。
+
+    各批次以 ``batch:<batch_id>`` 作为上游限流的用户标识，因此在上游并发受限时，
+    批量任务与交互式请求在限流队列中轮询出队，不会把交互请求饿死。
+    """
+
+    def __init__(self, max_batches: int = 50, pool: Optional[UpstreamPool] = None) -> None:
+        self._batches: "OrderedDict[str, _Batch]" = OrderedDict()
+        self._max_batches = max_batches
+        self._pool = pool
+
+    def submit(
+        self,
+        requests: List[OpenReportRequest],
+        settings: Settings,
+        store: ReportsStore,
+        concurrency: Optional[int] = None,
+    ) -> BatchStatus:
+        batch = _Batch(f"batch_{uuid.uuid4().hex[:8]}", requests)
+        # 请求的并发数不超过上游池的并发上限，避免单个批次占满限流队列
+        cap = self._default_concurrency()
+        limit = min(concurrency, cap) if concurrency else cap
+        batch.task = asyncio.create_task(self._run(batch, settings, store, max(1, limit)))
+        self._batches[batch.batch_id] = batch
+        self._evict_finished()
+        return batch.to_status()
+
+    def get(self, batch_id: str) -> Optional[BatchStatus]:
+        batch = self._batches.get(batch_id)
+        return batch.to_status() if batch else None
+
+    async def cancel(self, batch_id: str) -> Optional[BatchStatus]:
+        """取消批次中尚未完成的条目（已保存的报告保留），返回取消后的进度。"""
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            return None
+        if batch.task is not None and not batch.task.done():
+            batch.task.cancel()
+            await asyncio.wait([batch.task])
+        return batch.to_status()
+
+    def _default_concurrency(self) -> int:
+        """缺省并发 = 上游各后端并发上限之和，吞吐随后端容量线性扩展。"""
+        pool = self._pool or get_upstream_pool()
+        return sum(ep.limiter.max_limit for ep in pool.endpoints)
+
+    def _evict_finished(self) -> None:
+        while len(self._batches) > self._max_batches:
+            oldest_id = next(
+                (bid for bid, b in self._batches.items() if b.task and b.task.done()), None
+            )
+            if oldest_id is None:
+                break
+            del self._batches[oldest_id]
+
+    async def _run(
+        self, batch: _Batch, settings: Settings, store: ReportsStore, limit: int
+    ) -> None:
+        semaphore = asyncio.Semaphore(limit)
+        client = AiClient(settings=settings, user_key=f"batch:{batch.batch_id}", pool=self._pool)
+
+        async def _one(idx: int, request: OpenReportRequest) -> None:
+            item = batch.items[idx]
+            async with semaphore:
+                item.status = "running"
+                batch.touch()
+                try:
+                    content = await client.generate_open_report(request)
+                    report = store.create_report(
+                        ReportCreate(
+                            title=request.title or f"批量报告 {idx + 1}",
+                            type=request.task_type,
+                            content=content,
+                            sources=[m.name or m.file_id or "" for m in request.materials],
+                        )
+                    )
+                except Exception as exc:  # noqa: BLE001
+                    print(f"[batch] {batch.batch_id} item {idx} failed:", repr(exc))
+                    traceback.print_exc()
+                    item.status = "failed"
+                    item.error = str(exc) or type(exc).__name__
+                else:
+                    item.status = "succeeded"
+                    item.report_id = report.id
+                batch.touch()
+
+        try:
+            await asyncio.gather(*(_one(idx, req) for idx, req in enumerate(batch.requests)))
+        except asyncio.CancelledError:
+            # 批次被取消：未完成的条目标记为失败，进度查询随即显示批次已结束
+            for item in batch.items:
+                if item.status in ("pending", "running"):
+                    item.status = "failed"
+                    item.error = "cancelled"
+            batch.touch()
+            print(f"[batch] {batch.batch_id} cancelled")
+            return
+        print(f"[batch] {batch.batch_id} completed: {batch.to_status().succeeded}/{len(batch.items)}")
+
+
+@lru_cache()
+def get_batch_runner() -> BatchRunner:
+    """进程内共享的批量任务调度器。"""
+    return BatchRunner()
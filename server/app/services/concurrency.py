@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+
+class AdaptiveLimiter:
+    """AIMD 自适应并发限制器，用于保护上游大模型接口。
+
+    - 每次成功调用后并发上限加性增长（每个“往返”约 +1）；
+    - 收到 429/503 等过载信号时乘性下降，并在 Retry-After 期间暂停放行新请求；
+    - 等待中的请求按 key（通常为用户标识）分队列，轮询出队，避免单个用户的突发请求
+      占满全部名额。
+
+    整个限制器只在事件循环线程内使用，因此不需要额外加锁。
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff_ratio: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._min_limit = max(1, min_limit)
+        self._max_limit = max(self._min_limit, max_limit)
+        self._limit = float(min(max(initial_limit, self._min_limit), self._max_limit))
+        self._backoff_ratio = backoff_ratio
+        self._inflight = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future[None]]]" = OrderedDict()
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._successes = 0
+        self._overloads = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def max_limit(self) -> int:
+        return self._max_limit
+
+    @asynccontextmanager
+    async def slot(self, key: str = "default") -> AsyncIterator[float]:
+        """占用一个并发名额，返回获得名额的时间点（clock），供 on_overload 使用。"""
+        await self._acquire(key)
+        try:
+            yield self._clock()
+        finally:
+            self._release()
+
+    def on_success(self) -> None:
+        self._successes += 1
+        self._limit = min(float(self._max_limit), self._limit + 1.0 / self._limit)
+        self._dispatch()
+
+    def on_overload(self, started_at: float, retry_after: Optional[float] = None) -> None:
+        """上游过载：收缩并发上限；同一轮突发中只收缩一次。"""
+        self._overloads += 1
+        now = self._clock()
+        if started_at >= self._last_decrease:
+            self._limit = max(float(self._min_limit), self._limit * self._backoff_ratio)
+            self._last_decrease = now
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "queued": sum(len(q) for q in self._queues.values()),
+            "queued_keys": len(self._queues),
+            "blocked_for_s": round(max(0.0, self._blocked_until - self._clock()), 3),
+            "successes": self._successes,
+            "overloads": self._overloads,
+        }
+
+    # ====== 内部实现 ======
+
+    def _has_capacity(self) -> bool:
+        return self._inflight < self.limit and self._clock() >= self._blocked_until
+
+    async def _acquire(self, key: str) -> None:
+        if not self._queues and self._has_capacity():
+            self._inflight += 1
+            return
+
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(fut)
+        self._schedule_wakeup()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # 名额已分配但调用方被取消：归还名额
+            if fut.done() and not fut.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._inflight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queues and self._has_capacity():
+            key, queue = next(iter(self._queues.items()))
+            fut = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if fut.done():
+                continue
+            self._inflight += 1
+            fut.set_result(None)
+        self._schedule_wakeup()
+
+    def _schedule_wakeup(self) -> None:
+        """Retry-After 暂停期结束时重新放行排队请求。"""
+        if not self._queues or self._wakeup is not None:
+            return
+        delay = self._blocked_until - self._clock()
+        if delay <= 0:
+            return
+
+        def _wake() -> None:
+            self._wakeup = None
+            self._dispatch()
+
+        self._wakeup = asyncio.get_running_loop().call_later(delay, _wake)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回等待秒数。"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
@@ -4,8 +4,6 @@ import io
 import uuid
 from pathlib import Path
 
-import pdfplumber
-import docx  # type: ignore[import-untyped]
 from fastapi import HTTPException, UploadFile
 
 from ..models.files import UploadedFileInfo
@@ -42,8 +40,17 @@ async def save_and_parse_upload(file: UploadFile, uploads_dir: Path) -> Uploaded
     )
 
 
+def preload_parsers() -> None:
+    """Import the PDF/DOCX parsing libraries ahead of the first upload (used by warm-up)."""
+    import docx  # type: ignore[import-untyped]  # noqa: F401
+    import pdfplumber  # noqa: F401
+
+
 def _extract_text_from_pdf(raw_bytes: bytes) -> str:
     """Extract text from a PDF using pdfplumber."""
+    # Imported lazily: pdfplumber/python-docx add noticeable time to worker boot.
+    import pdfplumber
+
     buf = io.BytesIO(raw_bytes)
     text_parts: list[str] = []
     with pdfplumber.open(buf) as pdf:
@@ -55,6 +62,8 @@ def _extract_text_from_pdf(raw_bytes: bytes) -> str:
 
 def _extract_text_from_docx(raw_bytes: bytes) -> str:
     """Extract text from a DOCX using python-docx."""
+    import docx  # type: ignore[import-untyped]
+
     buf = io.BytesIO(raw_bytes)
     document = docx.Document(buf)
     paragraphs = [p.text for p in document.paragraphs if p.text]
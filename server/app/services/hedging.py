@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from functools import lru_cache
+from typing import Deque, Dict, Optional
+
+from ..config import get_settings
+
+
+class HedgePolicy:
+    """对冲请求策略：主请求超过历史延迟的第 P 百分位仍未返回时，补发一个备份请求。
+
+    - 延迟样本按生成阶段分别统计（普通生成与检索增强生成的耗时差异很大）；
+    - 样本不足 min_samples 时不对冲，避免冷启动阶段按不可靠的分位数放大负载；
+    - 预算采用令牌桶：每个请求存入 budget_ratio 个令牌、每次对冲消耗 1 个，
+      因此额外负载长期不超过 budget_ratio（另有 max_tokens 的突发余量）。
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget_ratio: float = 0.1,
+        min_delay_s: float = 1.0,
+        window: int = 200,
+        min_samples: int = 20,
+        max_tokens: float = 5.0,
+    ) -> None:
+        self._percentile = percentile
+        self._budget_ratio = budget_ratio
+        self._min_delay_s = min_delay_s
+        self._window = window
+        self._min_samples = min_samples
+        self._max_tokens = max_tokens
+        self._samples: Dict[str, Deque[float]] = {}
+        self._tokens = 0.0
+        self._requests = 0
+        self._hedges = 0
+        self._hedge_wins = 0
+
+    def observe(self, kind: str, latency_s: float) -> None:
+        self._samples.setdefault(kind, deque(maxlen=self._window)).append(latency_s)
+
+    def hedge_delay(self, kind: str) -> Optional[float]:
+        """返回对冲等待时长（秒）；样本不足时返回 None 表示本次不对冲。"""
+        samples = self._samples.get(kind)
+        if not samples or len(samples) < self._min_samples:
+            return None
+        ordered = sorted(samples)
+        idx = max(0, math.ceil(self._percentile / 100 * len(ordered)) - 1)
+        return max(self._min_delay_s, ordered[idx])
+
+    def on_request(self) -> None:
+        self._requests += 1
+        self._tokens = min(self._max_tokens, self._tokens + self._budget_ratio)
+
+    def try_acquire(self) -> bool:
+        """申请一次对冲预算，预算不足时返回 False。"""
+        # 允许浮点累加误差：预算 0.1 时第 10 个请求累计为 0.9999…，应当可以对冲
+        if self._tokens < 1.0 - 1e-9:
+            return False
+        self._tokens -= 1.0
+        self._hedges += 1
+        return True
+
+    def on_hedge_win(self) -> None:
+        self._hedge_wins += 1
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "percentile": self._percentile,
+            "budget_ratio": self._budget_ratio,
+            "requests": self._requests,
+            "hedges": self._hedges,
+            "hedge_wins": self._hedge_wins,
+            "tokens": round(self._tokens, 2),
+            "delays_s": {
+                kind: (round(d, 2) if (d := self.hedge_delay(kind)) is not None else None)
+                for kind in self._samples
+            },
+        }
+
+
+@lru_cache()
+def get_hedge_policy() -> HedgePolicy:
+    """进程内共享的对冲策略（延迟样本与预算在所有请求间共享）。"""
+    settings = get_settings()
+    return HedgePolicy(
+        percentile=settings.ai_hedge_percentile,
+        budget_ratio=settings.ai_hedge_budget,
+    )
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from .markdown_sections import parse_sections
+
+if TYPE_CHECKING:
+    from markdown_it import MarkdownIt
+
+# 只允许 Markdown 渲染结果中常见的标签与属性；<script>、事件属性等一律移除
+_ALLOWED_ATTRIBUTES: Dict[str, set[str]] = {
+    "a": {"href", "title"},
+    "img": {"src", "alt", "title", "width", "height"},
+    "code": {"class"},
+    "span": {"class"},
+    "div": {"class"},
+    "th": {"style"},
+    "td": {"style"},
+    "ol": {"start"},
+}
+# 表格列对齐由 markdown-it 以 style="text-align:..." 输出
+_ALLOWED_STYLE_PROPERTIES = {"text-align"}
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache()
+def _get_markdown() -> "MarkdownIt":
+    """与前端 utils/markdown.js 相同的 markdown-it 配置（html / breaks / linkify / 表格）。
+
+    公式不在服务端排版，$...$ 与 $$...$$ 输出为 ``span.math.inline`` / ``div.math.block``，
+    由前端 KaTeX 渲染。首次使用时才导入，避免拖慢 worker 启动。
+    """
+    from markdown_it import MarkdownIt
+    from mdit_py_plugins.dollarmath import dollarmath_plugin
+
+    md = MarkdownIt("commonmark", {"html": True, "breaks": True, "linkify": True})
+    md.enable(["table", "strikethrough", "linkify"])
+    md.use(dollarmath_plugin)
+    return md
+
+
+def parse_markdown_tokens(text: str) -> List[Any]:
+    """markdown-it 的块级 token 流（导出 Word 等非 HTML 输出使用）。"""
+    return _get_markdown().parse(text or "")
+
+
+def render_markdown(text: str) -> str:
+    """Markdown → 经过清洗的 HTML。"""
+    import nh3
+
+    html = _get_markdown().render(text or "")
+    return nh3.clean(
+        html,
+        attributes=_ALLOWED_ATTRIBUTES,
+        filter_style_properties=_ALLOWED_STYLE_PROPERTIES,
+    )
+
+
+def split_blocks(markdown: str, max_level: int = 2) -> List[Tuple[str, int, str]]:
+    """按不超过 max_level 级的标题把全文切成连续的块，返回 (标题, 级别, 原文)。
+
+    第一个标题之前的内容（如有）作为标题为空、级别为 0 的块；所有块依次拼接即为原文。
+    """
+    lines = markdown.split("\n")
+    starts = [s for s in parse_sections(markdown) if s.level <= max_level]
+    blocks: List[Tuple[str, int, str]] = []
+    if not starts or starts[0].start > 0:
+        end = starts[0].start if starts else len(lines)
+        blocks.append(("", 0, "\n".join(lines[:end])))
+    for pos, section in enumerate(starts):
+        end = starts[pos + 1].start if pos + 1 < len(starts) else len(lines)
+        blocks.append((section.title, section.level, "\n".join(lines[section.start : end])))
+    return [block for block in blocks if block[2].strip()]
+
+
+@dataclass(frozen=True)
+class RenderedBlock:
+    title: str
+    level: int
+    hash: str
+    html: str
+
+
+@dataclass(frozen=True)
+class RenderedDocument:
+    content_hash: str
+    blocks: Tuple[RenderedBlock, ...]
+
+    @property
+    def html(self) -> str:
+        return "\n".join(block.html for block in self.blocks)
+
+
+class MarkdownRenderCache:
+    """报告预览的服务端渲染缓存，两级：
+
+    - 块级：按块原文哈希缓存（与报告无关），编辑一个小节后只重新渲染这一块；
+    - 报告级：按 (report_id, 全文哈希) 缓存整篇结果，报告更新时按 report_id 失效。
+
+    两级都是 LRU，超过容量时淘汰最久未使用的条目。接口在线程池中调用，字典操作加锁，
+    渲染本身在锁外进行。
+    """
+
+    def __init__(self, max_documents: int = 256, max_blocks: int = 4096) -> None:
+        self._max_documents = max_documents
+        self._max_blocks = max_blocks
+        self._documents: "OrderedDict[Tuple[str, str], RenderedDocument]" = OrderedDict()
+        self._blocks: "OrderedDict[str, str]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._block_renders = 0
+        self._lock = threading.Lock()
+
+    def render(self, markdown: str, report_id: Optional[str] = None) -> RenderedDocument:
+        digest = content_hash(markdown)
+        key = (report_id, digest) if report_id is not None else None
+        if key is not None:
+            with self._lock:
+                cached = self._documents.get(key)
+                if cached is not None:
+                    self._documents.move_to_end(key)
+                    self._hits += 1
+                    return cached
+                self._misses += 1
+
+        blocks = tuple(
+            RenderedBlock(title=title, level=level, hash=content_hash(text), html=self._render_block(text))
+            for title, level, text in split_blocks(markdown)
+        )
+        document = RenderedDocument(content_hash=digest, blocks=blocks)
+        if key is not None:
+            with self._lock:
+                self._put(self._documents, key, document, self._max_documents)
+        return document
+
+    def invalidate(self, report_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._documents if key[0] == report_id]:
+                del self._documents[key]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "documents": len(self._documents),
+            "blocks": len(self._blocks),
+            "document_hits": self._hits,
+            "document_misses": self._misses,
+            "block_renders": self._block_renders,
+        }
+
+    def _render_block(self, text: str) -> str:
+        digest = content_hash(text)
+        with self._lock:
+            html = self._blocks.get(digest)
+            if html is not None:
+                self._blocks.move_to_end(digest)
+                return html
+        html = render_markdown(text)
+        with self._lock:
+            self._block_renders += 1
+            self._put(self._blocks, digest, html, self._max_blocks)
+        return html
+
+    @staticmethod
+    def _put(cache: "OrderedDict[Any, Any]", key: Any, value: Any, limit: int) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > limit:
+            cache.popitem(last=False)
+
+
+def omit_known(blocks: Iterable[RenderedBlock], known: Iterable[str]) -> List[Dict[str, Any]]:
+    """块列表转为响应数据；客户端已有的块（按哈希）不再返回 html。"""
+    known_set = set(known)
+    return [
+        {
+            "title": block.title,
+            "level": block.level,
+            "hash": block.hash,
+            "html": None if block.hash in known_set else block.html,
+        }
+        for block in blocks
+    ]
+
+
+@lru_cache()
+def get_render_cache() -> MarkdownRenderCache:
+    return MarkdownRenderCache()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+@dataclass(frozen=True)
+class Section:
+    """Markdown 中的一个标题小节，范围为 [start, end) 行（含标题行及其下级小节）。"""
+
+    level: int
+    title: str
+    start: int
+    end: int
+    # 从一级祖先标题到本标题的标题路径
+    path: tuple[str, ...]
+
+
+def parse_heading(line: str) -> Optional[tuple[int, str]]:
+    """解析一行 ATX 标题，返回（级别, 标题文本）；不是标题时返回 None。"""
+    m = _HEADING.match(line)
+    return (len(m.group(1)), m.group(2).strip()) if m else None
+
+
+def parse_sections(markdown: str) -> List[Section]:
+    """按 ATX 标题（#、## ...）切分小节，忽略代码块中的 # 行。"""
+    lines = markdown.split("\n")
+    headings: list[tuple[int, int, str]] = []
+    in_fence = False
+    for idx, line in enumerate(lines):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+        m = _HEADING.match(line)
+        if m:
+            headings.append((idx, len(m.group(1)), m.group(2).strip()))
+
+    sections: list[Section] = []
+    stack: list[tuple[int, str]] = []
+    for pos, (idx, level, title) in enumerate(headings):
+        end = len(lines)
+        for next_idx, next_level, _ in headings[pos + 1 :]:
+            if next_level <= level:
+                end = next_idx
+                break
+        while stack and stack[-1][0] >= level:
+            stack.pop()
+        stack.append((level, title))
+        sections.append(
+            Section(level=level, title=title, start=idx, end=end, path=tuple(t for _, t in stack))
+        )
+    return sections
+
+
+def find_section(markdown: str, heading_path: Sequence[str]) -> Optional[Section]:
+    """按标题路径查找小节：路径各级须依次为祖先标题，且允许省略中间层级。
+
+    例如 ``["五、解释成果及分析", "储层识别"]`` 可匹配 ``# 报告 / ## 五、解释成果及分析 / ### 储层识别``。
+    """
+    wanted = [p.strip().lstrip("#").strip() for p in heading_path if p.strip()]
+    if not wanted:
+        return None
+    for section in parse_sections(markdown):
+        if section.title != wanted[-1]:
+            continue
+        remaining = iter(section.path[:-1])
+        if all(any(title == want for title in remaining) for want in wanted[:-1]):
+            return section
+    return None
+
+
+def section_text(markdown: str, section: Section) -> str:
+    return "\n".join(markdown.split("\n")[section.start : section.end]).strip("\n")
+
+
+def build_outline(markdown: str, highlight: Optional[Section] = None) -> str:
+    """生成紧凑的标题大纲（仅标题，不含正文），可标注当前小节的位置。"""
+    lines = []
+    for section in parse_sections(markdown):
+        marker = "  <-- 本节" if highlight is not None and section.start == highlight.start else ""
+        lines.append(f"{'  ' * (section.level - 1)}- {section.title}{marker}")
+    return "\n".join(lines)
+
+
+def splice_section(markdown: str, section: Section, replacement: str) -> str:
+    """用新内容替换小节（含标题行），前后保留一个空行分隔。"""
+    lines = markdown.split("\n")
+    new_lines = replacement.strip("\n").split("\n")
+    after = lines[section.end :]
+    if after and after[0].strip():
+        new_lines.append("")
+    return "\n".join(lines[: section.start] + new_lines + after)
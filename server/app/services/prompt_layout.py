@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from textwrap import dedent
+from typing import Any, Dict, List, Optional, Tuple
+
+# 用户消息中各类内容的稳定性分层：数值越小越稳定、越靠前。
+# 上游的自动前缀缓存只命中“逐字节相同的前缀”，因此固定模板放在系统提示词中，
+# 用户消息里材料在前，每次请求都可能变化的标题、偏好配置与修改要求放在最后。
+TIER_MATERIALS = 1
+TIER_CONTEXT = 2
+TIER_REQUEST = 3
+TIER_PREFERENCES = 4
+
+
+def static_block(text: str) -> str:
+    """规范化静态提示词块：在模块加载时调用一次，之后每次请求使用完全相同的字节。"""
+    lines = dedent(text).strip().splitlines()
+    return "\n".join(line.rstrip() for line in lines)
+
+
+def stable_json(value: Any) -> str:
+    """按键排序序列化，内容相同的配置总是得到相同的文本。"""
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+
+
+class PromptLayout:
+    """按稳定性排列提示词：系统提示词完全静态，用户消息按 tier 从稳定到易变排列。
+
+    同一 tier 内保持添加顺序，因此输出对相同输入是确定的。
+    """
+
+    def __init__(self, system_prompt: str) -> None:
+        self._system_prompt = system_prompt
+        self._blocks: List[Tuple[int, int, str]] = []
+
+    def add(self, tier: int, text: str) -> "PromptLayout":
+        if text:
+            self._blocks.append((tier, len(self._blocks), text))
+        return self
+
+    def build(self) -> Tuple[str, str]:
+        ordered = sorted(self._blocks, key=lambda block: (block[0], block[1]))
+        return self._system_prompt, "\n\n".join(text for _, _, text in ordered)
+
+
+def extract_usage(data: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """从 chat/completions 响应中提取 token 用量，兼容常见的缓存命中字段。
+
+    - OpenAI 及兼容实现：usage.prompt_tokens_details.cached_tokens
+    - DeepSeek：usage.prompt_cache_hit_tokens
+    - 部分代理：usage.cached_tokens
+    """
+    usage = data.get("usage") if isinstance(data, dict) else None
+    if not isinstance(usage, dict):
+        return None
+    details = usage.get("prompt_tokens_details") or {}
+    cached = (
+        (details.get("cached_tokens") if isinstance(details, dict) else None)
+        or usage.get("prompt_cache_hit_tokens")
+        or usage.get("cached_tokens")
+        or 0
+    )
+    return {
+        "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+        "cached_tokens": int(cached),
+        "completion_tokens": int(usage.get("completion_tokens") or 0),
+    }
+
+
+class PromptCacheStats:
+    """进程内累计的 prompt token 与缓存命中 token，用于衡量前缀缓存的收益。"""
+
+    def __init__(self) -> None:
+        self._calls = 0
+        self._prompt_tokens = 0
+        self._cached_tokens = 0
+
+    def record(self, usage: Dict[str, int]) -> None:
+        self._calls += 1
+        self._prompt_tokens += usage.get("prompt_tokens", 0)
+        self._cached_tokens += usage.get("cached_tokens", 0)
+
+    def snapshot(self) -> Dict[str, float]:
+        ratio = self._cached_tokens / self._prompt_tokens if self._prompt_tokens else 0.0
+        return {
+            "calls": self._calls,
+            "prompt_tokens": self._prompt_tokens,
+            "cached_tokens": self._cached_tokens,
+            "cache_hit_ratio": round(ratio, 4),
+        }
+
+
+@lru_cache()
+def get_prompt_cache_stats() -> PromptCacheStats:
+    return PromptCacheStats()
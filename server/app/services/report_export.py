@@ -0,0 +1,374 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import get_settings
+
+EXPORT_FORMATS = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+# 转换逻辑变化时递增，使旧的缓存产物自然失效
+_EXPORT_VERSION = "1"
+
+
+class ExportUnavailableError(RuntimeError):
+    """当前环境无法导出该格式（例如未安装 LibreOffice）。"""
+
+
+def artifact_key(title: str, content: str) -> str:
+    digest = hashlib.sha256()
+    for part in (_EXPORT_VERSION, title, content):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:32]
+
+
+# ====== Markdown → DOCX ======
+
+
+def markdown_to_docx(title: str, content: str, target: Path) -> None:
+    """用 python-docx 把报告 Markdown 写成 Word 文档。
+
+    支持标题、段落（粗体/斜体/删除线/行内代码）、有序/无序列表、表格、引用、代码块；
+    图片与公式以文字占位。
+    """
+    import docx  # type: ignore[import-untyped]
+    from docx.oxml.ns import qn
+    from docx.shared import Pt
+
+    from .markdown_render import parse_markdown_tokens
+
+    document = docx.Document()
+    document.core_properties.title = title
+    normal = document.styles["Normal"]
+    normal.font.name = "Times New Roman"
+    normal.font.size = Pt(12)
+    normal.element.get_or_add_rPr().get_or_add_rFonts().set(qn("w:eastAsia"), "宋体")
+
+    tokens = parse_markdown_tokens(content)
+    lists: List[str] = []  # 当前嵌套的列表类型：bullet / ordered
+    in_quote = False
+    table: Optional[List[List[Tuple[Any, bool]]]] = None
+    header_cell = False
+    heading_level = 0
+    paragraph_style: Optional[str] = None
+
+    for token in tokens:
+        kind = token.type
+        if kind == "heading_open":
+            heading_level = int(token.tag[1])
+        elif kind == "heading_close":
+            heading_level = 0
+        elif kind in ("bullet_list_open", "ordered_list_open"):
+            lists.append("bullet" if kind == "bullet_list_open" else "ordered")
+        elif kind in ("bullet_list_close", "ordered_list_close"):
+            lists.pop()
+        elif kind == "blockquote_open":
+            in_quote = True
+        elif kind == "blockquote_close":
+            in_quote = False
+        elif kind == "table_open":
+            table = []
+        elif kind == "tr_open" and table is not None:
+            table.append([])
+        elif kind in ("th_open", "td_open"):
+            header_cell = kind == "th_open"
+        elif kind == "table_close" and table:
+            _add_table(document, table)
+            table = None
+        elif kind == "inline":
+            if table:
+                table[-1].append((token, header_cell))
+                continue
+            if heading_level:
+                paragraph = document.add_heading(level=min(heading_level, 9))
+            else:
+                if lists:
+                    base = "List Bullet" if lists[-1] == "bullet" else "List Number"
+                    depth = min(len(lists), 3)
+                    paragraph_style = base if depth == 1 else f"{base} {depth}"
+                elif in_quote:
+                    paragraph_style = "Quote"
+                else:
+                    paragraph_style = None
+                paragraph = document.add_paragraph(style=paragraph_style)
+            _add_inline(paragraph, token.children or [])
+        elif kind in ("fence", "code_block"):
+            for line in token.content.rstrip("\n").split("\n"):
+                run = document.add_paragraph().add_run(line)
+                run.font.name = "Consolas"
+                run.font.size = Pt(10)
+        elif kind == "math_block":
+            document.add_paragraph(token.content.strip()).alignment = 1  # 居中
+        elif kind == "hr":
+            document.add_paragraph()
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    document.save(str(target))
+
+
+def _add_table(document: Any, rows: List[List[Tuple[Any, bool]]]) -> None:
+    columns = max(len(row) for row in rows)
+    table = document.add_table(rows=len(rows), cols=columns)
+    table.style = "Table Grid"
+    for r, row in enumerate(rows):
+        for c, (inline, is_header) in enumerate(row):
+            paragraph = table.cell(r, c).paragraphs[0]
+            _add_inline(paragraph, inline.children or [], bold=is_header)
+
+
+def _add_inline(paragraph: Any, children: List[Any], bold: bool = False) -> None:
+    state = {"bold": bold, "italic": False, "strike": False}
+    for child in children:
+        kind = child.type
+        if kind in ("strong_open", "strong_close"):
+            state["bold"] = kind == "strong_open" or bold
+        elif kind in ("em_open", "em_close"):
+            state["italic"] = kind == "em_open"
+        elif kind in ("s_open", "s_close"):
+            state["strike"] = kind == "s_open"
+        elif kind in ("softbreak", "hardbreak"):
+            paragraph.add_run().add_break()
+        elif kind in ("text", "code_inline", "math_inline"):
+            run = paragraph.add_run(child.content)
+            run.bold = state["bold"] or None
+            run.italic = state["italic"] or None
+            run.font.strike = state["strike"] or None
+            if kind == "code_inline":
+                run.font.name = "Consolas"
+        elif kind == "image":
+            paragraph.add_run(f"[图: {child.content or child.attrs.get('src', '')}]")
+
+
+# ====== 导出服务 ======
+
+
+def _load_soffice_env(office_scripts_dir: Optional[Path]) -> Dict[str, str]:
+    """复用 skills/docx/scripts/office/soffice.py 的环境配置（沙箱中自动加 socket shim）。"""
+    helper = office_scripts_dir / "soffice.py" if office_scripts_dir else None
+    if helper is None or not helper.is_file():
+        return dict(os.environ, SAL_USE_VCLPLUGIN="svp")
+    spec = importlib.util.spec_from_file_location("_office_soffice", helper)
+    module = importlib.util.module_from_spec(spec)
+    assert spec.loader is not None
+    spec.loader.exec_module(module)
+    return module.get_soffice_env()
+
+
+class ExportService:
+    """报告导出：有界工作线程池执行转换，产物按内容哈希缓存在磁盘上。
+
+    - 同一内容的重复导出直接返回缓存文件；并发的相同导出共享一次转换；
+    - 转换数量受 max_workers 限制，超出的请求排队，不会无限制地启动 soffice；
+    - PDF 由（缓存的）DOCX 经 LibreOffice 转换，每个工作线程使用独立的 soffice 配置目录，
+      以便多个实例并行；
+    - 缓存总大小超过 max_cache_bytes 时按最近使用时间淘汰；export 返回的文件在 release 之前、
+      以及正在转换的文件都不会被淘汰，避免在发送途中被删除。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_workers: int = 2,
+        timeout: float = 120.0,
+        max_cache_bytes: int = 512 * 1024 * 1024,
+        office_scripts_dir: Optional[Path] = None,
+    ) -> None:
+        self._cache_dir = cache_dir
+        self._timeout = timeout
+        self._max_cache_bytes = max_cache_bytes
+        self._office_scripts_dir = office_scripts_dir
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export")
+        self._max_workers = max_workers
+        self._inflight: Dict[str, "asyncio.Future[Path]"] = {}
+        self._soffice_env: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+        self._pinned: Counter[str] = Counter()
+        self._hits = 0
+        self._builds = 0
+        self._queued = 0
+
+    async def export(self, title: str, content: str, fmt: str) -> Path:
+        """返回导出文件；调用方发送完毕后须调用 release(path)，在此之前该文件不会被淘汰。"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        if fmt == "pdf" and shutil.which("soffice") is None:
+            raise ExportUnavailableError("PDF 导出需要安装 LibreOffice（soffice）")
+
+        key = artifact_key(title, content)
+        path = self._cache_dir / f"{key}.{fmt}"
+        self._pin(path.name)
+        try:
+            return await self._export(title, content, key, fmt, path)
+        except BaseException:
+            self.release(path)
+            raise
+
+    def release(self, path: Path) -> None:
+        with self._lock:
+            self._pinned[path.name] -= 1
+            if self._pinned[path.name] <= 0:
+                del self._pinned[path.name]
+
+    def _pin(self, name: str) -> None:
+        with self._lock:
+            self._pinned[name] += 1
+
+    @contextmanager
+    def _pinning(self, path: Path) -> Iterator[None]:
+        self._pin(path.name)
+        try:
+            yield
+        finally:
+            self.release(path)
+
+    async def _export(self, title: str, content: str, key: str, fmt: str, path: Path) -> Path:
+        if path.is_file():
+            self._hits += 1
+            os.utime(path)
+            return path
+
+        inflight = self._inflight.get(path.name)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        fut: asyncio.Future[Path] = asyncio.get_running_loop().create_future()
+        self._inflight[path.name] = fut
+        self._queued += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._build, title, content, key, fmt
+            )
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                fut.cancel()
+            else:
+                fut.set_exception(exc)
+                fut.exception()  # 标记异常已被读取，避免无人等待时告警
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            self._queued -= 1
+            del self._inflight[path.name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "workers": self._max_workers,
+            "queued_or_running": self._queued,
+            "cache_hits": self._hits,
+            "builds": self._builds,
+        }
+
+    def _build(self, title: str, content: str, key: str, fmt: str) -> Path:
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        docx_path = self._cache_dir / f"{key}.docx"
+        if not docx_path.is_file():
+            self._atomic_write(docx_path, lambda tmp: markdown_to_docx(title, content, tmp))
+            with self._lock:
+                self._builds += 1
+        if fmt == "docx":
+            self._prune()
+            return docx_path
+
+        pdf_path = self._cache_dir / f"{key}.pdf"
+        with self._pinning(docx_path):
+            if not docx_path.is_file():  # 在此之前被其他线程淘汰
+                self._atomic_write(docx_path, lambda tmp: markdown_to_docx(title, content, tmp))
+            self._convert_to_pdf(docx_path, pdf_path)
+        with self._lock:
+            self._builds += 1
+        self._prune()
+        return pdf_path
+
+    def _convert_to_pdf(self, docx_path: Path, pdf_path: Path) -> None:
+        if self._soffice_env is None:
+            self._soffice_env = _load_soffice_env(self._office_scripts_dir)
+        # 每个工作线程一个 soffice 配置目录：同一配置目录不能被多个 soffice 进程同时使用
+        profile = self._cache_dir / ".soffice" / threading.current_thread().name
+        with tempfile.TemporaryDirectory(dir=self._cache_dir) as out_dir:
+            result = subprocess.run(
+                [
+                    "soffice",
+                    "--headless",
+                    "--norestore",
+                    f"-env:UserInstallation={profile.resolve().as_uri()}",
+                    "--convert-to",
+                    "pdf",
+                    "--outdir",
+                    out_dir,
+                    str(docx_path),
+                ],
+                env=self._soffice_env,
+                capture_output=True,
+                text=True,
+                timeout=self._timeout,
+                check=False,
+            )
+            produced = Path(out_dir) / f"{docx_path.stem}.pdf"
+            if result.returncode != 0 or not produced.is_file():
+                raise RuntimeError(f"soffice failed ({result.returncode}): {result.stderr.strip()[:500]}")
+            os.replace(produced, pdf_path)
+
+    @staticmethod
+    def _atomic_write(target: Path, write: Any) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=target.parent, prefix=".tmp-", suffix=target.suffix)
+        os.close(fd)
+        tmp = Path(tmp_name)
+        try:
+            write(tmp)
+            os.replace(tmp, target)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def _prune(self) -> None:
+        # 持锁完成整个淘汰：与 export 中的 _pin 互斥，已固定的文件不会在检查之后被删除
+        with self._lock:
+            self._prune_locked()
+
+    def _prune_locked(self) -> None:
+        entries = []
+        for path in self._cache_dir.iterdir():
+            if path.name.startswith(".") or path.suffix[1:] not in EXPORT_FORMATS:
+                continue
+            if self._pinned[path.name] > 0:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # 被其他工作线程同时淘汰
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self._max_cache_bytes:
+                break
+            total -= size
+            path.unlink(missing_ok=True)
+
+
+@lru_cache()
+def get_export_service() -> ExportService:
+    settings = get_settings()
+    return ExportService(
+        cache_dir=settings.data_dir / "exports",
+        max_workers=settings.export_workers,
+        timeout=settings.export_timeout,
+        max_cache_bytes=settings.export_cache_mb * 1024 * 1024,
+        office_scripts_dir=settings.office_scripts_dir,
+    )
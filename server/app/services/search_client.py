@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import asyncio
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
-from ddgs import DDGS
+import httpx
 
 
 @dataclass
@@ -15,7 +15,14 @@ class SearchResult:
 
 
 class SearchClient:
-    """DuckDuckGo 真实网页搜索，使用 ddgs 库获取搜索结果。"""
+    """DuckDuckGo 真实网页搜索，使用 ddgs 库获取搜索结果。
+
+    配置 ``base_url`` 时改为调用 HTTP 搜索接口 ``GET {base_url}/search?q=...&max_results=...``
+    （返回 ``{"results": [{"title", "snippet", "url"}]}``），用于离线压测时接入本地替身服务。
+    """
+
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        self._base_url = base_url.rstrip("/") if base_url else None
 
     async def search(
         self, query: str, max_results: int = 5, timeout: float = 15.0
@@ -23,8 +30,12 @@ class SearchClient:
         """搜索 DuckDuckGo 并返回网页结果列表。"""
         if not query.strip():
             return []
+        if self._base_url:
+            return await self._search_http(query, max_results, timeout)
 
         def _do_search() -> List[SearchResult]:
+            from ddgs import DDGS
+
             results: list[SearchResult] = []
             try:
                 ddgs = DDGS(timeout=int(timeout))
@@ -50,3 +61,34 @@ class SearchClient:
             return results[:max_results]
 
         return await asyncio.to_thread(_do_search)
+
+    async def warm_up(self) -> None:
+        """在后台线程中预先导入 ddgs 并初始化一次会话（加载各搜索引擎模块），HTTP 接口模式下无需预热。"""
+        if self._base_url:
+            return
+
+        def _load() -> None:
+            from ddgs import DDGS
+
+            DDGS(timeout=10)
+
+        await asyncio.to_thread(_load)
+
+    async def _search_http(
+        self, query: str, max_results: int, timeout: float
+    ) -> List[SearchResult]:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            resp = await client.get(
+                f"{self._base_url}/search", params={"q": query, "max_results": max_results}
+            )
+            resp.raise_for_status()
+            items = resp.json().get("results") or []
+        return [
+            SearchResult(
+                title=str(item.get("title") or "无标题"),
+                snippet=str(item.get("snippet") or "")[:400],
+                url=str(item.get("url") or ""),
+            )
+            for item in items[:max_results]
+            if isinstance(item, dict)
+        ]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class TimingTrace:
+    """单次请求的分阶段耗时记录。
+
+    各阶段（search / prompt / upstream_ttfb / upstream / parse 等）按发生顺序记录，
+    同名阶段可出现多次（例如深度检索失败后回退到普通模式时会有两次 upstream）。
+    结果既可以输出为 ``Server-Timing`` 响应头，也可以作为 JSON 调试信息返回。
+    """
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self._phases: List[Tuple[str, float]] = []
+        self._usage: Dict[str, int] = {}
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """记录 with 代码块的耗时（无论是否抛出异常）。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def record(self, name: str, duration_ms: float) -> None:
+        self._phases.append((name, duration_ms))
+
+    def add_usage(self, usage: Dict[str, int]) -> None:
+        """累计上游返回的 token 用量（含前缀缓存命中的 cached_tokens）。"""
+        for key, value in usage.items():
+            self._usage[key] = self._usage.get(key, 0) + value
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": [
+                {"name": name, "duration_ms": round(dur, 1)} for name, dur in self._phases
+            ],
+            "total_ms": round(self.total_ms, 1),
+            "usage": dict(self._usage) or None,
+        }
+
+    def server_timing_header(self) -> str:
+        """按 Server-Timing 规范格式化，例如 ``search;dur=812.3, upstream;dur=20311.0``。"""
+        entries = [f"{name};dur={dur:.1f}" for name, dur in self._phases]
+        entries.append(f"total;dur={self.total_ms:.1f}")
+        if self._usage:
+            desc = " ".join(f"{key}={value}" for key, value in self._usage.items())
+            entries.append(f'usage;desc="{desc}"')
+        return ", ".join(entries)
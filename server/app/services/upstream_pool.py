@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import asyncio
+import statistics
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from ..config import Settings, get_settings
+from .concurrency import AdaptiveLimiter
+
+
+@dataclass
+class UpstreamEndpoint:
+    """一个 OpenAI 兼容的后端（本地 vLLM、yeysai 等）及其运行时健康状态。"""
+
+    name: str
+    base_url: str
+    model: str
+    api_key: Optional[str] = None
+    weight: float = 1.0
+    limiter: AdaptiveLimiter = field(default_factory=AdaptiveLimiter)
+
+    ewma_ms: Optional[float] = None
+    inflight: int = 0
+    consecutive_failures: int = 0
+    ejections: int = 0
+    ejected_until: float = 0.0
+
+    # 复用连接（TLS 握手只在建连时发生一次）；httpx 连接池绑定事件循环，循环变化时重建
+    _client: Optional[httpx.AsyncClient] = field(default=None, repr=False)
+    _client_loop: Optional[asyncio.AbstractEventLoop] = field(default=None, repr=False)
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url.rstrip('/')}/chat/completions"
+
+    def client(self) -> httpx.AsyncClient:
+        """返回本后端共享的 AsyncClient（单次请求的超时在 build_request 时指定）。"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=32)
+            )
+            self._client_loop = loop
+        return self._client
+
+    def auth_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+
+    async def aclose(self) -> None:
+        if self._client is not None and self._client_loop is asyncio.get_running_loop():
+            await self._client.aclose()
+        self._client = None
+        self._client_loop = None
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def score(self, baseline_ms: float = 1.0) -> float:
+        """越小越优先：EWMA 延迟 ×（在途请求数 + 1）/ 权重。
+
+        尚无样本的后端按 baseline_ms（池内各后端 EWMA 的中位数）计，仍随在途请求数增长，
+        避免冷启动时并发请求全部落到同一个未采样的后端。
+        """
+        latency = self.ewma_ms if self.ewma_ms is not None else baseline_ms
+        return latency * (self.inflight + 1) / max(self.weight, 1e-6)
+
+
+class UpstreamPool:
+    """多后端路由：选择 EWMA 延迟最低的健康后端，连续失败的后端被暂时剔除。
+
+    - 剔除时长按 eject_base_s × 2^(剔除次数-1) 增长，上限 eject_max_s；
+    - 每次失败按 failure_penalty_ms 计入 EWMA，从未成功过的后端剔除期满后不会被优先选中；
+    - 剔除期满后后端重新参与选择，首次成功即恢复健康计数；
+    - 所有后端都被剔除时，退而选择最早恢复的那个，而不是直接拒绝请求。
+    """
+
+    def __init__(
+        self,
+        endpoints: List[UpstreamEndpoint],
+        alpha: float = 0.3,
+        failure_threshold: int = 3,
+        eject_base_s: float = 10.0,
+        eject_max_s: float = 300.0,
+        failure_penalty_ms: float = 30000.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("UpstreamPool requires at least one endpoint")
+        self._endpoints = endpoints
+        self._alpha = alpha
+        self._failure_threshold = failure_threshold
+        self._eject_base_s = eject_base_s
+        self._eject_max_s = eject_max_s
+        self._failure_penalty_ms = failure_penalty_ms
+        self._clock = clock
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "UpstreamPool":
+        """由 Settings 构建：配置了 ai_endpoints 时使用该列表，否则使用单个 ai_base_url。
+
+        ai_api_key 只用于隐式的默认后端和 base_url 与 ai_base_url 相同的后端，
+        其他后端未配置 api_key 时不带认证头，避免把密钥发给第三方或自建服务。
+        """
+        configs: List[Dict[str, Any]] = settings.ai_endpoints or [
+            {
+                "name": "default",
+                "base_url": settings.ai_base_url,
+                "api_key": settings.ai_api_key,
+                "model": settings.ai_model,
+            }
+        ]
+        endpoints = []
+        names = set()
+        for idx, cfg in enumerate(configs):
+            name = str(cfg.get("name") or f"endpoint-{idx}")
+            if name in names:
+                # 故障转移按名称排除已尝试的后端，重名会使其中一个无法被选中
+                raise ValueError(f"Duplicate upstream endpoint name: {name!r}")
+            names.add(name)
+            base_url = str(cfg.get("base_url") or settings.ai_base_url)
+            default_key = settings.ai_api_key if base_url.rstrip("/") == settings.ai_base_url.rstrip("/") else None
+            endpoints.append(
+                UpstreamEndpoint(
+                    name=name,
+                    base_url=base_url,
+                    model=str(cfg.get("model") or settings.ai_model),
+                    api_key=cfg.get("api_key", default_key),
+                    weight=float(cfg.get("weight", 1.0)),
+                    limiter=AdaptiveLimiter(
+                        initial_limit=int(
+                            cfg.get("initial_concurrency", settings.ai_initial_concurrency)
+                        ),
+                        max_limit=int(cfg.get("max_concurrency", settings.ai_max_concurrency)),
+                    ),
+                )
+            )
+        return cls(endpoints)
+
+    @property
+    def endpoints(self) -> List[UpstreamEndpoint]:
+        return list(self._endpoints)
+
+    def pick(self, exclude: Iterable[str] = ()) -> UpstreamEndpoint:
+        now = self._clock()
+        excluded = set(exclude)
+        healthy = [ep for ep in self._endpoints if ep.is_healthy(now)]
+        candidates = [ep for ep in healthy if ep.name not in excluded] or healthy
+        if not candidates:
+            return min(self._endpoints, key=lambda ep: ep.ejected_until)
+        sampled = [ep.ewma_ms for ep in self._endpoints if ep.ewma_ms is not None]
+        baseline = statistics.median(sampled) if sampled else 1.0
+        return min(candidates, key=lambda ep: ep.score(baseline))
+
+    def has_alternative(self, exclude: Iterable[str]) -> bool:
+        """除 exclude 之外是否还有健康后端可供故障转移。"""
+        now = self._clock()
+        excluded = set(exclude)
+        return any(ep.is_healthy(now) and ep.name not in excluded for ep in self._endpoints)
+
+    def _observe(self, endpoint: UpstreamEndpoint, latency_ms: float) -> None:
+        if endpoint.ewma_ms is None:
+            endpoint.ewma_ms = latency_ms
+        else:
+            endpoint.ewma_ms = self._alpha * latency_ms + (1 - self._alpha) * endpoint.ewma_ms
+
+    def report_success(self, endpoint: UpstreamEndpoint, latency_ms: float) -> None:
+        self._observe(endpoint, latency_ms)
+        endpoint.consecutive_failures = 0
+        endpoint.ejections = 0
+
+    def report_failure(self, endpoint: UpstreamEndpoint) -> None:
+        # 失败按惩罚延迟计入 EWMA，使其排在正常后端之后
+        self._observe(endpoint, max(self._failure_penalty_ms, endpoint.ewma_ms or 0.0))
+        if not endpoint.is_healthy(self._clock()):
+            # 剔除前已发出的请求陆续失败，不重复累计剔除
+            return
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures < self._failure_threshold:
+            return
+        endpoint.ejections += 1
+        cooldown = min(self._eject_max_s, self._eject_base_s * 2 ** (endpoint.ejections - 1))
+        endpoint.ejected_until = self._clock() + cooldown
+        endpoint.consecutive_failures = 0
+        print(f"[upstream-pool] eject {endpoint.name} for {cooldown:.0f}s")
+
+    async def warm_up(self, timeout: float = 10.0) -> Dict[str, Optional[float]]:
+        """向每个后端发一个轻量请求（GET /models）以提前建立连接，返回各后端耗时（毫秒）。
+
+        只用于预热连接，响应状态（包括 401/404）不影响健康统计；失败的后端记为 None。
+        """
+
+        async def _probe(endpoint: UpstreamEndpoint) -> Optional[float]:
+            start = time.perf_counter()
+            try:
+                await endpoint.client().get(
+                    f"{endpoint.base_url.rstrip('/')}/models",
+                    headers=endpoint.auth_headers(),
+                    timeout=timeout,
+                )
+            except httpx.HTTPError as exc:
+                print(f"[upstream-pool] warm-up {endpoint.name} failed:", repr(exc))
+                return None
+            return (time.perf_counter() - start) * 1000
+
+        results = await asyncio.gather(*(_probe(ep) for ep in self._endpoints))
+        return {ep.name: round(ms, 1) if ms is not None else None for ep, ms in zip(self._endpoints, results)}
+
+    async def aclose(self) -> None:
+        for endpoint in self._endpoints:
+            await endpoint.aclose()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        now = self._clock()
+        return [
+            {
+                "name": ep.name,
+                "base_url": ep.base_url,
+                "model": ep.model,
+                "weight": ep.weight,
+                "healthy": ep.is_healthy(now),
+                "ewma_ms": round(ep.ewma_ms, 1) if ep.ewma_ms is not None else None,
+                "inflight": ep.inflight,
+                "consecutive_failures": ep.consecutive_failures,
+                "ejected_for_s": round(max(0.0, ep.ejected_until - now), 1),
+                "limiter": ep.limiter.snapshot(),
+            }
+            for ep in self._endpoints
+        ]
+
+
+@lru_cache()
+def get_upstream_pool() -> UpstreamPool:
+    """进程内共享的上游后端池（所有 AiClient 实例共用）。"""
+    return UpstreamPool.from_settings(get_settings())
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from ..config import Settings
+from .file_parser import preload_parsers
+from .search_client import SearchClient
+from .upstream_pool import get_upstream_pool
+
+
+class StartupStats:
+    """启动耗时：模块导入、启动阶段、首个成功响应，以及后台预热各步骤的耗时（毫秒）。
+
+    时间均从 app.main 开始导入的时刻起算（进程启动到导入之间的解释器开销不计入）。
+    """
+
+    def __init__(self) -> None:
+        self.origin: Optional[float] = None
+        self.import_ms: Optional[float] = None
+        self.startup_ms: Optional[float] = None
+        self.first_response_ms: Optional[float] = None
+        self.warmup: Dict[str, Any] = {}
+
+    def since_origin_ms(self) -> float:
+        return (time.perf_counter() - (self.origin or time.perf_counter())) * 1000
+
+    def record_first_response(self) -> None:
+        if self.first_response_ms is None:
+            self.first_response_ms = round(self.since_origin_ms(), 1)
+            print(f"[startup] first successful response after {self.first_response_ms:.0f}ms")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "import_ms": self.import_ms,
+            "startup_ms": self.startup_ms,
+            "first_response_ms": self.first_response_ms,
+            "warmup": dict(self.warmup),
+        }
+
+
+@lru_cache()
+def get_startup_stats() -> StartupStats:
+    return StartupStats()
+
+
+async def run_warmup(settings: Settings) -> None:
+    """后台预热：导入文件解析库、初始化搜索会话、与各上游后端建立连接。
+
+    各步骤互不依赖、并发执行，失败只记录日志，不影响服务。
+    """
+    stats = get_startup_stats()
+
+    async def _step(name: str, coro: Any) -> None:
+        start = time.perf_counter()
+        try:
+            result = await coro
+        except Exception as exc:  # noqa: BLE001 - 预热失败不影响服务
+            print(f"[startup] warm-up {name} failed:", repr(exc))
+            stats.warmup[name] = {"error": repr(exc)}
+            return
+        entry: Dict[str, Any] = {"ms": round((time.perf_counter() - start) * 1000, 1)}
+        if result is not None:
+            entry["detail"] = result
+        stats.warmup[name] = entry
+
+    await asyncio.gather(
+        _step("parsers", asyncio.to_thread(preload_parsers)),
+        _step("search", SearchClient(settings.search_api_url).warm_up()),
+        _step("upstream", get_upstream_pool().warm_up()),
+    )
+    print(f"[startup] warm-up finished: {stats.warmup}")
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Protocol, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from ..config import get_settings
+
+# skills/well-logging-report/SKILL.md 中预留的四个井数据接口
+WELL_RESOURCES: Tuple[str, ...] = (
+    "basic-info",
+    "quality-evaluation",
+    "processing-params",
+    "appendix-charts",
+)
+
+# 井号会拼进接口 URL 路径和本地目录名，只允许这些字符
+_WELL_ID_PATTERN = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def validate_well_id(well_id: str) -> str:
+    """校验井号，拒绝路径分隔符、"." 与 ".." 等可能越出接口路径或数据目录的值。"""
+    if not _WELL_ID_PATTERN.fullmatch(well_id) or well_id in (".", ".."):
+        raise ValueError(f"Invalid well id: {well_id!r}")
+    return well_id
+
+
+@dataclass
+class WellData:
+    """一口井的全部报告数据（按接口名索引），errors 记录获取失败的接口。"""
+
+    well_id: str
+    resources: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def get(self, resource: str) -> Dict[str, Any]:
+        return self.resources.get(resource) or {}
+
+
+class WellDataClient(Protocol):
+    """井数据接口客户端：返回 GET /api/well/{well_id}/{resource} 的 JSON。"""
+
+    async def fetch(self, well_id: str, resource: str) -> Dict[str, Any]:
+        ...
+
+
+class HttpWellDataClient:
+    """调用专业软件提供的井数据 HTTP 接口。"""
+
+    def __init__(self, base_url: str, timeout: float = 10.0) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._timeout = timeout
+
+    async def fetch(self, well_id: str, resource: str) -> Dict[str, Any]:
+        well_id = quote(validate_well_id(well_id), safe="")
+        url = f"{self._base_url}/api/well/{well_id}/{resource}"
+        async with httpx.AsyncClient(timeout=self._timeout) as client:
+            resp = await client.get(url)
+            resp.raise_for_status()
+            return resp.json()
+
+
+class FileWellDataClient:
+    """本地文件替身：读取 ``{root}/{well_id}/{resource}.json``，用于开发与测试。"""
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+
+    async def fetch(self, well_id: str, resource: str) -> Dict[str, Any]:
+        path = self._root / validate_well_id(well_id) / f"{resource}.json"
+        if not path.is_file():
+            raise FileNotFoundError(f"No well data file: {path}")
+        text = await asyncio.to_thread(path.read_text, encoding="utf-8")
+        return json.loads(text)
+
+
+class WellDataService:
+    """按井号并发获取四个井数据接口，并以 TTL 缓存结果。
+
+    - 同一口井的并发请求共享同一次获取（例如多个章节同时需要井数据）；获取在独立的任务中进行，
+      某个等待者被取消不会影响其他等待者；
+    - 只缓存完整成功的结果，部分接口失败时下次会重新获取；
+    - 章节重试与 TTL 内同一口井的后续报告直接命中缓存，不会重复请求未变化的井数据。
+    """
+
+    def __init__(self, client: WellDataClient, ttl_s: float = 600.0) -> None:
+        self._client = client
+        self._ttl_s = ttl_s
+        self._cache: Dict[str, Tuple[float, WellData]] = {}
+        self._inflight: Dict[str, "asyncio.Task[WellData]"] = {}
+
+    async def get(self, well_id: str) -> WellData:
+        """获取一口井的数据；井号不合法时抛出 ValueError。"""
+        validate_well_id(well_id)
+        cached = self._cache.get(well_id)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        task = self._inflight.get(well_id)
+        if task is None:
+            task = asyncio.create_task(self._load(well_id))
+            self._inflight[well_id] = task
+            task.add_done_callback(lambda done: self._on_load_done(well_id, done))
+        return await asyncio.shield(task)
+
+    async def _load(self, well_id: str) -> WellData:
+        data = await self._fetch_all(well_id)
+        if not data.errors:
+            self._cache[well_id] = (time.monotonic() + self._ttl_s, data)
+        return data
+
+    def _on_load_done(self, well_id: str, task: "asyncio.Task[WellData]") -> None:
+        if self._inflight.get(well_id) is task:
+            del self._inflight[well_id]
+        if not task.cancelled():
+            task.exception()  # 标记异常已被读取，避免所有等待者都已取消时告警
+
+    def invalidate(self, well_id: Optional[str] = None) -> None:
+        if well_id is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(well_id, None)
+
+    async def _fetch_all(self, well_id: str) -> WellData:
+        results = await asyncio.gather(
+            *(self._client.fetch(well_id, resource) for resource in WELL_RESOURCES),
+            return_exceptions=True,
+        )
+        data = WellData(well_id=well_id)
+        for resource, result in zip(WELL_RESOURCES, results):
+            if isinstance(result, BaseException):
+                print(f"[well-data] {well_id}/{resource} failed:", repr(result))
+                data.errors[resource] = str(result) or type(result).__name__
+            else:
+                data.resources[resource] = result
+        return data
+
+
+@lru_cache()
+def get_well_data_service() -> Optional[WellDataService]:
+    """按配置创建进程内共享的井数据服务；未配置数据源时返回 None。"""
+    settings = get_settings()
+    client: WellDataClient
+    if settings.well_api_base_url:
+        client = HttpWellDataClient(settings.well_api_base_url)
+    elif settings.well_data_dir is not None:
+        client = FileWellDataClient(settings.well_data_dir)
+    else:
+        return None
+    return WellDataService(client, ttl_s=settings.well_data_ttl)
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import traceback
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import httpx
+
+from ..models.ai import OpenReportRequest
+from .prompt_layout import (
+    TIER_CONTEXT,
+    TIER_MATERIALS,
+    TIER_PREFERENCES,
+    TIER_REQUEST,
+    PromptLayout,
+    stable_json,
+    static_block,
+)
+from .timing import TimingTrace
+from .well_data import WellDataService, get_well_data_service
+
+if TYPE_CHECKING:
+    from .ai_client import AiClient
+
+
+WELL_LOGGING_TASK_TYPE = "well-logging-report"
+
+
+@dataclass(frozen=True)
+class ChapterSpec:
+    """测井解释报告的一个章节（结构与 skills/well-logging-report/SKILL.md 保持一致）。"""
+
+    number: int
+    title: str
+    requirements: str
+    depends_on: Tuple[int, ...] = ()
+    # derived=True 的章节由依赖章节直接推导，不调用模型
+    derived: bool = False
+    # 本章依赖的井数据接口（见 well_data.WELL_RESOURCES）
+    data_source: Optional[str] = None
+
+
+WELL_LOGGING_CHAPTERS: Tuple[ChapterSpec, ...] = (
+    ChapterSpec(
+        1,
+        "一、概述",
+        "井号、井型、井位坐标；完钻井深、完钻层位；开完钻日期；测井目的。",
+        data_source="basic-info",
+    ),
+    ChapterSpec(
+        2,
+        "二、测井内容及质量评定",
+        "测井项目列表；各曲线质量评价；施工质量综合评定。",
+        data_source="quality-evaluation",
+    ),
+    ChapterSpec(
+        3,
+        "三、测井解释程序处理参数",
+        "解释模型选择；关键参数设置；处理流程说明。",
+        data_source="processing-params",
+    ),
+    ChapterSpec(4, "四、新技术应用情况", "应用的新技术列表；技术原理简述；应用效果说明。"),
+    ChapterSpec(
+        5,
+        "五、解释成果及分析",
+        "储层识别结果分析；流体性质判断；物性参数解释；综合评价结论。"
+        "采用规范的“八股”式分析写法，结论须与其他章节的数据一致。",
+        depends_on=(1, 2, 3, 4, 6, 8),
+    ),
+    ChapterSpec(6, "六、建议及要求", "后续工作建议；注意事项；相关历史经验参考。"),
+    ChapterSpec(7, "七、图、表目录", "附录中所有图表的汇总表。", depends_on=(8,), derived=True),
+    ChapterSpec(
+        8,
+        "八、附录",
+        "测井曲线图、解释成果图、交会图、数据表。每个图表单独一行标题，"
+        "格式为“图 8-序号 名称”或“表 8-序号 名称”。",
+        data_source="appendix-charts",
+    ),
+)
+
+_CHAPTER_SYSTEM_PROMPT = static_block(
+    """
+    你是一名资深测井解释工程师，负责撰写规范的测井解释报告。
+    报告共 8 章，本次只撰写其中指定的一章。
+
+    要求：
+    - 只输出本章 Markdown 内容，以二级标题（## 章节名）开头，不要输出其他章节
+    - 小节使用三级及以下标题（###、####）
+    - 数据以给定材料为准，缺失的数据写“（待补充）”，不要编造具体数值
+    - 语言正式、专业，符合行业规范；表格使用 Markdown 表格语法
+    """
+)
+
+# 第五章引用其他章节时每章保留的最大字符数
+_DEPENDENCY_EXCERPT_CHARS = 1500
+
+_FIGURE_CAPTION = re.compile(r"^\s*[*_]*\s*((?:图|表)\s*\d+(?:[-－.．]\d+)*\s*[^*_|]*?)\s*[*_]*\s*$")
+_MARKDOWN_IMAGE = re.compile(r"!\[([^\]]+)\]\([^)]*\)")
+_HEADING = re.compile(r"^(#{2,6})\s+(.+?)\s*$")
+
+
+def is_chapter_parallel_request(payload: OpenReportRequest) -> bool:
+    """测井解释报告且 user_config.chapter_parallel 为真时按章节并行生成。"""
+    return bool(
+        payload.task_type == WELL_LOGGING_TASK_TYPE
+        and isinstance(payload.user_config, dict)
+        and payload.user_config.get("chapter_parallel")
+    )
+
+
+def build_figure_index(appendix_markdown: str) -> str:
+    """从第八章附录中提取图表标题，生成第七章的图、表目录（不调用模型）。"""
+    rows: List[Tuple[str, str]] = []
+    seen: set[str] = set()
+    location = "八、附录"
+    for line in appendix_markdown.splitlines():
+        heading = _HEADING.match(line)
+        if heading:
+            location = heading.group(2).strip("# ")
+        names = [m.group(1).strip() for m in _MARKDOWN_IMAGE.finditer(line)]
+        caption = _FIGURE_CAPTION.match(line)
+        if caption:
+            names.append(caption.group(1).strip())
+        elif heading and re.match(r"^(?:图|表)\s*\d", heading.group(2)):
+            names.append(heading.group(2).strip())
+        for name in names:
+            if name and name not in seen:
+                seen.add(name)
+                rows.append((name, location))
+
+    lines = ["## 七、图、表目录", ""]
+    if not rows:
+        lines.append("（附录中暂无图表）")
+        return "\n".join(lines)
+    lines += ["| 序号 | 图/表名称 | 位置 |", "| --- | --- | --- |"]
+    for idx, (name, loc) in enumerate(rows, start=1):
+        lines.append(f"| {idx} | {name} | {loc} |")
+    return "\n".join(lines)
+
+
+def _is_upstream_unavailable(exc: Exception) -> bool:
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429
+
+
+class ChapterParallelGenerator:
+    """按章节并行生成测井解释报告。
+
+    第一、二、三、四、六、八章相互独立并发生成；第五章等待这些章节完成后以其内容为依据生成；
+    第七章由第八章直接推导。单章失败只重试该章；重试后仍失败则整篇报告失败（不拼接占位内容，
+    也不把失败章节交给第五章），上游限流（429）与连接失败不在章节层重试，直接交给调用方。
+    整体耗时趋近于“最慢的独立章节 + 第五章”，而不是整篇报告一次生成。
+    """
+
+    def __init__(
+        self,
+        client: "AiClient",
+        chapters: Tuple[ChapterSpec, ...] = WELL_LOGGING_CHAPTERS,
+        chapter_retries: int = 2,
+        timeout: float = 60.0,
+        well_data: Optional[WellDataService] = None,
+    ) -> None:
+        self._client = client
+        self._well_data = well_data or get_well_data_service()
+        self._chapters = {spec.number: spec for spec in chapters}
+        self._chapter_retries = chapter_retries
+        self._timeout = timeout
+
+    async def generate(self, payload: OpenReportRequest, trace: TimingTrace) -> str:
+        tasks: Dict[int, asyncio.Task[str]] = {}
+
+        def schedule(number: int) -> "asyncio.Task[str]":
+            if number not in tasks:
+                spec = self._chapters[number]
+                deps = {dep: schedule(dep) for dep in spec.depends_on}
+                tasks[number] = asyncio.create_task(self._run_chapter(spec, deps, payload, trace))
+            return tasks[number]
+
+        for number in self._chapters:
+            schedule(number)
+        try:
+            chapters = await asyncio.gather(*(tasks[n] for n in sorted(self._chapters)))
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        header = f"# {payload.title}\n\n" if payload.title else ""
+        return header + "\n\n".join(chapter.strip() for chapter in chapters) + "\n"
+
+    async def _run_chapter(
+        self,
+        spec: ChapterSpec,
+        deps: Dict[int, "asyncio.Task[str]"],
+        payload: OpenReportRequest,
+        trace: TimingTrace,
+    ) -> str:
+        dep_contents = {number: await task for number, task in deps.items()}
+        if spec.derived:
+            return build_figure_index(dep_contents.get(8, ""))
+
+        well_section = await self._load_well_section(spec, payload, trace)
+        with trace.measure("prompt"):
+            user_message = self._build_chapter_message(spec, payload, dep_contents, well_section)
+
+        attempt = 0
+        while True:
+            try:
+                with trace.measure(f"chapter{spec.number}"):
+                    return await self._client.complete(
+                        _CHAPTER_SYSTEM_PROMPT,
+                        user_message,
+                        timeout=self._timeout,
+                        trace=trace,
+                        stage=f"chapter {spec.number}",
+                    )
+            except Exception as exc:  # noqa: BLE001
+                # 限流与连接失败已由 _post_with_retries 按 Retry-After / 故障转移处理过，
+                # 章节层再重试只会放大上游压力
+                if _is_upstream_unavailable(exc) or attempt >= self._chapter_retries:
+                    raise
+                print(
+                    f"[well-report] chapter {spec.number} attempt {attempt + 1} failed:",
+                    type(exc).__name__,
+                    repr(exc),
+                )
+                traceback.print_exc()
+                attempt += 1
+
+    async def _load_well_section(
+        self, spec: ChapterSpec, payload: OpenReportRequest, trace: TimingTrace
+    ) -> Optional[str]:
+        """获取本章对应的井数据接口结果（经 WellDataService 缓存），格式化为提示词片段。"""
+        well_id = (payload.user_config or {}).get("well_id")
+        if not spec.data_source or not well_id or self._well_data is None:
+            return None
+        try:
+            with trace.measure("well_data"):
+                data = await self._well_data.get(str(well_id))
+        except ValueError:
+            return f"井号 {well_id!r} 不合法，未获取井数据，相关数据请写“（待补充）”。"
+        if spec.data_source in data.errors:
+            return f"井数据接口 {spec.data_source} 获取失败，相关数据请写“（待补充）”。"
+        body = json.dumps(data.get(spec.data_source), ensure_ascii=False, indent=2)
+        return f"井数据接口 {spec.data_source} 返回（本章数据以此为准）:\n```json\n{body}\n```"
+
+    def _build_chapter_message(
+        self,
+        spec: ChapterSpec,
+        payload: OpenReportRequest,
+        dep_contents: Dict[int, str],
+        well_section: Optional[str] = None,
+    ) -> str:
+        # 材料、井数据与草稿对同一报告的所有章节相同，放在前面以便各章节共享缓存前缀；
+        # 章节专属的要求与依赖章节放在后面。
+        layout = PromptLayout(_CHAPTER_SYSTEM_PROMPT)
+        if payload.materials:
+            lines = ["参考材料摘要："]
+            for idx, m in enumerate(payload.materials, start=1):
+                snippet = (m.summary or m.text[:1200]).strip()
+                lines.append(f"[材料 {idx} - {m.name or m.file_id}]\n{snippet}")
+            layout.add(TIER_MATERIALS, "\n\n".join(lines))
+        if well_section:
+            layout.add(TIER_MATERIALS, well_section)
+        if payload.title:
+            layout.add(TIER_CONTEXT, f"报告标题: {payload.title}")
+        if payload.outline:
+            layout.add(TIER_CONTEXT, f"报告大纲(可参考):\n{payload.outline}")
+        if payload.draft:
+            layout.add(TIER_CONTEXT, f"已有草稿(取与本章相关的部分):\n{payload.draft}")
+
+        if dep_contents:
+            lines = ["以下是本报告已完成的其他章节（本章结论须与之一致）："]
+            for number in sorted(dep_contents):
+                lines.append(dep_contents[number][:_DEPENDENCY_EXCERPT_CHARS])
+            layout.add(TIER_REQUEST, "\n\n".join(lines))
+        layout.add(TIER_REQUEST, f"本次撰写章节: {spec.title}")
+        layout.add(TIER_REQUEST, f"本章内容要求: {spec.requirements}")
+
+        if payload.user_config:
+            config = dict(payload.user_config)
+            examples = config.pop("few_shot_examples", None)
+            if spec.number == 5 and examples:
+                layout.add(TIER_PREFERENCES, f"第五章写法示例（请模仿其结构与措辞）:\n{examples}")
+            layout.add(TIER_PREFERENCES, f"写作偏好配置(可参考):\n{stable_json(config)}")
+
+        return layout.build()[1]
@@ -0,0 +1,106 @@
+"""基准测试共用的合成数据。
+
+benchmarks 目录下的用例依赖 pytest-benchmark（见 requirements-dev.txt），在 server 目录下运行。
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict
+
+import docx  # type: ignore[import-untyped]
+import pytest
+
+_LINE = "Well D12-3 interval 1520.0-1532.5 m: porosity 18.2%, permeability 35 mD, oil-bearing."
+_PARAGRAPH = "大庆油田萨尔图油层测井解释：自然伽马低值、电阻率高值，解释为油层，孔隙度约 18%。"
+
+
+def _make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """生成纯文本 PDF（内置 Helvetica 字体，不依赖额外的 PDF 生成库）。"""
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # Pages，页面对象编号确定后回填
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in range(pages):
+        text = "".join(f"({page + 1}.{line} {_LINE}) '\n" for line in range(lines_per_page))
+        stream = f"BT /F1 9 Tf 12 TL 40 800 Td\n{text}ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def _make_docx(paragraphs: int) -> bytes:
+    document = docx.Document()
+    for idx in range(paragraphs):
+        if idx % 50 == 0:
+            document.add_heading(f"第 {idx // 50 + 1} 节", level=2)
+        document.add_paragraph(f"{idx + 1}. {_PARAGRAPH}")
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+def write_reports(data_dir: Path, count: int, content_chars: int = 1000) -> None:
+    """按 ReportsStore 的文件格式直接写入 count 条报告。"""
+    now = datetime.now(timezone.utc).isoformat()
+    content = ("# 报告\n\n" + _PARAGRAPH * (content_chars // len(_PARAGRAPH) + 1))[:content_chars]
+    items = [
+        {
+            "id": f"rpt_{idx:08x}",
+            "title": f"报告 {idx}",
+            "type": "open_report",
+            "content": content,
+            "sources": ["材料1.txt"],
+            "create_time": now,
+            "update_time": now,
+        }
+        for idx in range(count)
+    ]
+    (data_dir / "reports.json").write_text(json.dumps(items, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+@pytest.fixture(scope="session")
+def make_pdf() -> Callable[..., bytes]:
+    """合成 PDF 的工厂：make_pdf(pages, lines_per_page=40)。"""
+    return _make_pdf
+
+
+@pytest.fixture(scope="session")
+def make_docx() -> Callable[[int], bytes]:
+    """合成 docx 的工厂：make_docx(paragraphs)。"""
+    return _make_docx
+
+
+@pytest.fixture(scope="session")
+def reports_dirs(tmp_path_factory: pytest.TempPathFactory) -> Dict[int, Path]:
+    """每种规模一个数据目录，内容在整个会话中复用。"""
+    dirs = {}
+    for count in (10, 1_000, 10_000):
+        path = tmp_path_factory.mktemp(f"reports_{count}")
+        write_reports(path, count)
+        dirs[count] = path
+    return dirs
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.file_parser import _extract_text_from_docx, _extract_text_from_pdf
+
+
+@pytest.mark.parametrize("pages", [1, 5, 20])
+def test_extract_text_from_pdf(benchmark, make_pdf, pages):
+    raw = make_pdf(pages)
+    text = benchmark(_extract_text_from_pdf, raw)
+    assert text.count("Well D12-3") == pages * 40
+
+
+@pytest.mark.parametrize("paragraphs", [100, 1_000, 5_000])
+def test_extract_text_from_docx(benchmark, make_docx, paragraphs):
+    raw = make_docx(paragraphs)
+    text = benchmark(_extract_text_from_docx, raw)
+    assert text.count("萨尔图") == paragraphs
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import pytest
+
+from app.models.ai import OpenReportRequest
+
+_TEXT = "测井解释材料正文，包含大段表格与数值说明。" * 2500  # 约 50k 字符
+
+
+def _raw(materials: int) -> dict:
+    return {
+        "task_type": "open_report",
+        "title": "大材料报告",
+        "materials": [
+            {"file_id": f"f{idx}", "name": f"材料{idx}.docx", "text": _TEXT, "summary": _TEXT[:2000]}
+            for idx in range(materials)
+        ],
+        "user_config": {"tone": "formal"},
+    }
+
+
+@pytest.mark.parametrize("materials", [1, 20])
+def test_open_report_request_validate(benchmark, materials):
+    raw = _raw(materials)
+    model = benchmark(OpenReportRequest.model_validate, raw)
+    assert len(model.materials) == materials
+
+
+@pytest.mark.parametrize("materials", [1, 20])
+def test_open_report_request_validate_json(benchmark, materials):
+    raw_json = OpenReportRequest.model_validate(_raw(materials)).model_dump_json()
+    model = benchmark(OpenReportRequest.model_validate_json, raw_json)
+    assert len(model.materials) == materials
+
+
+@pytest.mark.parametrize("materials", [1, 20])
+def test_open_report_request_dump_json(benchmark, materials):
+    model = OpenReportRequest.model_validate(_raw(materials))
+    dumped = benchmark(model.model_dump_json)
+    assert len(dumped) > len(_TEXT) * materials
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import pytest
+
+from app.config import get_settings
+from app.models.ai import Material, OpenReportRequest, RegenerateSectionRequest
+from app.services.ai_client import AiClient
+from app.services.search_client import SearchResult
+
+_TEXT = "大庆油田某区块测井资料综述，包含储层参数、试油结论与处理解释方法说明。" * 200
+
+
+def _payload(materials: int) -> OpenReportRequest:
+    return OpenReportRequest(
+        title="D12-3 井测井资料处理解释报告",
+        outline="一、概况\n二、测井资料质量评价\n三、处理解释\n四、结论",
+        draft="# 草稿\n\n" + _TEXT[:3000],
+        materials=[
+            Material(file_id=f"f{idx}", name=f"材料{idx}.pdf", text=_TEXT, summary=_TEXT[:1500])
+            for idx in range(materials)
+        ],
+        user_config={"tone": "formal", "length": "long", "web_search_enabled": True},
+    )
+
+
+@pytest.fixture(scope="module")
+def client() -> AiClient:
+    return AiClient(get_settings())
+
+
+@pytest.mark.parametrize("materials", [1, 10, 50])
+def test_build_simple_messages(benchmark, client, materials):
+    payload = _payload(materials)
+    system, user = benchmark(client._build_simple_messages, payload)
+    assert system and user
+
+
+@pytest.mark.parametrize("materials", [1, 10, 50])
+def test_build_research_messages(benchmark, client, materials):
+    payload = _payload(materials)
+    bundles = [
+        (
+            {"query": f"检索 {idx}"},
+            [SearchResult(title=f"结果 {n}", snippet=_TEXT[:400], url=f"https://example.com/{n}") for n in range(5)],
+        )
+        for idx in range(3)
+    ]
+    system, user = benchmark(client._build_research_messages, payload, bundles)
+    assert system and user
+
+
+def test_build_section_messages(benchmark, client):
+    payload = _payload(10)
+    request = RegenerateSectionRequest(
+        heading_path=["三、处理解释"],
+        instruction="补充各层段的电性特征描述",
+        materials=payload.materials,
+        user_config=payload.user_config,
+    )
+    section = "## 三、处理解释\n\n" + _TEXT[:4000]
+    outline = "- 一、概况\n- 二、测井资料质量评价\n- 三、处理解释  <-- 本节\n- 四、结论"
+    system, user = benchmark(client._build_section_messages, payload.title, outline, section, request)
+    assert system and user
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+from app.models.reports import ReportCreate, ReportUpdate
+from app.services.reports_store import ReportsStore
+
+SIZES = [10, 1_000, 10_000]
+
+
+@pytest.fixture
+def store_copy(tmp_path, reports_dirs):
+    """写操作会修改数据文件，每轮从原始数据恢复，保证各轮规模一致。"""
+
+    def _make(size: int):
+        source = reports_dirs[size] / "reports.json"
+        target = tmp_path / "reports.json"
+
+        def setup():
+            shutil.copyfile(source, target)
+
+        return ReportsStore(tmp_path), setup
+
+    return _make
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_reports(benchmark, reports_dirs, size):
+    store = ReportsStore(reports_dirs[size])
+    result = benchmark(store.list_reports)
+    assert len(result) == size
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_get_report_last(benchmark, reports_dirs, size):
+    store = ReportsStore(reports_dirs[size])
+    last_id = f"rpt_{size - 1:08x}"
+    result = benchmark(store.get_report, last_id)
+    assert result is not None and result.id == last_id
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_create_report(benchmark, store_copy, size):
+    store, setup = store_copy(size)
+    payload = ReportCreate(title="新报告", content="# 新报告\n\n正文")
+    benchmark.pedantic(store.create_report, args=(payload,), setup=setup, rounds=10)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_update_report(benchmark, store_copy, size):
+    store, setup = store_copy(size)
+    payload = ReportUpdate(content="# 更新后的报告\n\n正文")
+    target_id = f"rpt_{size // 2:08x}"
+
+    def update():
+        assert store.update_report(target_id, payload) is not None
+
+    benchmark.pedantic(update, setup=setup, rounds=10)
@@ -0,0 +1,68 @@
+"""单元测试共用的替身：指向 tools/fake_upstream 的上游后端池，以及可手动推进的时钟。
+
+在 server 目录下运行：python -m pytest tests
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Dict, Iterator, Sequence
+
+import httpx
+import pytest
+
+from app.services.concurrency import AdaptiveLimiter
+from app.services.upstream_pool import UpstreamEndpoint, UpstreamPool
+from tools import fake_upstream
+
+
+class FakeClock:
+    """替代 time.monotonic 的可控时钟。"""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def fake_llm() -> Iterator[Dict[str, float]]:
+    """fake_upstream 使用固定的短延迟且不注入错误；测试可修改返回的配置，结束后恢复。"""
+    saved = dict(fake_upstream.CONFIG)
+    fake_upstream.CONFIG.update(
+        llm_latency_ms=20, llm_latency_sigma=0, llm_error_rate=0, llm_429_rate=0, llm_hang_rate=0
+    )
+    yield fake_upstream.CONFIG
+    fake_upstream.CONFIG.clear()
+    fake_upstream.CONFIG.update(saved)
+
+
+@pytest.fixture
+def make_fake_pool(fake_llm: Dict[str, float]) -> Callable[..., UpstreamPool]:
+    """在当前事件循环中创建指向 fake_upstream 的后端池：请求经 ASGI 直接送达，不占用端口。"""
+
+    def _make(names: Sequence[str] = ("fake",), max_concurrency: int = 4) -> UpstreamPool:
+        loop = asyncio.get_running_loop()
+        endpoints = []
+        for name in names:
+            endpoint = UpstreamEndpoint(
+                name=name,
+                base_url=f"http://{name}/v1",
+                model="fake-model",
+                limiter=AdaptiveLimiter(initial_limit=max_concurrency, max_limit=max_concurrency),
+            )
+            endpoint._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_upstream.app))
+            endpoint._client_loop = loop
+            endpoints.append(endpoint)
+        return UpstreamPool(endpoints)
+
+    return _make
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.models.ai import BatchOpenReportRequest, OpenReportRequest
+from app.services.batch_runner import BatchRunner
+from app.services.reports_store import ReportsStore
+
+
+def _requests(count: int):
+    return [OpenReportRequest(title=f"井 {idx}") for idx in range(count)]
+
+
+async def _wait_done(runner: BatchRunner, batch_id: str, samples: list) -> None:
+    while True:
+        status = runner.get(batch_id)
+        samples.append(status)
+        if status.status == "completed":
+            return
+        await asyncio.sleep(0.005)
+
+
+@pytest.mark.parametrize("concurrency", [0, -1, 10_000])
+def test_concurrency_out_of_range_is_rejected(concurrency):
+    with pytest.raises(ValidationError):
+        BatchOpenReportRequest(items=_requests(1), concurrency=concurrency)
+
+
+def test_progress_and_results(tmp_path, make_fake_pool):
+    store = ReportsStore(tmp_path)
+
+    async def main():
+        runner = BatchRunner(pool=make_fake_pool(max_concurrency=2))
+        # 请求的并发数超过后端池上限时按上限执行
+        status = runner.submit(_requests(6), Settings(ai_max_retries=0), store, concurrency=50)
+        assert status.total == 6 and status.pending == 6
+        samples: list = []
+        await _wait_done(runner, status.batch_id, samples)
+        return samples
+
+    samples = asyncio.run(main())
+    assert max(s.running for s in samples) == 2
+    final = samples[-1]
+    assert final.succeeded == 6 and final.failed == 0
+    assert sorted(r.title for r in store.list_reports()) == [f"井 {idx}" for idx in range(6)]
+    assert all(store.get_report(item.report_id) is not None for item in final.items)
+
+
+def test_failed_items_are_reported(tmp_path, fake_llm, make_fake_pool):
+    fake_llm["llm_error_rate"] = 1.0
+
+    async def main():
+        runner = BatchRunner(pool=make_fake_pool())
+        status = runner.submit(_requests(2), Settings(ai_max_retries=0), ReportsStore(tmp_path), 2)
+        samples: list = []
+        await _wait_done(runner, status.batch_id, samples)
+        return samples[-1]
+
+    final = asyncio.run(main())
+    assert final.failed == 2
+    assert all(item.status == "failed" and "500" in item.error for item in final.items)
+
+
+def test_cancel_marks_unfinished_items(tmp_path, fake_llm, make_fake_pool):
+    fake_llm["llm_latency_ms"] = 200
+    store = ReportsStore(tmp_path)
+
+    async def main():
+        runner = BatchRunner(pool=make_fake_pool())
+        status = runner.submit(_requests(3), Settings(ai_max_retries=0), store, concurrency=1)
+        while runner.get(status.batch_id).succeeded < 1:
+            await asyncio.sleep(0.01)
+        return await runner.cancel(status.batch_id)
+
+    final = asyncio.run(main())
+    assert final.status == "completed"
+    assert final.succeeded == 1 and final.failed == 2
+    assert [item.error for item in final.items if item.status == "failed"] == ["cancelled", "cancelled"]
+    assert len(store.list_reports()) == 1
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from app.services.concurrency import AdaptiveLimiter, parse_retry_after
+
+
+def test_success_increases_limit_by_about_one_per_round_trip(clock):
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, clock=clock)
+    for _ in range(2):
+        limiter.on_success()
+    assert limiter.limit == 2  # 2 + 1/2 + 1/2.5
+    limiter.on_success()
+    assert limiter.limit == 3
+    for _ in range(20):
+        limiter.on_success()
+    assert limiter.limit == 4
+
+
+def test_overload_halves_limit_once_per_burst(clock):
+    limiter = AdaptiveLimiter(initial_limit=8, min_limit=2, clock=clock)
+    started = clock()
+    clock.advance(1)
+    limiter.on_overload(started)
+    assert limiter.limit == 4
+    # 同一批在收缩之前发出的请求陆续返回 429，不再重复收缩
+    limiter.on_overload(started)
+    assert limiter.limit == 4
+
+    clock.advance(1)
+    limiter.on_overload(clock())
+    assert limiter.limit == 2
+    clock.advance(1)
+    limiter.on_overload(clock())
+    assert limiter.limit == 2  # 不低于 min_limit
+    assert limiter.snapshot()["overloads"] == 4
+
+
+def test_retry_after_blocks_new_slots_until_it_expires(clock):
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=4, clock=clock)
+        holder_release = asyncio.Event()
+
+        async def holder():
+            async with limiter.slot("a") as started:
+                limiter.on_overload(started, retry_after=5)
+                await holder_release.wait()
+
+        async def waiter():
+            async with limiter.slot("b"):
+                return clock()
+
+        hold = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["blocked_for_s"] == 5
+
+        wait = asyncio.create_task(waiter())
+        await asyncio.sleep(0.01)
+        assert not wait.done()
+        assert limiter.snapshot()["queued"] == 1
+
+        clock.advance(5)
+        holder_release.set()  # 归还名额时重新调度排队请求
+        await hold
+        return await asyncio.wait_for(wait, 1)
+
+    start = clock()
+    assert asyncio.run(main()) == start + 5
+
+
+def test_queued_requests_are_served_round_robin_per_key(clock):
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1, clock=clock)
+        release = asyncio.Event()
+        order = []
+
+        async def request(key, tag):
+            async with limiter.slot(key):
+                order.append(tag)
+                if tag == "a0":
+                    await release.wait()
+                await asyncio.sleep(0)
+
+        first = asyncio.create_task(request("a", "a0"))
+        await asyncio.sleep(0)
+        # a 的突发请求先排队，b 的单个请求后到，也不必等 a 全部完成
+        tasks = [asyncio.create_task(request("a", f"a{idx}")) for idx in range(1, 4)]
+        tasks.append(asyncio.create_task(request("b", "b1")))
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queued"] == 4
+        release.set()
+        await asyncio.gather(first, *tasks)
+        return order
+
+    assert asyncio.run(main()) == ["a0", "a1", "b1", "a2", "a3"]
+
+
+def test_cancelled_waiter_does_not_leak_a_slot(clock):
+    async def main():
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1, clock=clock)
+        release = asyncio.Event()
+
+        async def holder():
+            async with limiter.slot():
+                await release.wait()
+
+        async def waiter():
+            async with limiter.slot():
+                pass
+
+        hold = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        wait = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        wait.cancel()
+        release.set()
+        await hold
+        with pytest.raises(asyncio.CancelledError):
+            await wait
+        return limiter.snapshot()
+
+    snapshot = asyncio.run(main())
+    assert snapshot["inflight"] == 0 and snapshot["queued"] == 0
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("", None), ("7", 7.0), (" 1.5 ", 1.5), ("-3", 0.0), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 28 <= parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+    past = datetime.now(timezone.utc) - timedelta(seconds=30)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+
+from app.config import Settings
+from app.services.ai_client import AiClient
+from app.services.hedging import HedgePolicy
+from app.services.timing import TimingTrace
+from app.services.upstream_pool import UpstreamEndpoint, UpstreamPool
+
+
+def test_no_hedge_delay_until_enough_samples():
+    policy = HedgePolicy(percentile=90, min_samples=10, min_delay_s=0.01)
+    for idx in range(9):
+        policy.observe("simple", 1.0 + idx)
+    assert policy.hedge_delay("simple") is None
+    policy.observe("simple", 10.0)
+    assert policy.hedge_delay("simple") == 9.0
+    assert policy.hedge_delay("research") is None
+
+
+def test_hedge_delay_has_a_floor():
+    policy = HedgePolicy(min_samples=1, min_delay_s=1.0)
+    policy.observe("simple", 0.2)
+    assert policy.hedge_delay("simple") == 1.0
+
+
+def test_budget_limits_hedges_to_a_fraction_of_requests():
+    policy = HedgePolicy(budget_ratio=0.1, max_tokens=5)
+    granted = 0
+    for _ in range(100):
+        policy.on_request()
+        granted += policy.try_acquire()
+    assert granted == 10
+    assert policy.snapshot()["hedges"] == 10
+
+
+def test_budget_tokens_are_capped():
+    policy = HedgePolicy(budget_ratio=0.5, max_tokens=2)
+    for _ in range(100):
+        policy.on_request()
+    assert [policy.try_acquire() for _ in range(3)] == [True, True, False]
+
+
+def _endpoint(name, delay_s, calls):
+    async def handler(request):
+        calls.append(name)
+        await asyncio.sleep(delay_s)
+        return httpx.Response(200, json={"choices": [{"message": {"content": name}}]})
+
+    endpoint = UpstreamEndpoint(name=name, base_url=f"http://{name}/v1", model="m")
+    endpoint._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    endpoint._client_loop = asyncio.get_running_loop()
+    return endpoint
+
+
+def test_hedge_goes_to_another_endpoint_exactly_once():
+    async def main():
+        calls = []
+        slow = _endpoint("slow", 5.0, calls)
+        fast = _endpoint("fast", 0.01, calls)
+        # 按延迟 slow 更优先：主请求会发往 slow，备份请求即使按分数也会选 slow，须被排除
+        slow.ewma_ms, fast.ewma_ms = 1.0, 10_000.0
+        policy = HedgePolicy(budget_ratio=1.0, min_samples=1, min_delay_s=0.05)
+        policy.observe("simple", 0.05)
+        client = AiClient(
+            Settings(ai_hedge_enabled=True),
+            pool=UpstreamPool([slow, fast]),
+            hedge_policy=policy,
+        )
+        trace = TimingTrace()
+        content = await asyncio.wait_for(client.complete("system", "user", trace=trace), 2)
+        return content, calls, policy.snapshot()
+
+    content, calls, snapshot = asyncio.run(main())
+    assert content == "fast"
+    assert calls == ["slow", "fast"]
+    assert snapshot["hedges"] == 1 and snapshot["hedge_wins"] == 1
+
+
+def test_no_hedge_when_primary_answers_in_time():
+    async def main():
+        calls = []
+        endpoint = _endpoint("only", 0.01, calls)
+        policy = HedgePolicy(budget_ratio=1.0, min_samples=1, min_delay_s=0.5)
+        policy.observe("simple", 0.5)
+        client = AiClient(Settings(ai_hedge_enabled=True), pool=UpstreamPool([endpoint]), hedge_policy=policy)
+        return await client.complete("system", "user"), calls, policy.snapshot()
+
+    content, calls, snapshot = asyncio.run(main())
+    assert content == "only" and calls == ["only"] and snapshot["hedges"] == 0
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import pytest
+
+from app.config import Settings
+from app.services.upstream_pool import UpstreamEndpoint, UpstreamPool
+
+
+def _pool(clock, *names, **kwargs):
+    endpoints = [UpstreamEndpoint(name=name, base_url=f"http://{name}/v1", model="m") for name in names]
+    return UpstreamPool(endpoints, clock=clock, **kwargs)
+
+
+def _by_name(pool):
+    return {ep.name: ep for ep in pool.endpoints}
+
+
+def test_cold_start_spreads_concurrent_requests(clock):
+    pool = _pool(clock, "a", "b", "c")
+    picked = []
+    for _ in range(6):
+        endpoint = pool.pick()
+        endpoint.inflight += 1  # 请求尚未返回
+        picked.append(endpoint.name)
+    assert picked == ["a", "b", "c", "a", "b", "c"]
+
+
+def test_prefers_lowest_latency_and_scores_unsampled_at_the_median(clock):
+    pool = _pool(clock, "fast", "slow", "new")
+    pool.report_success(_by_name(pool)["fast"], 100)
+    pool.report_success(_by_name(pool)["slow"], 900)
+    assert pool.pick().name == "fast"
+
+    # 未采样的后端按中位数 500 计：fast 有 3 个在途请求（400）时仍优先，5 个（600）时转向 new
+    fast = _by_name(pool)["fast"]
+    fast.inflight = 3
+    assert pool.pick().name == "fast"
+    fast.inflight = 5
+    assert pool.pick().name == "new"
+
+
+def test_failures_count_as_penalty_latency(clock):
+    pool = _pool(clock, "a", "b", failure_threshold=10, failure_penalty_ms=30_000)
+    a, b = pool.endpoints
+    pool.report_failure(a)
+    assert a.ewma_ms == 30_000
+    pool.report_success(b, 2_000)
+    b.inflight = 5
+    assert pool.pick().name == "b"
+
+
+def test_consecutive_failures_eject_with_growing_cooldown(clock):
+    pool = _pool(clock, "a", "b", failure_threshold=2, eject_base_s=10, eject_max_s=15)
+    a = _by_name(pool)["a"]
+    pool.report_failure(a)
+    assert pool.has_alternative(()) and a.is_healthy(clock())
+    pool.report_failure(a)
+    assert not a.is_healthy(clock())
+    assert pool.pick().name == "b"
+    # 剔除前已发出的请求随后失败，不重复累计剔除
+    pool.report_failure(a)
+    assert a.ejections == 1 and a.ejected_until == clock() + 10
+
+    clock.advance(10)
+    assert a.is_healthy(clock())
+    pool.report_failure(a)
+    pool.report_failure(a)
+    assert a.ejected_until == clock() + 15  # 20 秒截断到 eject_max_s
+
+    clock.advance(15)
+    pool.report_success(a, 100)
+    assert a.ejections == 0 and a.consecutive_failures == 0
+
+
+def test_all_ejected_falls_back_to_earliest_recovery(clock):
+    pool = _pool(clock, "a", "b", failure_threshold=1)
+    a, b = pool.endpoints
+    pool.report_failure(b)
+    clock.advance(1)
+    pool.report_failure(a)
+    assert not pool.has_alternative(())
+    assert pool.pick().name == "b"
+
+
+def test_exclude_prefers_other_endpoints_but_never_returns_nothing(clock):
+    pool = _pool(clock, "a", "b")
+    assert pool.pick(exclude=["a"]).name == "b"
+    assert pool.pick(exclude=["a", "b"]).name in {"a", "b"}
+
+
+def test_from_settings_only_sends_default_key_to_default_base_url():
+    settings = Settings(
+        ai_base_url="https://yeysai.com/v1",
+        ai_api_key="sk-main",
+        ai_endpoints=[
+            {"name": "local", "base_url": "http://10.0.0.5:8000/v1"},
+            {"name": "hosted", "base_url": "https://yeysai.com/v1/"},
+            {"name": "other", "base_url": "https://other.example/v1", "api_key": "sk-other"},
+        ],
+    )
+    keys = {ep.name: ep.api_key for ep in UpstreamPool.from_settings(settings).endpoints}
+    assert keys == {"local": None, "hosted": "sk-main", "other": "sk-other"}
+
+
+def test_from_settings_rejects_duplicate_names():
+    settings = Settings(ai_endpoints=[{"name": "a"}, {"name": "a", "base_url": "http://x/v1"}])
+    with pytest.raises(ValueError, match="Duplicate"):
+        UpstreamPool.from_settings(settings)
@@ -0,0 +1 @@
+"""Local stand-in servers and developer tooling (not imported by the app)."""
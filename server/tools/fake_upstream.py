@@ -0,0 +1,200 @@
+"""离线压测用的上游替身：OpenAI 兼容的 /v1/chat/completions 与 HTTP 搜索接口。
+
+启动（在 server 目录下）::
+
+    python -m uvicorn tools.fake_upstream:app --port 8200
+
+后端设置 ``YEYSAI_BASE_URL=http://localhost:8200/v1`` 与
+``DQ_REPORT_SEARCH_API_URL=http://localhost:8200`` 即可完全离线运行，不消耗真实 token。
+
+行为通过环境变量配置，运行中也可以 ``POST /_fake/config`` 传入同名小写字段动态修改：
+
+- FAKE_LLM_LATENCY_MS:    模型响应延迟中位数（毫秒，默认 800）
+- FAKE_LLM_LATENCY_SIGMA: 对数正态分布的 sigma（默认 0.5，0 表示固定延迟；越大长尾越重）
+- FAKE_LLM_ERROR_RATE:    返回 500 的概率
+- FAKE_LLM_429_RATE:      返回 429（带 Retry-After）的概率
+- FAKE_LLM_HANG_RATE:     长时间不响应（模拟上游卡死，触发调用方超时）的概率
+- FAKE_LLM_RETRY_AFTER:   429 响应的 Retry-After 秒数（默认 1）
+- FAKE_LLM_CHUNKS:        流式响应（``"stream": true``）拆分的块数（默认 20）
+- FAKE_SEARCH_LATENCY_MS: 搜索接口延迟（毫秒，默认 300）
+- FAKE_SEED:              随机种子，设置后延迟与错误注入序列可复现
+
+``GET /_fake/stats`` 返回各类响应的计数。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name) or default)
+
+
+CONFIG: Dict[str, float] = {
+    "llm_latency_ms": _env_float("FAKE_LLM_LATENCY_MS", 800),
+    "llm_latency_sigma": _env_float("FAKE_LLM_LATENCY_SIGMA", 0.5),
+    "llm_error_rate": _env_float("FAKE_LLM_ERROR_RATE", 0),
+    "llm_429_rate": _env_float("FAKE_LLM_429_RATE", 0),
+    "llm_hang_rate": _env_float("FAKE_LLM_HANG_RATE", 0),
+    "llm_retry_after": _env_float("FAKE_LLM_RETRY_AFTER", 1),
+    "llm_chunks": _env_float("FAKE_LLM_CHUNKS", 20),
+    "search_latency_ms": _env_float("FAKE_SEARCH_LATENCY_MS", 300),
+}
+
+# 模拟卡死时的等待时长，远大于后端的上游超时
+_HANG_SECONDS = 600
+# 模拟上游前缀缓存：记录最近见过的提示词前缀，命中时在 usage 中返回 cached_tokens
+_PREFIX_CHARS = 1024
+_PREFIX_CACHE_SIZE = 256
+
+_rng = random.Random(os.getenv("FAKE_SEED"))
+_stats: Counter = Counter()
+_seen_prefixes: "OrderedDict[str, None]" = OrderedDict()
+
+app = FastAPI(title="Fake LLM / search upstream")
+
+
+def _sample_latency_s(median_ms: float, sigma: float) -> float:
+    if sigma <= 0:
+        return median_ms / 1000
+    return median_ms * math.exp(_rng.gauss(0, sigma)) / 1000
+
+
+def _estimate_tokens(text: str) -> int:
+    # 中文约 1 字 1 token、英文约 4 字符 1 token，这里取粗略折中
+    return max(1, len(text) // 2)
+
+
+def _cached_tokens(prompt: str) -> int:
+    prefix = prompt[:_PREFIX_CHARS]
+    key = hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+    if key in _seen_prefixes:
+        _seen_prefixes.move_to_end(key)
+        return _estimate_tokens(prefix)
+    _seen_prefixes[key] = None
+    if len(_seen_prefixes) > _PREFIX_CACHE_SIZE:
+        _seen_prefixes.popitem(last=False)
+    return 0
+
+
+def _fake_report(user_message: str) -> str:
+    """生成结构完整的 Markdown 报告，便于后端的章节拆分/拼接逻辑正常工作。"""
+    chapter = re.search(r"本次撰写章节: (.+)", user_message)
+    if chapter:
+        title = chapter.group(1).strip()
+        return f"## {title}\n\n### 概述\n\n本章为离线替身生成的内容。\n\n| 项目 | 数值 |\n| --- | --- |\n| 示例 | （待补充） |\n"
+    heading = re.search(r"(?:报告标题|标题): (.+)", user_message)
+    title = heading.group(1).strip() if heading else "离线测试报告"
+    sections = ["一、背景", "二、分析", "三、结论"]
+    body = "\n\n".join(f"## {name}\n\n{name[2:]}部分为离线替身生成的内容。" for name in sections)
+    return f"# {title}\n\n{body}\n"
+
+
+def _completion_body(model: str, content: str, usage: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": f"fake-{int(time.time() * 1000)}",
+        "object": "chat.completion",
+        "model": model,
+        "choices": [
+            {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+        ],
+        "usage": usage,
+    }
+
+
+async def _stream_chunks(model: str, content: str, total_s: float) -> AsyncIterator[bytes]:
+    chunks = max(1, int(CONFIG["llm_chunks"]))
+    size = math.ceil(len(content) / chunks)
+    for start in range(0, len(content), size):
+        await asyncio.sleep(total_s / chunks)
+        delta = {"choices": [{"index": 0, "delta": {"content": content[start : start + size]}}], "model": model}
+        yield f"data: {json.dumps(delta, ensure_ascii=False)}\n\n".encode("utf-8")
+    yield b"data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    messages: List[Dict[str, Any]] = body.get("messages") or []
+    model = str(body.get("model") or "fake-model")
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+
+    roll = _rng.random()
+    if roll < CONFIG["llm_hang_rate"]:
+        _stats["hang"] += 1
+        await asyncio.sleep(_HANG_SECONDS)
+    roll -= CONFIG["llm_hang_rate"]
+    if roll < CONFIG["llm_429_rate"]:
+        _stats["429"] += 1
+        return JSONResponse(
+            {"error": {"message": "rate limited (fake)"}},
+            status_code=429,
+            headers={"Retry-After": str(CONFIG["llm_retry_after"])},
+        )
+    roll -= CONFIG["llm_429_rate"]
+    latency_s = _sample_latency_s(CONFIG["llm_latency_ms"], CONFIG["llm_latency_sigma"])
+    if roll < CONFIG["llm_error_rate"]:
+        _stats["500"] += 1
+        await asyncio.sleep(latency_s / 4)
+        return JSONResponse({"error": {"message": "internal error (fake)"}}, status_code=500)
+
+    user_message = str(messages[-1].get("content") or "") if messages else ""
+    content = _fake_report(user_message)
+    prompt_tokens = _estimate_tokens(prompt)
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": _estimate_tokens(content),
+        "total_tokens": prompt_tokens + _estimate_tokens(content),
+        "prompt_tokens_details": {"cached_tokens": _cached_tokens(prompt)},
+    }
+
+    if body.get("stream"):
+        _stats["stream"] += 1
+        return StreamingResponse(
+            _stream_chunks(model, content, latency_s), media_type="text/event-stream"
+        )
+    _stats["ok"] += 1
+    await asyncio.sleep(latency_s)
+    return _completion_body(model, content, usage)
+
+
+@app.get("/search")
+async def search(q: str, max_results: int = 5) -> dict:
+    _stats["search"] += 1
+    await asyncio.sleep(_sample_latency_s(CONFIG["search_latency_ms"], 0.3))
+    results = [
+        {
+            "title": f"{q} - 参考资料 {idx}",
+            "snippet": f"关于“{q}”的离线示例摘要 {idx}。",
+            "url": f"https://example.com/search/{idx}",
+        }
+        for idx in range(1, max_results + 1)
+    ]
+    return {"results": results}
+
+
+@app.post("/_fake/config")
+async def update_config(patch: Dict[str, float]) -> dict:
+    unknown = set(patch) - set(CONFIG)
+    if unknown:
+        return JSONResponse({"error": f"Unknown fields: {sorted(unknown)}"}, status_code=400)
+    CONFIG.update({key: float(value) for key, value in patch.items()})
+    return CONFIG
+
+
+@app.get("/_fake/stats")
+async def get_stats() -> dict:
+    return dict(_stats)
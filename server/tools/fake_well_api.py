@@ -0,0 +1,39 @@
+"""本地井数据接口替身：按 skills/well-logging-report/SKILL.md 预留的接口路径返回本地 JSON 文件。
+
+启动（在 server 目录下）::
+
+    python -m uvicorn tools.fake_well_api:app --port 8100
+
+数据目录默认为 tools/sample_wells，可用 FAKE_WELL_DATA_DIR 指定；文件布局为
+``{well_id}/{basic-info|quality-evaluation|processing-params|appendix-charts}.json``。
+后端设置 DQ_REPORT_WELL_API_URL=http://localhost:8100 即可使用；也可以不启动本服务，
+直接设置 DQ_REPORT_WELL_DATA_DIR 指向同一目录，由 FileWellDataClient 读取。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+from fastapi import FastAPI, HTTPException
+
+from app.services.well_data import WELL_RESOURCES, validate_well_id
+
+DATA_DIR = Path(os.getenv("FAKE_WELL_DATA_DIR") or Path(__file__).resolve().parent / "sample_wells")
+
+app = FastAPI(title="Fake well data API")
+
+
+@app.get("/api/well/{well_id}/{resource}")
+async def get_well_resource(well_id: str, resource: str) -> dict:
+    if resource not in WELL_RESOURCES:
+        raise HTTPException(status_code=404, detail="Unknown resource")
+    try:
+        validate_well_id(well_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Well data not found")
+    path = DATA_DIR / well_id / f"{resource}.json"
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Well data not found")
+    return json.loads(path.read_text(encoding="utf-8"))
@@ -0,0 +1,303 @@
+"""端到端压测：按目标 RPS 驱动报告生成、文件上传与报告 CRUD 接口，输出吞吐与 p50/p95/p99 延迟。
+
+完全离线运行（自动启动 tools/fake_upstream.py 替身与后端服务，数据写入临时目录）::
+
+    python -m tools.loadtest --spawn --rps 20 --duration 30
+
+压测已启动的服务（注意：会真实调用其配置的上游）::
+
+    python -m tools.loadtest --base-url http://localhost:8000 --rps 5 --duration 60
+
+按固定到达时间发压（开环），延迟从计划发出时刻计算，服务变慢时排队时间也计入延迟，
+不会因为等待上一请求而少发请求。``--max-error-rate`` 超出时以非零状态退出，可直接用于 CI。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+SERVER_DIR = Path(__file__).resolve().parents[1]
+
+DEFAULT_MIX = "open-report=4,open-report-search=1,upload=2,reports-create=1,reports-get=2"
+
+_MATERIAL_TEXT = "大庆油田某区块测井资料综述。" * 40
+_UPLOAD_TEXT = ("压测上传文件内容，用于验证文本解析与摘要流程。\n" * 200).encode("utf-8")
+
+
+class LoadTest:
+    """一次压测的场景定义与结果收集。"""
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self._client = client
+        self._report_ids: List[str] = []
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def scenarios(self) -> Dict[str, Callable[[int], Awaitable[httpx.Response]]]:
+        return {
+            "open-report": self._open_report,
+            "open-report-search": self._open_report_search,
+            "upload": self._upload,
+            "reports-create": self._reports_create,
+            "reports-get": self._reports_get,
+        }
+
+    async def _open_report(self, seq: int, web_search: bool = False) -> httpx.Response:
+        payload = {
+            "task_type": "open_report",
+            "title": f"压测报告 {seq}",
+            "outline": "一、背景\n二、分析\n三、结论",
+            "materials": [{"name": "资料.txt", "text": _MATERIAL_TEXT}],
+            "user_config": {"web_search_enabled": web_search},
+        }
+        return await self._client.post(
+            "/api/ai/open-report", json=payload, headers={"X-User-Id": f"load-{seq % 8}"}
+        )
+
+    async def _open_report_search(self, seq: int) -> httpx.Response:
+        return await self._open_report(seq, web_search=True)
+
+    async def _upload(self, seq: int) -> httpx.Response:
+        files = {"file": (f"load-{seq}.txt", _UPLOAD_TEXT, "text/plain")}
+        return await self._client.post("/api/files/upload", files=files)
+
+    async def _reports_create(self, seq: int) -> httpx.Response:
+        body = {"title": f"压测报告 {seq}", "content": "# 压测报告\n\n## 一、背景\n\n内容"}
+        resp = await self._client.post("/api/reports", json=body)
+        if resp.status_code == 200:
+            self._report_ids.append(resp.json()["id"])
+        return resp
+
+    async def _reports_get(self, seq: int) -> httpx.Response:
+        if not self._report_ids:
+            return await self._client.get("/api/reports")
+        return await self._client.get(f"/api/reports/{random.choice(self._report_ids)}")
+
+    async def run_one(
+        self, name: str, op: Callable[[int], Awaitable[httpx.Response]], seq: int, scheduled: float
+    ) -> None:
+        try:
+            resp = await op(seq)
+        except httpx.HTTPError as exc:
+            self.errors[name][type(exc).__name__] += 1
+            return
+        elapsed_ms = (time.perf_counter() - scheduled) * 1000
+        if resp.status_code >= 400:
+            self.errors[name][str(resp.status_code)] += 1
+        else:
+            self.latencies[name].append(elapsed_ms)
+
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix.append((name.strip(), float(weight or 1)))
+    return mix
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法百分位。"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(test: LoadTest, wall_s: float) -> Dict[str, Dict[str, float]]:
+    summary: Dict[str, Dict[str, float]] = {}
+    names = sorted(set(test.latencies) | set(test.errors))
+    all_latencies: List[float] = []
+    all_errors = 0
+    for name in names + ["total"]:
+        if name == "total":
+            values, errors = all_latencies, all_errors
+        else:
+            values = test.latencies.get(name, [])
+            errors = sum(test.errors.get(name, {}).values())
+            all_latencies.extend(values)
+            all_errors += errors
+        values = sorted(values)
+        count = len(values) + errors
+        summary[name] = {
+            "requests": count,
+            "ok": len(values),
+            "errors": errors,
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "throughput_rps": round(len(values) / wall_s, 2) if wall_s else 0.0,
+            "p50_ms": round(percentile(values, 50), 1),
+            "p95_ms": round(percentile(values, 95), 1),
+            "p99_ms": round(percentile(values, 99), 1),
+            "max_ms": round(values[-1], 1) if values else 0.0,
+        }
+    return summary
+
+
+def print_summary(summary: Dict[str, Dict[str, float]], test: LoadTest) -> None:
+    header = f"{'scenario':<20}{'reqs':>7}{'errors':>8}{'rps':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, row in summary.items():
+        print(
+            f"{name:<20}{row['requests']:>7}{row['errors']:>8}{row['throughput_rps']:>8}"
+            f"{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}"
+        )
+    for name, errors in test.errors.items():
+        print(f"[errors] {name}: {dict(errors)}")
+
+
+async def run_load(
+    base_url: str, rps: float, duration_s: float, mix: List[Tuple[str, float]], timeout: float
+) -> Tuple[LoadTest, float]:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=100)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        test = LoadTest(client)
+        scenarios = test.scenarios()
+        unknown = [name for name, _ in mix if name not in scenarios]
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {unknown}; available: {sorted(scenarios)}")
+        names = [name for name, _ in mix]
+        weights = [weight for _, weight in mix]
+
+        total = int(rps * duration_s)
+        start = time.perf_counter()
+        tasks = []
+        for seq in range(total):
+            scheduled = start + seq / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = random.choices(names, weights)[0]
+            tasks.append(asyncio.create_task(test.run_one(name, scenarios[name], seq, scheduled)))
+        await asyncio.gather(*tasks)
+        return test, time.perf_counter() - start
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, proc: subprocess.Popen, timeout_s: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"Process exited early while waiting for {url}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"Timed out waiting for {url}")
+
+
+@contextmanager
+def spawn_stack(args: argparse.Namespace) -> Iterator[str]:
+    """启动替身上游与后端服务（独立子进程、临时数据目录），结束时一并关闭。"""
+    fake_port, app_port = _free_port(), _free_port()
+    fake_url = f"http://127.0.0.1:{fake_port}"
+    procs: List[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory(prefix="dq-loadtest-") as data_dir:
+        fake_env = dict(
+            os.environ,
+            FAKE_LLM_LATENCY_MS=str(args.llm_latency_ms),
+            FAKE_LLM_LATENCY_SIGMA=str(args.llm_latency_sigma),
+            FAKE_LLM_ERROR_RATE=str(args.llm_error_rate),
+            FAKE_LLM_429_RATE=str(args.llm_429_rate),
+        )
+        app_env = dict(
+            os.environ,
+            YEYSAI_BASE_URL=f"{fake_url}/v1",
+            YEYSAI_API_KEY="fake",
+            YEYSAI_ENDPOINTS="",
+            DQ_REPORT_SEARCH_API_URL=fake_url,
+            DQ_REPORT_DATA_DIR=data_dir,
+        )
+        try:
+            for module, port, env in (
+                ("tools.fake_upstream:app", fake_port, fake_env),
+                ("app.main:app", app_port, app_env),
+            ):
+                procs.append(
+                    subprocess.Popen(
+                        [sys.executable, "-m", "uvicorn", module, "--port", str(port), "--log-level", "warning"],
+                        cwd=SERVER_DIR,
+                        env=env,
+                    )
+                )
+            _wait_ready(f"{fake_url}/_fake/stats", procs[0])
+            _wait_ready(f"http://127.0.0.1:{app_port}/health", procs[1])
+            yield f"http://127.0.0.1:{app_port}"
+        finally:
+            for proc in procs:
+                proc.terminate()
+            for proc in procs:
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="Target backend URL (omit with --spawn)")
+    parser.add_argument("--spawn", action="store_true", help="Start fake upstream + backend locally (offline)")
+    parser.add_argument("--rps", type=float, default=10.0, help="Target request rate")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to generate load for")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted scenarios (default: {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request client timeout")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for scenario selection")
+    parser.add_argument("--json", dest="json_path", help="Write the summary as JSON to this file")
+    parser.add_argument("--max-error-rate", type=float, default=None, help="Exit 1 if exceeded")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0, help="--spawn: fake LLM median latency")
+    parser.add_argument("--llm-latency-sigma", type=float, default=0.5, help="--spawn: lognormal sigma")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="--spawn: injected 500 rate")
+    parser.add_argument("--llm-429-rate", type=float, default=0.0, help="--spawn: injected 429 rate")
+    args = parser.parse_args(argv)
+
+    if not args.spawn and not args.base_url:
+        parser.error("either --base-url or --spawn is required")
+    random.seed(args.seed)
+    mix = parse_mix(args.mix)
+
+    def _run(base_url: str) -> Tuple[LoadTest, float]:
+        print(f"Load: {args.rps} rps x {args.duration}s against {base_url}")
+        return asyncio.run(run_load(base_url, args.rps, args.duration, mix, args.timeout))
+
+    if args.spawn:
+        with spawn_stack(args) as base_url:
+            test, wall_s = _run(base_url)
+    else:
+        test, wall_s = _run(args.base_url)
+
+    summary = summarize(test, wall_s)
+    print_summary(summary, test)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+    if args.max_error_rate is not None and summary["total"]["error_rate"] > args.max_error_rate:
+        print(f"Error rate {summary['total']['error_rate']} exceeds {args.max_error_rate}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""测量后端的导入耗时与“进程启动 → 首个成功响应”耗时。
+
+在 server 目录下运行::
+
+    python -m tools.measure_startup --runs 5
+    python -m tools.measure_startup --runs 5 --no-warmup   # 对比关闭后台预热
+
+每轮分别：
+1. 在新进程中导入 app.main，记录导入耗时；
+2. 启动 uvicorn 子进程，以 10ms 间隔轮询 ``GET /api/health``，记录首个 200 的耗时；
+3. 读取 ``GET /api/metrics`` 中服务自身记录的 startup 指标（稍等后台预热完成）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from .loadtest import SERVER_DIR, _free_port
+
+_IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def measure_import(env: Dict[str, str]) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", _IMPORT_SNIPPET],
+        cwd=SERVER_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def measure_first_response(env: Dict[str, str], settle_s: float) -> Dict[str, Any]:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        while True:
+            if proc.poll() is not None:
+                raise SystemExit("uvicorn exited before serving a request")
+            try:
+                if httpx.get(f"{url}/api/health", timeout=1.0).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+        first_ms = (time.perf_counter() - start) * 1000
+        time.sleep(settle_s)
+        startup = httpx.get(f"{url}/api/metrics", timeout=5.0).json()["startup"]
+        return {"first_response_ms": round(first_ms, 1), "server": startup}
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--no-warmup", action="store_true", help="Set DQ_REPORT_WARMUP=0")
+    parser.add_argument("--settle", type=float, default=2.0, help="Seconds to wait for warm-up before reading metrics")
+    parser.add_argument("--json", dest="json_path", help="Write raw results to this file")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, DQ_REPORT_WARMUP="0" if args.no_warmup else "1")
+    imports = [measure_import(env) for _ in range(args.runs)]
+    runs = [measure_first_response(env, args.settle) for _ in range(args.runs)]
+    firsts = [run["first_response_ms"] for run in runs]
+
+    print(f"import app.main:          median {statistics.median(imports):.0f}ms  (runs: {[round(v) for v in imports]})")
+    print(f"spawn -> first 200:       median {statistics.median(firsts):.0f}ms  (runs: {[round(v) for v in firsts]})")
+    print(f"server-side (last run):   {json.dumps(runs[-1]['server'], ensure_ascii=False)}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"import_ms": imports, "runs": runs}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Benchmark the minidom and lxml engines of helpers/merge_runs.py.
+
+Generates a long word/document.xml in which every paragraph is split into many
+small runs (rsid attributes, proofErr markers, alternating formatting), pretty-
+prints it like unpack.py does, and times merge_runs with each engine. Every
+measurement runs in a fresh subprocess so that peak RSS is per engine. The
+engines' outputs are then checked for equivalence (C14N).
+
+A second case nests the runs inside deeply nested content controls, which the
+recursive minidom traversal cannot handle.
+
+Usage:
+    python bench_merge_runs.py [--paragraphs N] [--runs N] [--depth N] [--engines minidom,lxml]
+
+Examples:
+    python bench_merge_runs.py                    # 5000 paragraphs x 40 runs
+    python bench_merge_runs.py --paragraphs 20000
+    python bench_merge_runs.py --engines lxml
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import lxml.etree
+
+from bench_xml import _peak_rss_kb
+from helpers.xml_format import XML_ENGINES, parse_xml_bytes, pretty_print_xml_bytes
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_BOLD = "<w:rPr><w:b/><w:sz w:val=\"24\"/></w:rPr>"
+_PLAIN = "<w:rPr><w:sz w:val=\"24\"/></w:rPr>"
+
+
+def _paragraph(p: int, runs: int) -> str:
+    parts = []
+    for r in range(runs):
+        # Groups of four runs share formatting, so three of every four merge.
+        props = _BOLD if (r // 4) % 2 else _PLAIN
+        parts.append(
+            f'<w:r w:rsidR="00A{p % 97:03d}" w:rsidRPr="00B{r:03d}">{props}'
+            f'<w:t xml:space="preserve">word{r} </w:t></w:r>'
+        )
+        if r % 7 == 3:
+            parts.append('<w:proofErr w:type="spellStart"/>')
+    return f'<w:p w:rsidR="00C{p % 89:03d}">{"".join(parts)}</w:p>'
+
+
+def make_document(paragraphs: int, runs: int, depth: int = 0) -> bytes:
+    body = "".join(_paragraph(p, runs) for p in range(paragraphs))
+    for _ in range(depth):
+        body = f"<w:sdt><w:sdtContent>{body}</w:sdtContent></w:sdt>"
+    xml = (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f"<w:document {_W}><w:body>{body}</w:body></w:document>"
+    )
+    return pretty_print_xml_bytes(xml.encode("utf-8"))
+
+
+def _write_case(directory: Path, document: bytes) -> Path:
+    (directory / "word").mkdir(parents=True, exist_ok=True)
+    (directory / "word" / "document.xml").write_bytes(document)
+    return directory
+
+
+def _run_merge(engine: str, directory: Path) -> dict:
+    """Runs inside the worker subprocess."""
+    from helpers.merge_runs import merge_runs
+
+    start = time.perf_counter()
+    count, message = merge_runs(str(directory), engine)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": round(elapsed, 3),
+        "peak_rss_mb": round(_peak_rss_kb() / 1024, 1),
+        "merged": count,
+        "message": message,
+    }
+
+
+def _measure(engine: str, directory: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", engine, str(directory)],
+        cwd=Path(__file__).parent,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _canonical(xml_file: Path) -> bytes:
+    return lxml.etree.tostring(parse_xml_bytes(xml_file.read_bytes()), method="c14n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark minidom vs lxml merge_runs")
+    parser.add_argument("--paragraphs", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=40, help="Runs per paragraph")
+    parser.add_argument("--depth", type=int, default=600, help="Nesting depth of the deep case")
+    parser.add_argument("--engines", default=",".join(XML_ENGINES))
+    args = parser.parse_args()
+
+    engines = [e for e in args.engines.split(",") if e]
+    cases = {
+        "long": make_document(args.paragraphs, args.runs),
+        "deep": make_document(10, args.runs, depth=args.depth),
+    }
+
+    print(f"{'case':<6}{'MB':>7}  {'engine':<9}{'seconds':>9}{'peak RSS MB':>13}{'merged':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        for case, document in cases.items():
+            results = {}
+            for engine in engines:
+                directory = _write_case(tmp_path / f"{case}-{engine}", document)
+                results[engine] = _measure(engine, directory)
+                result = results[engine]
+                status = "" if result["message"].startswith("Merged") else f"  {result['message']}"
+                print(
+                    f"{case:<6}{len(document) / 1e6:>7.1f}  {engine:<9}{result['seconds']:>9.2f}"
+                    f"{result['peak_rss_mb']:>13.0f}{result['merged']:>9}{status}"
+                )
+
+            succeeded = [e for e in engines if results[e]["message"].startswith("Merged")]
+            outputs = {
+                e: _canonical(tmp_path / f"{case}-{e}" / "word" / "document.xml")
+                for e in succeeded
+            }
+            if len(set(outputs.values())) > 1:
+                print(f"{case}: engines disagree")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--worker":
+        print(json.dumps(_run_merge(sys.argv[2], Path(sys.argv[3]))))
+        sys.exit(0)
+    sys.exit(main())
@@ -3,13 +3,17 @@ Validation modules for Word document processing.
 """
 
 from .base import BaseSchemaValidator
+from .document_cache import DocumentCache
 from .docx import DOCXSchemaValidator
 from .pptx import PPTXSchemaValidator
 from .redlining import RedliningValidator
+from .validation_cache import ValidationCache
 
 __all__ = [
     "BaseSchemaValidator",
+    "DocumentCache",
     "DOCXSchemaValidator",
     "PPTXSchemaValidator",
     "RedliningValidator",
+    "ValidationCache",
 ]
@@ -0,0 +1,65 @@
+"""
+Parsed-tree cache shared by the validators of one validation run.
+"""
+
+from pathlib import Path
+
+import lxml.etree
+
+
+class DocumentCache:
+    """Parses each XML part once and hands the same tree to every check.
+
+    Trees are shared, so checks must treat them as read-only; repairs that change
+    a part write it with ``write`` (which invalidates the entry). An entry is also
+    dropped when the file's size or mtime changes, so edits made outside the
+    validators are picked up. Parse errors are cached and re-raised like a fresh
+    ``lxml.etree.parse`` would.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.parses = 0
+        self.hits = 0
+
+    def parse(self, path) -> lxml.etree._ElementTree:
+        path = Path(path)
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            result = entry[1]
+        else:
+            self.parses += 1
+            try:
+                result = lxml.etree.parse(str(path))
+            except lxml.etree.XMLSyntaxError as e:
+                result = e
+            self._entries[path] = (key, result)
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def getroot(self, path):
+        return self.parse(path).getroot()
+
+    def write(self, path, tree) -> None:
+        path = Path(path)
+        path.write_bytes(
+            lxml.etree.tostring(
+                tree,
+                xml_declaration=True,
+                encoding="UTF-8",
+                standalone=tree.docinfo.standalone,
+            )
+        )
+        self.invalidate(path)
+
+    def invalidate(self, path) -> None:
+        self._entries.pop(Path(path), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -4,10 +4,8 @@ Validator for Word document XML files against XSD schemas.
 
 import random
 import re
-import tempfile
 import zipfile
 
-import defusedxml.minidom
 import lxml.etree
 
 from .base import BaseSchemaValidator
@@ -71,7 +69,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.documents.getroot(xml_file)
 
                 for elem in root.iter(f"{{{self.WORD_2006_NAMESPACE}}}t"):
                     if elem.text:
@@ -117,7 +115,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.documents.getroot(xml_file)
                 namespaces = {"w": self.WORD_2006_NAMESPACE}
 
                 for t_elem in root.xpath(".//w:del//w:t", namespaces=namespaces):
@@ -168,7 +166,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.documents.getroot(xml_file)
                 paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
                 count = len(paragraphs)
             except Exception as e:
@@ -184,15 +182,11 @@ class DOCXSchemaValidator(BaseSchemaValidator):
         count = 0
 
         try:
-            with tempfile.TemporaryDirectory() as temp_dir:
-                with zipfile.ZipFile(original, "r") as zip_ref:
-                    zip_ref.extractall(temp_dir)
+            with zipfile.ZipFile(original, "r") as zip_ref:
+                root = lxml.etree.fromstring(zip_ref.read("word/document.xml"))
 
-                doc_xml_path = temp_dir + "/word/document.xml"
-                root = lxml.etree.parse(doc_xml_path).getroot()
-
-                paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
-                count = len(paragraphs)
+            paragraphs = root.findall(f".//{{{self.WORD_2006_NAMESPACE}}}p")
+            count = len(paragraphs)
 
         except Exception as e:
             print(f"Error counting paragraphs in original document: {e}")
@@ -207,7 +201,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                 continue
 
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.documents.getroot(xml_file)
                 namespaces = {"w": self.WORD_2006_NAMESPACE}
 
                 invalid_elements = root.xpath(
@@ -258,7 +252,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
         for xml_file in self.xml_files:
             try:
-                for elem in lxml.etree.parse(str(xml_file)).iter():
+                for elem in self.documents.parse(xml_file).iter():
                     if val := elem.get(para_id_attr):
                         if self._parse_id_value(val, base=16) >= 0x80000000:
                             errors.append(
@@ -312,7 +306,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
             return True
 
         try:
-            doc_root = lxml.etree.parse(str(document_xml)).getroot()
+            doc_root = self.documents.getroot(document_xml)
             namespaces = {"w": self.WORD_2006_NAMESPACE}
 
             range_starts = {
@@ -352,7 +346,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
 
             comment_ids = set()
             if comments_xml and comments_xml.exists():
-                comments_root = lxml.etree.parse(str(comments_xml)).getroot()
+                comments_root = self.documents.getroot(comments_xml)
                 comment_ids = {
                     elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
                     for elem in comments_root.xpath(
@@ -391,17 +385,18 @@ class DOCXSchemaValidator(BaseSchemaValidator):
     def repair_durableId(self) -> int:
         repairs = 0
 
+        durable_id_attr = f"{{{self.W16CID_NAMESPACE}}}durableId"
+
         for xml_file in self.xml_files:
             try:
-                content = xml_file.read_text(encoding="utf-8")
-                dom = defusedxml.minidom.parseString(content)
+                tree = self.documents.parse(xml_file)
                 modified = False
 
-                for elem in dom.getElementsByTagName("*"):
-                    if not elem.hasAttribute("w16cid:durableId"):
+                for elem in tree.getroot().iter(lxml.etree.Element):
+                    durable_id = elem.get(durable_id_attr)
+                    if durable_id is None:
                         continue
 
-                    durable_id = elem.getAttribute("w16cid:durableId")
                     needs_repair = False
 
                     if xml_file.name == "numbering.xml":
@@ -426,7 +421,7 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                         else:
                             new_id = f"{value:08X}"  
 
-                        elem.setAttribute("w16cid:durableId", new_id)
+                        elem.set(durable_id_attr, new_id)
                         print(
                             f"  Repaired: {xml_file.name}: durableId {durable_id} → {new_id}"
                         )
@@ -434,10 +429,10 @@ class DOCXSchemaValidator(BaseSchemaValidator):
                         modified = True
 
                 if modified:
-                    xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+                    self.documents.write(xml_file, tree)
 
             except Exception:
-                pass
+                self.documents.invalidate(xml_file)
 
         return repairs
 
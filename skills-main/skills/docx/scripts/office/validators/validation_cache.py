@@ -0,0 +1,88 @@
+"""
+Persistent cache of per-part XSD validation results.
+"""
+
+import hashlib
+import json
+import sqlite3
+from functools import lru_cache
+from pathlib import Path
+
+import lxml.etree
+
+# Bump when the preprocessing in _validate_single_file_xsd changes its results.
+CACHE_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def schemas_fingerprint(schemas_dir) -> str:
+    """Changes whenever a schema file, lxml/libxml2 or CACHE_VERSION changes."""
+    digest = hashlib.sha1(
+        f"{CACHE_VERSION}:{lxml.etree.LXML_VERSION}:{lxml.etree.LIBXML_VERSION}".encode()
+    )
+    for xsd in sorted(Path(schemas_dir).rglob("*.xsd")):
+        digest.update(xsd.relative_to(schemas_dir).as_posix().encode())
+        digest.update(xsd.read_bytes())
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """XSD results keyed by part content, part path, schema and schema fingerprint.
+
+    The same entries serve the edited part and the original document's baseline, so
+    after a small edit pack.py only re-validates the parts whose bytes changed. The
+    cache is best-effort: any SQLite error (locked, unwritable, corrupt) is a miss.
+    Callers keep it in a directory only the current user can write (pack.py uses
+    helpers.incremental.private_cache_dir), since a planted entry would hide errors.
+    SQLite keeps concurrent use from XSD worker processes safe.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._connection = None
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, content: bytes, relative_path, schema_path, schemas_dir, validator) -> str:
+        digest = hashlib.sha256(content)
+        for part in (
+            Path(relative_path).as_posix(),
+            Path(schema_path).relative_to(schemas_dir).as_posix(),
+            schemas_fingerprint(schemas_dir),
+            type(validator).__name__,
+        ):
+            digest.update(b"\0" + part.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key):
+        try:
+            row = self._connect().execute(
+                "SELECT valid, errors FROM xsd_results WHERE key = ?", (key,)
+            ).fetchone()
+        except (sqlite3.Error, OSError):
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return bool(row[0]), set(json.loads(row[1]))
+
+    def put(self, key, is_valid, errors) -> None:
+        try:
+            with self._connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO xsd_results (key, valid, errors) VALUES (?, ?, ?)",
+                    (key, int(is_valid), json.dumps(sorted(errors))),
+                )
+        except (sqlite3.Error, OSError):
+            pass
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=30)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS xsd_results "
+                "(key TEXT PRIMARY KEY, valid INTEGER NOT NULL, errors TEXT NOT NULL)"
+            )
+        return self._connection
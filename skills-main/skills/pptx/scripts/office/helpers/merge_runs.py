@@ -6,20 +6,34 @@ Works on runs in paragraphs and inside tracked changes (<w:ins>, <w:del>).
 Also:
 - Removes rsid attributes from runs (revision metadata that doesn't affect rendering)
 - Removes proofErr elements (spell/grammar markers that block merging)
+
+With xml_engine="lxml" all of this happens in one iterative traversal plus one walk
+over each run container's children, instead of a recursive search per step.
 """
 
 from pathlib import Path
 
 import defusedxml.minidom
+import lxml.etree
+
+from .xml_format import parse_xml_bytes, remove_keeping_tail, serialize_xml
 
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
 
-def merge_runs(input_dir: str) -> tuple[int, str]:
+
+def merge_runs(input_dir: str, xml_engine: str = "minidom") -> tuple[int, str]:
     doc_xml = Path(input_dir) / "word" / "document.xml"
 
     if not doc_xml.exists():
         return 0, f"Error: {doc_xml} not found"
 
     try:
+        if xml_engine == "lxml":
+            tree = parse_xml_bytes(doc_xml.read_bytes())
+            merge_count = _merge_runs_lxml(tree.getroot())
+            doc_xml.write_bytes(serialize_xml(tree))
+            return merge_count, f"Merged {merge_count} runs"
+
         dom = defusedxml.minidom.parseString(doc_xml.read_text(encoding="utf-8"))
         root = dom.documentElement
 
@@ -197,3 +211,112 @@ def _consolidate_text(run):
                 prev.removeAttribute("xml:space")
 
             run.removeChild(curr)
+
+
+# lxml engine. Names are matched by local name in any namespace, like the minidom
+# helpers above; comments between elements are skipped the same way.
+
+
+def _local(tag) -> str:
+    return tag.rpartition("}")[2] if isinstance(tag, str) else ""
+
+
+def _merge_runs_lxml(root) -> int:
+    proof_errors = []
+    containers = {}
+
+    for elem in root.iter(lxml.etree.Element):
+        name = _local(elem.tag)
+        if name == "proofErr":
+            proof_errors.append(elem)
+        elif name == "r":
+            for attr in [a for a in elem.attrib if "rsid" in _local(a).lower()]:
+                del elem.attrib[attr]
+            parent = elem.getparent()
+            if parent is not None:
+                containers[parent] = None
+
+    for elem in proof_errors:
+        remove_keeping_tail(elem)
+
+    return sum(_merge_container_lxml(container) for container in containers)
+
+
+def _merge_container_lxml(container) -> int:
+    merge_count = 0
+    run = run_props = None
+
+    for child in list(container):
+        if not isinstance(child.tag, str):
+            continue
+        if _local(child.tag) != "r":
+            if run is not None:
+                _consolidate_text_lxml(run)
+            run = None
+            continue
+
+        props = _run_props_lxml(child)
+        if run is not None and props == run_props:
+            for node in list(child):
+                if isinstance(node.tag, str) and _local(node.tag) != "rPr":
+                    node.tail = None
+                    run.append(node)
+            remove_keeping_tail(child)
+            merge_count += 1
+        else:
+            if run is not None:
+                _consolidate_text_lxml(run)
+            run, run_props = child, props
+
+    if run is not None:
+        _consolidate_text_lxml(run)
+    return merge_count
+
+
+def _run_props_lxml(run) -> bytes | None:
+    for child in run:
+        if _local(child.tag) == "rPr":
+            return lxml.etree.tostring(child, with_tail=False)
+    return None
+
+
+def _consolidate_text_lxml(run):
+    groups = []
+    previous = None
+    for child in run:
+        if _local(child.tag) != "t":
+            continue
+        if previous is not None and _is_adjacent_lxml(previous, child):
+            groups[-1].append(child)
+        else:
+            groups.append([child])
+        previous = child
+
+    for group in groups:
+        if len(group) < 2:
+            continue
+        first = group[0]
+        merged = "".join(t.text or "" for t in group)
+        first.text = merged
+
+        if merged.startswith(" ") or merged.endswith(" "):
+            first.set(XML_SPACE, "preserve")
+        elif XML_SPACE in first.attrib:
+            del first.attrib[XML_SPACE]
+
+        for t in group[1:]:
+            remove_keeping_tail(t)
+
+
+def _is_adjacent_lxml(elem1, elem2) -> bool:
+    node = elem1
+    while True:
+        if node.tail and node.tail.strip():
+            return False
+        node = node.getnext()
+        if node is None:
+            return False
+        if node is elem2:
+            return True
+        if isinstance(node.tag, str):
+            return False
@@ -8,24 +8,49 @@ Rules:
 - Only merges w:ins with w:ins, w:del with w:del (same element type)
 - Only merges if same author (ignores timestamp differences)
 - Only merges if truly adjacent (only whitespace between them)
+
+With xml_engine="lxml" one iterative traversal finds the containers and counts the
+tracked changes per author. Either engine returns the counts of the simplified
+document; unpack.py records them so that infer_author does not have to parse the
+original document again.
 """
 
-import xml.etree.ElementTree as ET
 import zipfile
 from pathlib import Path
 
 import defusedxml.minidom
+import lxml.etree
+
+from .incremental import read_manifest, unchanged_parts
+from .xml_format import parse_xml_bytes, remove_keeping_tail, serialize_xml
 
 WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+TRACKED_CHANGE_TAGS = (f"{{{WORD_NS}}}ins", f"{{{WORD_NS}}}del")
+AUTHOR_ATTR = f"{{{WORD_NS}}}author"
+
+
+def simplify_redlines(input_dir: str, xml_engine: str = "minidom") -> tuple[int, str]:
+    merge_count, _, message = simplify_and_count_redlines(input_dir, xml_engine)
+    return merge_count, message
 
 
-def simplify_redlines(input_dir: str) -> tuple[int, str]:
+def simplify_and_count_redlines(
+    input_dir: str, xml_engine: str = "minidom"
+) -> tuple[int, dict[str, int] | None, str]:
+    """simplify_redlines, also returning the tracked changes per author of the
+    simplified document (None on error)."""
     doc_xml = Path(input_dir) / "word" / "document.xml"
 
     if not doc_xml.exists():
-        return 0, f"Error: {doc_xml} not found"
+        return 0, None, f"Error: {doc_xml} not found"
 
     try:
+        if xml_engine == "lxml":
+            tree = parse_xml_bytes(doc_xml.read_bytes())
+            merge_count, authors = _simplify_redlines_lxml(tree.getroot())
+            doc_xml.write_bytes(serialize_xml(tree))
+            return merge_count, authors, f"Simplified {merge_count} tracked changes"
+
         dom = defusedxml.minidom.parseString(doc_xml.read_text(encoding="utf-8"))
         root = dom.documentElement
 
@@ -38,10 +63,11 @@ def simplify_redlines(input_dir: str) -> tuple[int, str]:
             merge_count += _merge_tracked_changes_in(container, "del")
 
         doc_xml.write_bytes(dom.toxml(encoding="UTF-8"))
-        return merge_count, f"Simplified {merge_count} tracked changes"
+        authors = _count_authors_dom(dom)
+        return merge_count, authors, f"Simplified {merge_count} tracked changes"
 
     except Exception as e:
-        return 0, f"Error: {e}"
+        return 0, None, f"Error: {e}"
 
 
 def _merge_tracked_changes_in(container, tag: str) -> int:
@@ -108,6 +134,16 @@ def _merge_tracked_content(target, source):
         target.appendChild(child)
 
 
+def _count_authors_dom(dom) -> dict[str, int]:
+    authors: dict[str, int] = {}
+    for tag in ("ins", "del"):
+        for elem in dom.getElementsByTagNameNS(WORD_NS, tag):
+            author = elem.getAttributeNS(WORD_NS, "author")
+            if author:
+                authors[author] = authors.get(author, 0) + 1
+    return authors
+
+
 def _find_elements(root, tag: str) -> list:
     results = []
 
@@ -123,60 +159,157 @@ def _find_elements(root, tag: str) -> list:
     return results
 
 
-def get_tracked_change_authors(doc_xml_path: Path) -> dict[str, int]:
-    if not doc_xml_path.exists():
-        return {}
+# lxml engine. Containers and tracked changes are matched by local name in any
+# namespace, like the minidom helpers above; only w:author is counted.
 
-    try:
-        tree = ET.parse(doc_xml_path)
-        root = tree.getroot()
-    except ET.ParseError:
-        return {}
 
-    namespaces = {"w": WORD_NS}
-    author_attr = f"{{{WORD_NS}}}author"
+def _local(tag) -> str:
+    return tag.rpartition("}")[2] if isinstance(tag, str) else ""
+
 
+def _simplify_redlines_lxml(root) -> tuple[int, dict[str, int]]:
+    paragraphs, cells = [], []
     authors: dict[str, int] = {}
-    for tag in ["ins", "del"]:
-        for elem in root.findall(f".//w:{tag}", namespaces):
-            author = elem.get(author_attr)
+
+    for elem in root.iter(lxml.etree.Element):
+        name = _local(elem.tag)
+        if name == "p":
+            paragraphs.append(elem)
+        elif name == "tc":
+            cells.append(elem)
+        elif elem.tag in TRACKED_CHANGE_TAGS:
+            author = elem.get(AUTHOR_ATTR)
             if author:
                 authors[author] = authors.get(author, 0) + 1
 
+    merge_count = 0
+    for container in paragraphs + cells:
+        for tag in ("ins", "del"):
+            merge_count += _merge_tracked_changes_lxml(container, tag, authors)
+
+    return merge_count, {author: count for author, count in authors.items() if count}
+
+
+def _merge_tracked_changes_lxml(container, tag: str, authors: dict[str, int]) -> int:
+    merge_count = 0
+    curr = None
+
+    for elem in [child for child in container if _local(child.tag) == tag]:
+        if curr is not None and _can_merge_tracked_lxml(curr, elem):
+            _merge_tracked_content_lxml(curr, elem)
+            remove_keeping_tail(elem)
+            merge_count += 1
+            author = elem.get(AUTHOR_ATTR) if elem.tag in TRACKED_CHANGE_TAGS else None
+            if author:
+                authors[author] -= 1
+        else:
+            curr = elem
+
+    return merge_count
+
+
+def _get_author_lxml(elem) -> str:
+    author = elem.get(AUTHOR_ATTR)
+    if not author:
+        for name, value in elem.attrib.items():
+            if _local(name) == "author":
+                return value
+    return author or ""
+
+
+def _can_merge_tracked_lxml(elem1, elem2) -> bool:
+    if _get_author_lxml(elem1) != _get_author_lxml(elem2):
+        return False
+
+    node = elem1
+    while True:
+        if node.tail and node.tail.strip():
+            return False
+        node = node.getnext()
+        if node is None or node is elem2:
+            return True
+        if isinstance(node.tag, str):
+            return False
+
+
+def _merge_tracked_content_lxml(target, source):
+    if source.text:
+        if len(target):
+            target[-1].tail = (target[-1].tail or "") + source.text
+        else:
+            target.text = (target.text or "") + source.text
+    for child in list(source):
+        target.append(child)
+
+
+def _count_authors(root) -> dict[str, int]:
+    authors: dict[str, int] = {}
+    for elem in root.iter(*TRACKED_CHANGE_TAGS):
+        author = elem.get(AUTHOR_ATTR)
+        if author:
+            authors[author] = authors.get(author, 0) + 1
     return authors
 
 
+def get_tracked_change_authors(doc_xml_path: Path) -> dict[str, int]:
+    if not doc_xml_path.exists():
+        return {}
+
+    try:
+        root = parse_xml_bytes(doc_xml_path.read_bytes()).getroot()
+    except lxml.etree.XMLSyntaxError:
+        return {}
+
+    return _count_authors(root)
+
+
 def _get_authors_from_docx(docx_path: Path) -> dict[str, int]:
     try:
         with zipfile.ZipFile(docx_path, "r") as zf:
             if "word/document.xml" not in zf.namelist():
                 return {}
-            with zf.open("word/document.xml") as f:
-                tree = ET.parse(f)
-                root = tree.getroot()
-
-                namespaces = {"w": WORD_NS}
-                author_attr = f"{{{WORD_NS}}}author"
-
-                authors: dict[str, int] = {}
-                for tag in ["ins", "del"]:
-                    for elem in root.findall(f".//w:{tag}", namespaces):
-                        author = elem.get(author_attr)
-                        if author:
-                            authors[author] = authors.get(author, 0) + 1
-                return authors
-    except (zipfile.BadZipFile, ET.ParseError):
+            root = parse_xml_bytes(zf.read("word/document.xml")).getroot()
+            return _count_authors(root)
+    except (zipfile.BadZipFile, lxml.etree.XMLSyntaxError):
         return {}
 
 
+def _recorded_authors(
+    modified_dir: Path, original_docx: Path
+) -> tuple[dict[str, int] | None, bool]:
+    """Counts unpack.py recorded when it simplified ``original_docx`` into
+    ``modified_dir`` (None if it did not), and whether word/document.xml is unchanged."""
+    manifest = read_manifest(modified_dir)
+    authors = manifest.get("tracked_change_authors")
+    entry = manifest.get("parts", {}).get("word/document.xml")
+    if authors is None or entry is None:
+        return None, False
+
+    doc_xml = modified_dir / "word" / "document.xml"
+    try:
+        with zipfile.ZipFile(original_docx, "r") as zf:
+            info = zf.getinfo("word/document.xml")
+            if (info.CRC, info.file_size) != (entry["source_crc"], entry["source_size"]):
+                return None, False
+            return authors, doc_xml.is_file() and bool(unchanged_parts(modified_dir, [doc_xml], zf))
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None, False
+
+
 def infer_author(modified_dir: Path, original_docx: Path, default: str = "Claude") -> str:
+    modified_dir = Path(modified_dir)
+    original_authors, unchanged = _recorded_authors(modified_dir, original_docx)
+    if unchanged:
+        return default
+
     modified_xml = modified_dir / "word" / "document.xml"
     modified_authors = get_tracked_change_authors(modified_xml)
 
     if not modified_authors:
         return default
 
-    original_authors = _get_authors_from_docx(original_docx)
+    if original_authors is None:
+        original_authors = _get_authors_from_docx(original_docx)
 
     new_changes: dict[str, int] = {}
     for author, count in modified_authors.items():
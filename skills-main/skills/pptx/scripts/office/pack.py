@@ -1,25 +1,52 @@
 """Pack a directory into a DOCX, PPTX, or XLSX file.
 
 Validates with auto-repair, condenses XML formatting, and creates the Office file.
+Parts are streamed straight into the archive: condensed XML from memory, everything
+else from the input directory (no temporary copy of the tree). With --original and
+--incremental true, parts left untouched since unpack.py --incremental true are copied
+from the original archive without being recompressed (except parts unpack.py itself
+rewrote, such as merged runs), and XSD results for parts validated in an earlier run
+are reused.
 
 Usage:
     python pack.py <input_directory> <output_file> [--original <file>] [--validate true|false]
+                   [--xml-engine minidom|lxml] [--workers N] [--incremental true|false]
 
 Examples:
     python pack.py unpacked/ output.docx --original input.docx
     python pack.py unpacked/ output.pptx --validate false
+    python pack.py unpacked/ output.docx --xml-engine lxml
+    python pack.py unpacked/ output.pptx --workers 0
+    python pack.py unpacked/ output.pptx --original input.pptx --incremental true
 """
 
 import argparse
+import os
 import sys
-import shutil
-import tempfile
 import zipfile
 from pathlib import Path
 
 import defusedxml.minidom
 
-from validators import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from helpers.incremental import (
+    copy_compressed,
+    private_cache_dir,
+    raw_copy_supported,
+    reusable_parts,
+)
+from helpers.parallel import resolve_workers, run_per_part
+from helpers.xml_format import XML_ENGINES, condense_xml_bytes
+from validators import (
+    DOCXSchemaValidator,
+    PPTXSchemaValidator,
+    RedliningValidator,
+    ValidationCache,
+)
+
+# Media that is already compressed; deflating it again costs time and saves nothing.
+STORED_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".wdp", ".mp3", ".m4a", ".mp4", ".m4v", ".mov", ".wmv", ".avi",
+}
 
 def pack(
     input_directory: str,
@@ -27,6 +54,9 @@ def pack(
     original_file: str | None = None,
     validate: bool = True,
     infer_author_func=None,
+    xml_engine: str = "minidom",
+    workers: int = 1,
+    incremental: bool = False,
 ) -> tuple[None, str]:
     input_dir = Path(input_directory)
     output_path = Path(output_file)
@@ -38,32 +68,86 @@ def pack(
     if suffix not in {".docx", ".pptx", ".xlsx"}:
         return None, f"Error: {output_file} must be a .docx, .pptx, or .xlsx file"
 
+    if xml_engine not in XML_ENGINES:
+        return None, f"Error: xml_engine must be one of {', '.join(XML_ENGINES)}"
+
+    try:
+        workers = resolve_workers(workers)
+    except ValueError as e:
+        return None, f"Error: {e}"
+
     if validate and original_file:
         original_path = Path(original_file)
         if original_path.exists():
             success, output = _run_validation(
-                input_dir, original_path, suffix, infer_author_func
+                input_dir,
+                original_path,
+                suffix,
+                infer_author_func,
+                workers,
+                _validation_cache() if incremental else None,
             )
             if output:
                 print(output)
             if not success:
                 return None, f"Error: Validation failed for {input_dir}"
 
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
+    files = _archive_order(f for f in input_dir.rglob("*") if f.is_file())
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if incremental and original_file and not raw_copy_supported():
+        print(
+            f"Warning: copying parts is not supported on Python {sys.version.split()[0]}; "
+            "recompressing all parts.",
+            file=sys.stderr,
+        )
+    elif incremental and original_file and Path(original_file).is_file():
+        with open(original_file, "rb") as source, zipfile.ZipFile(source) as original:
+            reuse = reusable_parts(input_dir, files, original)
+            if reuse:
+                # The original may be the output file itself: build next to it, then swap.
+                temp_path = output_path.with_name(f".{output_path.name}.tmp")
+                try:
+                    _write_archive(input_dir, files, temp_path, xml_engine, workers, reuse, source)
+                    os.replace(temp_path, output_path)
+                finally:
+                    temp_path.unlink(missing_ok=True)
+                return None, (
+                    f"Successfully packed {input_dir} to {output_file} "
+                    f"({len(files) - len(reuse)} of {len(files)} parts re-encoded)"
+                )
+
+    _write_archive(input_dir, files, output_path, xml_engine, workers)
+    return None, f"Successfully packed {input_dir} to {output_file}"
 
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                _condense_xml(xml_file)
 
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
+def _write_archive(
+    input_dir: Path,
+    files: list[Path],
+    output_path: Path,
+    xml_engine: str,
+    workers: int,
+    reuse: dict[Path, zipfile.ZipInfo] | None = None,
+    source=None,
+) -> None:
+    reuse = reuse or {}
+    xml_files = [
+        f for f in files if f.name.endswith((".xml", ".rels")) and f not in reuse
+    ]
+    condensed = dict(
+        zip(xml_files, run_per_part(_condense_xml_bytes, xml_files, workers, xml_engine))
+    )
 
-    return None, f"Successfully packed {input_dir} to {output_file}"
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for f in files:
+            arcname = f.relative_to(input_dir).as_posix()
+            if f in reuse:
+                copy_compressed(source, reuse[f], zf)
+            elif f in condensed:
+                zinfo = zipfile.ZipInfo.from_file(f, arcname)
+                zf.writestr(zinfo, condensed.pop(f), compress_type=zipfile.ZIP_DEFLATED)
+            else:
+                zf.write(f, arcname, compress_type=_compress_type(f))
 
 
 def _run_validation(
@@ -71,6 +155,8 @@ def _run_validation(
     original_file: Path,
     suffix: str,
     infer_author_func=None,
+    workers: int = 1,
+    validation_cache: ValidationCache | None = None,
 ) -> tuple[bool, str | None]:
     output_lines = []
     validators = []
@@ -84,11 +170,23 @@ def _run_validation(
                 print(f"Warning: {e} Using default author 'Claude'.", file=sys.stderr)
 
         validators = [
-            DOCXSchemaValidator(unpacked_dir, original_file),
+            DOCXSchemaValidator(
+                unpacked_dir,
+                original_file,
+                workers=workers,
+                validation_cache=validation_cache,
+            ),
             RedliningValidator(unpacked_dir, original_file, author=author),
         ]
     elif suffix == ".pptx":
-        validators = [PPTXSchemaValidator(unpacked_dir, original_file)]
+        validators = [
+            PPTXSchemaValidator(
+                unpacked_dir,
+                original_file,
+                workers=workers,
+                validation_cache=validation_cache,
+            )
+        ]
 
     if not validators:
         return True, None
@@ -105,7 +203,36 @@ def _run_validation(
     return success, "\n".join(output_lines) if output_lines else None
 
 
-def _condense_xml(xml_file: Path) -> None:
+def _validation_cache() -> ValidationCache | None:
+    try:
+        return ValidationCache(private_cache_dir() / "validation-cache.sqlite3")
+    except OSError:
+        return None
+
+
+def _archive_order(files) -> list[Path]:
+    # [Content_Types].xml first, as Office writes it
+    return sorted(files, key=lambda f: f.name != "[Content_Types].xml")
+
+
+def _compress_type(path: Path) -> int:
+    if path.suffix.lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _condense_xml(xml_file: Path, xml_engine: str = "minidom") -> None:
+    xml_file.write_bytes(_condense_xml_bytes(xml_file, xml_engine))
+
+
+def _condense_xml_bytes(xml_file: Path, xml_engine: str = "minidom") -> bytes:
+    if xml_engine == "lxml":
+        try:
+            return condense_xml_bytes(xml_file.read_bytes())
+        except Exception as e:
+            print(f"ERROR: Failed to parse {xml_file.name}: {e}", file=sys.stderr)
+            raise
+
     try:
         with open(xml_file, encoding="utf-8") as f:
             dom = defusedxml.minidom.parse(f)
@@ -122,7 +249,7 @@ def _condense_xml(xml_file: Path) -> None:
                 ) or child.nodeType == child.COMMENT_NODE:
                     element.removeChild(child)
 
-        xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+        return dom.toxml(encoding="UTF-8")
     except Exception as e:
         print(f"ERROR: Failed to parse {xml_file.name}: {e}", file=sys.stderr)
         raise
@@ -145,6 +272,26 @@ if __name__ == "__main__":
         metavar="true|false",
         help="Run validation with auto-repair (default: true)",
     )
+    parser.add_argument(
+        "--xml-engine",
+        choices=XML_ENGINES,
+        default="minidom",
+        help="XML parser used to condense parts; lxml is much faster on large files (default: minidom)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to validate and condense parts in parallel; 0 = one per CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--incremental",
+        type=lambda x: x.lower() == "true",
+        default=False,
+        metavar="true|false",
+        help="Copy parts unchanged since unpack from --original without recompressing, and "
+        "reuse cached XSD results for parts validated before (default: false)",
+    )
     args = parser.parse_args()
 
     _, message = pack(
@@ -152,6 +299,9 @@ if __name__ == "__main__":
         args.output_file,
         original_file=args.original,
         validate=args.validate,
+        xml_engine=args.xml_engine,
+        workers=args.workers,
+        incremental=args.incremental,
     )
     print(message)
 
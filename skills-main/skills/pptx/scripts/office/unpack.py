@@ -1,9 +1,14 @@
 """Unpack Office files (DOCX, PPTX, XLSX) for editing.
 
-Extracts the ZIP archive, pretty-prints XML files, and optionally:
+Extracts the ZIP archive, pretty-prints XML files and escapes smart quotes (one
+read/write per part, optionally in a process pool), and optionally:
 - Merges adjacent runs with identical formatting (DOCX only)
 - Simplifies adjacent tracked changes from same author (DOCX only)
 
+With --incremental true, records a manifest of the unpacked parts so pack.py
+--original --incremental true can reuse the ones that are not edited afterwards
+(see helpers/incremental.py).
+
 Usage:
     python unpack.py <office_file> <output_dir> [options]
 
@@ -11,6 +16,9 @@ Examples:
     python unpack.py document.docx unpacked/
     python unpack.py presentation.pptx unpacked/
     python unpack.py document.docx unpacked/ --merge-runs false
+    python unpack.py presentation.pptx unpacked/ --xml-engine lxml
+    python unpack.py presentation.pptx unpacked/ --workers 0
+    python unpack.py document.docx unpacked/ --incremental true
 """
 
 import argparse
@@ -20,8 +28,11 @@ from pathlib import Path
 
 import defusedxml.minidom
 
+from helpers.incremental import write_manifest
 from helpers.merge_runs import merge_runs as do_merge_runs
-from helpers.simplify_redlines import simplify_redlines as do_simplify_redlines
+from helpers.parallel import resolve_workers, run_per_part
+from helpers.simplify_redlines import simplify_and_count_redlines
+from helpers.xml_format import XML_ENGINES, pretty_print_xml_bytes
 
 SMART_QUOTE_REPLACEMENTS = {
     "\u201c": "&#x201C;",  
@@ -36,6 +47,9 @@ def unpack(
     output_directory: str,
     merge_runs: bool = True,
     simplify_redlines: bool = True,
+    xml_engine: str = "minidom",
+    workers: int = 1,
+    incremental: bool = False,
 ) -> tuple[None, str]:
     input_path = Path(input_file)
     output_path = Path(output_directory)
@@ -47,6 +61,14 @@ def unpack(
     if suffix not in {".docx", ".pptx", ".xlsx"}:
         return None, f"Error: {input_file} must be a .docx, .pptx, or .xlsx file"
 
+    if xml_engine not in XML_ENGINES:
+        return None, f"Error: xml_engine must be one of {', '.join(XML_ENGINES)}"
+
+    try:
+        workers = resolve_workers(workers)
+    except ValueError as e:
+        return None, f"Error: {e}"
+
     try:
         output_path.mkdir(parents=True, exist_ok=True)
 
@@ -54,23 +76,40 @@ def unpack(
             zf.extractall(output_path)
 
         xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-        for xml_file in xml_files:
-            _pretty_print_xml(xml_file)
+
+        # merge_runs / simplify_redlines rewrite word/document.xml, which would turn
+        # the entities back into characters: escape it afterwards.
+        escape_later = []
+        if suffix == ".docx" and (merge_runs or simplify_redlines):
+            escape_later = [f for f in xml_files if f == output_path / "word" / "document.xml"]
+
+        run_per_part(_unpack_part, xml_files, workers, xml_engine, escape_later)
 
         message = f"Unpacked {input_file} ({len(xml_files)} XML files)"
+        tracked_change_authors = None
+        rewritten = []
 
         if suffix == ".docx":
+            simplify_count = merge_count = 0
             if simplify_redlines:
-                simplify_count, _ = do_simplify_redlines(str(output_path))
+                simplify_count, tracked_change_authors, _ = simplify_and_count_redlines(
+                    str(output_path), xml_engine
+                )
                 message += f", simplified {simplify_count} tracked changes"
 
             if merge_runs:
-                merge_count, _ = do_merge_runs(str(output_path))
+                merge_count, _ = do_merge_runs(str(output_path), xml_engine)
                 message += f", merged {merge_count} runs"
 
-        for xml_file in xml_files:
+            if simplify_count or merge_count:
+                rewritten.append("word/document.xml")
+
+        for xml_file in escape_later:
             _escape_smart_quotes(xml_file)
 
+        if incremental:
+            write_manifest(output_path, input_path, tracked_change_authors, rewritten)
+
         return None, message
 
     except zipfile.BadZipFile:
@@ -79,21 +118,40 @@ def unpack(
         return None, f"Error unpacking: {e}"
 
 
-def _pretty_print_xml(xml_file: Path) -> None:
+def _unpack_part(xml_file: Path, xml_engine: str, escape_later: list[Path]) -> None:
+    data = _pretty_print_bytes(xml_file.read_bytes(), xml_engine)
+    if xml_file not in escape_later:
+        data = _escape_smart_quotes_bytes(data)
+    xml_file.write_bytes(data)
+
+
+def _pretty_print_bytes(data: bytes, xml_engine: str = "minidom") -> bytes:
     try:
-        content = xml_file.read_text(encoding="utf-8")
-        dom = defusedxml.minidom.parseString(content)
-        xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="utf-8"))
+        if xml_engine == "lxml":
+            return pretty_print_xml_bytes(data)
+        dom = defusedxml.minidom.parseString(data.decode("utf-8"))
+        return dom.toprettyxml(indent="  ", encoding="utf-8")
     except Exception:
-        pass  
+        return data
+
+
+def _pretty_print_xml(xml_file: Path, xml_engine: str = "minidom") -> None:
+    xml_file.write_bytes(_pretty_print_bytes(xml_file.read_bytes(), xml_engine))
+
+
+def _escape_smart_quotes_bytes(data: bytes) -> bytes:
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data
+    for char, entity in SMART_QUOTE_REPLACEMENTS.items():
+        content = content.replace(char, entity)
+    return content.encode("utf-8")
 
 
 def _escape_smart_quotes(xml_file: Path) -> None:
     try:
-        content = xml_file.read_text(encoding="utf-8")
-        for char, entity in SMART_QUOTE_REPLACEMENTS.items():
-            content = content.replace(char, entity)
-        xml_file.write_text(content, encoding="utf-8")
+        xml_file.write_bytes(_escape_smart_quotes_bytes(xml_file.read_bytes()))
     except Exception:
         pass
 
@@ -118,6 +176,25 @@ if __name__ == "__main__":
         metavar="true|false",
         help="Merge adjacent tracked changes from same author (DOCX only, default: true)",
     )
+    parser.add_argument(
+        "--xml-engine",
+        choices=XML_ENGINES,
+        default="minidom",
+        help="XML parser used to pretty-print parts, merge runs and simplify redlines; lxml is much faster on large files (default: minidom)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to format parts in parallel; 0 = one per CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--incremental",
+        type=lambda x: x.lower() == "true",
+        default=False,
+        metavar="true|false",
+        help="Record a manifest so pack.py --incremental true can reuse untouched parts (default: false)",
+    )
     args = parser.parse_args()
 
     _, message = unpack(
@@ -125,6 +202,9 @@ if __name__ == "__main__":
         args.output_directory,
         merge_runs=args.merge_runs,
         simplify_redlines=args.simplify_redlines,
+        xml_engine=args.xml_engine,
+        workers=args.workers,
+        incremental=args.incremental,
     )
     print(message)
 
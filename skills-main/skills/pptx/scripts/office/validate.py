@@ -3,6 +3,7 @@ Command line tool to validate Office document XML files against XSD schemas and
 
 Usage:
     python validate.py <path> [--original <original_file>] [--auto-repair] [--author NAME]
+                       [--workers N]
 
 The first argument can be either:
 - An unpacked directory containing the Office document XML files
@@ -50,6 +51,12 @@ def main():
         default="Claude",
         help="Author name for redlining validation (default: Claude)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used for XSD validation; 0 = one per CPU (default: 1)",
+    )
     args = parser.parse_args()
 
     path = Path(args.path)
@@ -80,7 +87,9 @@ def main():
     match file_extension:
         case ".docx":
             validators = [
-                DOCXSchemaValidator(unpacked_dir, original_file, verbose=args.verbose),
+                DOCXSchemaValidator(
+                    unpacked_dir, original_file, verbose=args.verbose, workers=args.workers
+                ),
             ]
             if original_file:
                 validators.append(
@@ -88,7 +97,9 @@ def main():
                 )
         case ".pptx":
             validators = [
-                PPTXSchemaValidator(unpacked_dir, original_file, verbose=args.verbose),
+                PPTXSchemaValidator(
+                    unpacked_dir, original_file, verbose=args.verbose, workers=args.workers
+                ),
             ]
         case _:
             print(f"Error: Validation not supported for file type {file_extension}")
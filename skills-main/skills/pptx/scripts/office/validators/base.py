@@ -2,12 +2,62 @@
 Base validator with common validation logic for document files.
 """
 
+import io
+import os
 import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import defusedxml.minidom
 import lxml.etree
 
+from .document_cache import DocumentCache
+from .validation_cache import ValidationCache
+
+_SCHEMAS = {}
+
+
+def load_schema(schema_path) -> lxml.etree.XMLSchema:
+    """Compiled XSD (with its imports) for ``schema_path``, compiled once per process.
+
+    Compiling wml.xsd takes over 100 ms and pml.xsd/sml.xsd around 30 ms, almost all
+    of it in libxml2's schema compiler rather than in reading the files. Schemas that
+    fail to compile (e.g. opc-coreProperties.xsd, which refers to Dublin Core types
+    it does not import) are remembered too and re-raise the same error.
+    """
+    schema_path = Path(schema_path)
+    if schema_path not in _SCHEMAS:
+        try:
+            with open(schema_path, "rb") as xsd_file:
+                parser = lxml.etree.XMLParser()
+                xsd_doc = lxml.etree.parse(
+                    xsd_file, parser=parser, base_url=str(schema_path)
+                )
+                _SCHEMAS[schema_path] = lxml.etree.XMLSchema(xsd_doc)
+        except (OSError, lxml.etree.LxmlError) as e:
+            _SCHEMAS[schema_path] = e
+
+    schema = _SCHEMAS[schema_path]
+    if isinstance(schema, Exception):
+        raise schema
+    return schema
+
+
+_worker_validator = None
+
+
+def _init_xsd_worker(validator_class, unpacked_dir, original_file, cache_path):
+    global _worker_validator
+    _worker_validator = validator_class(
+        unpacked_dir,
+        original_file,
+        validation_cache=ValidationCache(cache_path) if cache_path else None,
+    )
+
+
+def _validate_file_in_worker(xml_file):
+    return _worker_validator.validate_file_against_xsd(xml_file, verbose=False)
+
 
 class BaseSchemaValidator:
 
@@ -91,10 +141,24 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file=None, verbose=False):
+    def __init__(
+        self,
+        unpacked_dir,
+        original_file=None,
+        verbose=False,
+        documents=None,
+        workers=1,
+        validation_cache=None,
+    ):
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file) if original_file else None
         self.verbose = verbose
+        # Processes for XSD validation; 0 = one per CPU
+        self.workers = workers
+        # Optional ValidationCache: reuse XSD results for parts seen in earlier runs
+        self.validation_cache = validation_cache
+        # Pass one DocumentCache to every validator of a run to parse each part once.
+        self.documents = documents if documents is not None else DocumentCache()
 
         self.schemas_dir = Path(__file__).parent.parent / "schemas"
 
@@ -114,29 +178,31 @@ class BaseSchemaValidator:
 
     def repair_whitespace_preservation(self) -> int:
         repairs = 0
+        xml_space = f"{{{self.XML_NAMESPACE}}}space"
 
         for xml_file in self.xml_files:
             try:
-                content = xml_file.read_text(encoding="utf-8")
-                dom = defusedxml.minidom.parseString(content)
+                tree = self.documents.parse(xml_file)
                 modified = False
 
-                for elem in dom.getElementsByTagName("*"):
-                    if elem.tagName.endswith(":t") and elem.firstChild:
-                        text = elem.firstChild.nodeValue
-                        if text and (text.startswith((' ', '\t')) or text.endswith((' ', '\t'))):
-                            if elem.getAttribute("xml:space") != "preserve":
-                                elem.setAttribute("xml:space", "preserve")
-                                text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
-                                print(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {elem.tagName}: {text_preview}")
-                                repairs += 1
-                                modified = True
+                for elem in tree.getroot().iter(lxml.etree.Element):
+                    if elem.prefix is None or lxml.etree.QName(elem).localname != "t":
+                        continue
+                    text = elem.text
+                    if text and (text.startswith((' ', '\t')) or text.endswith((' ', '\t'))):
+                        if elem.get(xml_space) != "preserve":
+                            elem.set(xml_space, "preserve")
+                            tag_name = f"{elem.prefix}:t"
+                            text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
+                            print(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {tag_name}: {text_preview}")
+                            repairs += 1
+                            modified = True
 
                 if modified:
-                    xml_file.write_bytes(dom.toxml(encoding="UTF-8"))
+                    self.documents.write(xml_file, tree)
 
             except Exception:
-                pass
+                self.documents.invalidate(xml_file)
 
         return repairs
 
@@ -145,7 +211,7 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                lxml.etree.parse(str(xml_file))
+                self.documents.parse(xml_file)
             except lxml.etree.XMLSyntaxError as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: "
@@ -172,7 +238,7 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.documents.getroot(xml_file)
                 declared = set(root.nsmap.keys()) - {None}  
 
                 for attr_val in [
@@ -202,16 +268,17 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.documents.getroot(xml_file)
                 file_ids = {}  
 
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
+                # Skip mc:AlternateContent subtrees (the tree is shared, so don't remove them)
+                in_alternate_content = set()
+                for elem in root.iter(f"{{{self.MC_NAMESPACE}}}AlternateContent"):
+                    in_alternate_content.update(elem.iter())
 
                 for elem in root.iter():
+                    if elem in in_alternate_content:
+                        continue
                     tag = (
                         elem.tag.split("}")[-1].lower()
                         if "}" in elem.tag
@@ -314,7 +381,7 @@ class BaseSchemaValidator:
 
         for rels_file in rels_files:
             try:
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self.documents.getroot(rels_file)
 
                 rels_dir = rels_file.parent
 
@@ -398,7 +465,7 @@ class BaseSchemaValidator:
                 continue
 
             try:
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self.documents.getroot(rels_file)
                 rid_to_type = {}
 
                 for rel in rels_root.findall(
@@ -418,7 +485,7 @@ class BaseSchemaValidator:
                         )
                         rid_to_type[rid] = type_name
 
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
+                xml_root = self.documents.getroot(xml_file)
 
                 r_ns = self.OFFICE_RELATIONSHIPS_NAMESPACE
                 rid_attrs_to_check = ["id", "embed", "link"]
@@ -498,7 +565,7 @@ class BaseSchemaValidator:
             return False
 
         try:
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self.documents.getroot(content_types_file)
             declared_parts = set()
             declared_extensions = set()
 
@@ -553,7 +620,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
+                    root_tag = self.documents.getroot(xml_file).tag
                     root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
 
                     if root_name in declarable_roots and path_str not in declared_parts:
@@ -599,9 +666,7 @@ class BaseSchemaValidator:
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
 
-        is_valid, current_errors = self._validate_single_file_xsd(
-            xml_file, unpacked_dir
-        )
+        is_valid, current_errors = self._xsd_result(xml_file)
 
         if is_valid is None:
             return None, set()  
@@ -622,7 +687,7 @@ class BaseSchemaValidator:
             if verbose:
                 relative_path = xml_file.relative_to(unpacked_dir)
                 print(f"FAILED - {relative_path}: {len(new_errors)} new error(s)")
-                for error in list(new_errors)[:3]:
+                for error in sorted(new_errors)[:3]:
                     truncated = error[:250] + "..." if len(error) > 250 else error
                     print(f"  - {truncated}")
             return False, new_errors
@@ -639,11 +704,11 @@ class BaseSchemaValidator:
         valid_count = 0
         skipped_count = 0
 
+        results = self._validate_files_against_xsd()
+
         for xml_file in self.xml_files:
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
+            is_valid, new_file_errors = results[xml_file]
 
             if is_valid is None:
                 skipped_count += 1
@@ -657,7 +722,7 @@ class BaseSchemaValidator:
                 continue
 
             new_errors.append(f"  {relative_path}: {len(new_file_errors)} new error(s)")
-            for error in list(new_file_errors)[:3]:  
+            for error in sorted(new_file_errors)[:3]:  
                 new_errors.append(
                     f"    - {error[:250]}..." if len(error) > 250 else f"    - {error}"
                 )
@@ -682,6 +747,37 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _validate_files_against_xsd(self):
+        """validate_file_against_xsd for every part, in a process pool if workers != 1.
+
+        Each worker builds its own validator (and so its own compiled schemas) once;
+        parts are handed out largest-first and results are keyed by file, so the report
+        is the same as in the serial path.
+        """
+        results = {xml_file: (None, set()) for xml_file in self.xml_files}
+        files = [f for f in self.xml_files if self._get_schema_path(f)]
+
+        workers = min(self.workers or os.cpu_count() or 1, len(files))
+        if workers <= 1:
+            for xml_file in files:
+                results[xml_file] = self.validate_file_against_xsd(xml_file, verbose=False)
+            return results
+
+        files.sort(key=lambda f: f.stat().st_size, reverse=True)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_xsd_worker,
+            initargs=(
+                type(self),
+                self.unpacked_dir,
+                self.original_file,
+                self.validation_cache.path if self.validation_cache else None,
+            ),
+        ) as pool:
+            for xml_file, result in zip(files, pool.map(_validate_file_in_worker, files)):
+                results[xml_file] = result
+        return results
+
     def _get_schema_path(self, xml_file):
         if xml_file.name in self.SCHEMA_MAPPINGS:
             return self.schemas_dir / self.SCHEMA_MAPPINGS[xml_file.name]
@@ -747,69 +843,101 @@ class BaseSchemaValidator:
 
         return xml_doc
 
-    def _validate_single_file_xsd(self, xml_file, base_path):
+    def _validate_single_file_xsd(self, xml_file, base_path, xml_doc=None):
         schema_path = self._get_schema_path(xml_file)
         if not schema_path:
             return None, None  
 
         try:
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            return self._xsd_errors(xml_file, schema_path, base_path, xml_doc)
+        except Exception as e:
+            return False, {str(e)}
 
+    def _xsd_errors(self, xml_file, schema_path, base_path, xml_doc=None):
+        schema = load_schema(schema_path)
+
+        if xml_doc is not None:
+            pass
+        elif xml_file.is_relative_to(self.unpacked_dir):
+            xml_doc = self.documents.parse(xml_file)
+        else:
             with open(xml_file, "r") as f:
                 xml_doc = lxml.etree.parse(f)
 
-            xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
-            xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
+        xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
+        xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
 
-            relative_path = xml_file.relative_to(base_path)
-            if (
-                relative_path.parts
-                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
-            ):
-                xml_doc = self._clean_ignorable_namespaces(xml_doc)
-
-            if schema.validate(xml_doc):
-                return True, set()
-            else:
-                errors = set()
-                for error in schema.error_log:
-                    errors.add(error.message)
-                return False, errors
+        relative_path = xml_file.relative_to(base_path)
+        if (
+            relative_path.parts
+            and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
+        ):
+            xml_doc = self._clean_ignorable_namespaces(xml_doc)
 
-        except Exception as e:
-            return False, {str(e)}
+        if schema.validate(xml_doc):
+            return True, set()
+        else:
+            errors = set()
+            for error in schema.error_log:
+                errors.add(error.message)
+            return False, errors
 
     def _get_original_file_errors(self, xml_file):
         if self.original_file is None:
             return set()
 
-        import tempfile
-        import zipfile
-
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
         relative_path = xml_file.relative_to(unpacked_dir)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
+        # Read just this part from the original instead of extracting the archive
+        with zipfile.ZipFile(self.original_file, "r") as zip_ref:
+            try:
+                content = zip_ref.read(relative_path.as_posix())
+            except KeyError:
+                return set()
 
-            original_xml_file = temp_path / relative_path
+        is_valid, errors = self._xsd_result(xml_file, content)
+        return errors if errors else set()
 
-            if not original_xml_file.exists():
-                return set()
+    def _xsd_result(self, xml_file, original_content=None):
+        """_validate_single_file_xsd for the unpacked part, or for the original's copy of
+        it when ``original_content`` is given, answered from the validation cache if possible."""
+        schema_path = self._get_schema_path(xml_file)
+        if not schema_path:
+            return None, None
+
+        key = None
+        if self.validation_cache is not None:
+            content = original_content
+            if content is None:
+                content = xml_file.read_bytes()
+            key = self.validation_cache.key(
+                content,
+                xml_file.relative_to(self.unpacked_dir),
+                schema_path,
+                self.schemas_dir,
+                self,
+            )
+            cached = self.validation_cache.get(key)
+            if cached is not None:
+                return cached
 
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
+        try:
+            original_doc = None
+            if original_content is not None:
+                original_doc = lxml.etree.parse(io.BytesIO(original_content))
+            result = self._xsd_errors(
+                xml_file, schema_path, self.unpacked_dir, xml_doc=original_doc
             )
-            return errors if errors else set()
+        except Exception as e:
+            # Reported like _validate_single_file_xsd does, but not cached: the error
+            # may be transient (OSError, MemoryError, ...)
+            return False, {str(e)}
+
+        if key is not None:
+            self.validation_cache.put(key, *result)
+        return result
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         warnings = []
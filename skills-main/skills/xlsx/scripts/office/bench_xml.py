@@ -0,0 +1,224 @@
+"""Benchmark the minidom and lxml XML engines of pack.py / unpack.py.
+
+Generates large synthetic DOCX, PPTX and XLSX files, then times the pretty-print
+pass (unpack) and the condense pass (pack) for every part with each engine. Every
+measurement runs in a fresh subprocess so that peak RSS is per engine. The outputs
+of both engines are also checked for equivalence (C14N) before timing.
+
+Usage:
+    python bench_xml.py [--scale N] [--kinds docx,pptx,xlsx] [--engines minidom,lxml]
+
+Examples:
+    python bench_xml.py                 # ~10 MB document.xml, 300 slides, 50k rows
+    python bench_xml.py --scale 4       # 4x larger
+    python bench_xml.py --engines lxml  # skip the slow minidom path
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+import lxml.etree
+
+from helpers.xml_format import XML_ENGINES
+
+_W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_A = (
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"'
+)
+_S = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">\n'
+    '  <Default Extension="xml" ContentType="application/xml"/>\n'
+    "</Types>\n"
+)
+_TEXT = "“Porosity” 18.2% – oil-bearing   interval"
+
+
+def _docx_parts(scale: int) -> dict[str, str]:
+    rows = []
+    for i in range(1500 * scale):
+        cells = "".join(
+            f"""
+      <w:tc>
+        <w:tcPr><w:tcW w:w="2000" w:type="dxa"/></w:tcPr>
+        <w:p>
+          <w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve"> {_TEXT} {i}.{c} </w:t></w:r>
+        </w:p>
+      </w:tc>"""
+            for c in range(6)
+        )
+        rows.append(f"\n    <!-- row {i} -->\n    <w:tr>{cells}\n    </w:tr>")
+    body = f'<w:tbl>{"".join(rows)}\n  </w:tbl>'
+    document = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:document {_W}>\n<w:body>\n  {body}\n</w:body>\n</w:document>\n'
+    return {"word/document.xml": document}
+
+
+def _pptx_parts(scale: int) -> dict[str, str]:
+    parts = {}
+    for n in range(1, 300 * scale + 1):
+        shapes = "".join(
+            f"""
+      <p:sp>
+        <p:txBody>
+          <a:p><a:r><a:rPr lang="en-US"/><a:t>{_TEXT} {n}.{k}</a:t></a:r></a:p>
+          <a:p><a:r><a:t xml:space="preserve">   </a:t></a:r></a:p>
+        </p:txBody>
+      </p:sp>"""
+            for k in range(20)
+        )
+        parts[f"ppt/slides/slide{n}.xml"] = (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<p:sld {_A}>\n  <p:cSld><p:spTree>{shapes}\n  </p:spTree></p:cSld>\n</p:sld>\n'
+        )
+    return parts
+
+
+def _xlsx_parts(scale: int) -> dict[str, str]:
+    rows = "".join(
+        f'\n    <row r="{r}">'
+        + "".join(f'<c r="{col}{r}" t="s"><v>{(r * 7 + i) % 500}</v></c>' for i, col in enumerate("ABCDEFGH"))
+        + "</row>"
+        for r in range(1, 50000 * scale + 1)
+    )
+    sheet = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet {_S}>\n  <sheetData>{rows}\n  </sheetData>\n</worksheet>\n'
+    strings = "".join(f"\n  <si><t>{_TEXT} {i}</t></si>" for i in range(500))
+    shared = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<sst {_S} count="500">{strings}\n</sst>\n'
+    return {"xl/worksheets/sheet1.xml": sheet, "xl/sharedStrings.xml": shared}
+
+
+GENERATORS = {"docx": _docx_parts, "pptx": _pptx_parts, "xlsx": _xlsx_parts}
+
+
+def make_office_file(kind: str, scale: int, target: Path) -> Path:
+    with zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        for name, xml in GENERATORS[kind](scale).items():
+            zf.writestr(name, xml)
+    return target
+
+
+def _xml_parts(directory: Path) -> list[Path]:
+    return list(directory.rglob("*.xml")) + list(directory.rglob("*.rels"))
+
+
+def _peak_rss_kb() -> int:
+    # ru_maxrss survives fork+exec and would report the parent's peak; VmHWM is per address space
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _run_pass(op: str, engine: str, directory: Path) -> dict:
+    """Runs inside the worker subprocess."""
+    import pack
+    import unpack
+
+    files = _xml_parts(directory)
+    start = time.perf_counter()
+    for xml_file in files:
+        if op == "pretty":
+            unpack._pretty_print_xml(xml_file, engine)
+        else:
+            pack._condense_xml(xml_file, engine)
+    elapsed = time.perf_counter() - start
+    return {"seconds": round(elapsed, 3), "peak_rss_mb": round(_peak_rss_kb() / 1024, 1)}
+
+
+def _measure(op: str, engine: str, directory: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, "--worker", op, engine, str(directory)],
+        cwd=Path(__file__).parent,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _canonical(xml_file: Path) -> bytes:
+    return lxml.etree.tostring(lxml.etree.parse(str(xml_file)), method="c14n")
+
+
+def _copy_parts(source: Path, target: Path) -> None:
+    for xml_file in _xml_parts(source):
+        dest = target / xml_file.relative_to(source)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_bytes(xml_file.read_bytes())
+
+
+def check_equivalence(extracted: Path, work: Path) -> list[str]:
+    """Both engines must produce the same document after pretty-print and after condense."""
+    import pack
+    import unpack
+
+    mismatches = []
+    outputs = {}
+    for engine in XML_ENGINES:
+        copy = work / f"check-{engine}"
+        _copy_parts(extracted, copy)
+        for xml_file in _xml_parts(copy):
+            unpack._pretty_print_xml(xml_file, engine)
+            pack._condense_xml(xml_file, engine)
+        outputs[engine] = copy
+    reference = outputs[XML_ENGINES[0]]
+    for xml_file in _xml_parts(reference):
+        rel = xml_file.relative_to(reference)
+        for engine in XML_ENGINES[1:]:
+            if _canonical(xml_file) != _canonical(outputs[engine] / rel):
+                mismatches.append(f"{rel} ({engine})")
+    return mismatches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark minidom vs lxml XML passes")
+    parser.add_argument("--scale", type=int, default=1, help="Size multiplier for synthetic files")
+    parser.add_argument("--kinds", default="docx,pptx,xlsx")
+    parser.add_argument("--engines", default=",".join(XML_ENGINES))
+    args = parser.parse_args()
+
+    engines = [e for e in args.engines.split(",") if e]
+    print(f"{'file':<6}{'part MB':>9}  {'pass':<10}{'engine':<9}{'seconds':>9}{'peak RSS MB':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_path = Path(tmp)
+        for kind in args.kinds.split(","):
+            office_file = make_office_file(kind, args.scale, tmp_path / f"synthetic.{kind}")
+            extracted = tmp_path / f"{kind}-extracted"
+            with zipfile.ZipFile(office_file) as zf:
+                zf.extractall(extracted)
+            size_mb = sum(p.stat().st_size for p in _xml_parts(extracted)) / 1e6
+
+            if set(XML_ENGINES) <= set(engines):
+                mismatches = check_equivalence(extracted, tmp_path / kind)
+                if mismatches:
+                    print(f"{kind}: engines disagree on {mismatches}")
+                    return 1
+
+            for engine in engines:
+                work = tmp_path / f"{kind}-{engine}"
+                _copy_parts(extracted, work)
+                for op in ("pretty", "condense"):
+                    result = _measure(op, engine, work)
+                    print(
+                        f"{kind:<6}{size_mb:>9.1f}  {op:<10}{engine:<9}"
+                        f"{result['seconds']:>9.2f}{result['peak_rss_mb']:>13.0f}"
+                    )
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        print(json.dumps(_run_pass(sys.argv[2], sys.argv[3], Path(sys.argv[4]))))
+        sys.exit(0)
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Reuse unchanged parts of the original archive when repacking.
+
+unpack.py --incremental true records a manifest of what it wrote for every part:
+size, mtime and SHA-256 of the file on disk, plus the CRC/size of the archive entry
+it came from. When pack.py is given the same original file, a part whose file still
+matches the manifest is copied into the new archive as the original compressed
+stream, without decompressing or recompressing it. Only parts that were edited (or
+repaired by the validators) are condensed and deflated again, as are parts whose
+content unpack itself changed (merged runs, simplified tracked changes): the
+original stream of those would undo the rewrite.
+
+Size + mtime is trusted like git's index does; the content hash is only computed
+for files whose stat changed. The manifest lives in a private per-user directory
+(see private_cache_dir) so it never shows up inside the unpacked tree (where validators would report it as an
+unreferenced part); losing it only disables reuse. It also keeps the tracked-change
+counts per author that simplify_redlines saw, for infer_author.
+
+copy_compressed appends raw entries through ZipFile internals that are only known
+to work on the CPython versions in RAW_COPY_VERSIONS; elsewhere pack.py falls back
+to recompressing every part.
+"""
+
+import getpass
+import hashlib
+import json
+import os
+import stat
+import struct
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+MANIFEST_VERSION = 2
+_CHUNK = 1 << 20
+
+# Oldest and newest minor versions whose ZipFile internals copy_compressed relies on.
+RAW_COPY_VERSIONS = ((3, 8), (3, 13))
+
+
+def private_cache_dir() -> Path:
+    """Per-user directory (mode 0700) in the temp directory for manifests and caches.
+
+    Raises OSError if the directory exists but is not a private directory of the
+    current user, so nobody else can plant manifests or cached results in it.
+    """
+    uid = os.getuid() if hasattr(os, "getuid") else None
+    path = Path(tempfile.gettempdir()) / f"office-{uid if uid is not None else getpass.getuser()}"
+    path.mkdir(mode=0o700, exist_ok=True)
+    if uid is not None:
+        st = path.lstat()
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != uid or st.st_mode & 0o077:
+            raise OSError(f"{path} is not a private directory of the current user")
+    return path
+
+
+def manifest_path(unpacked_dir: Path) -> Path:
+    key = hashlib.sha1(str(Path(unpacked_dir).resolve()).encode("utf-8")).hexdigest()
+    return private_cache_dir() / "unpack-manifests" / f"{key}.json"
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def raw_copy_supported() -> bool:
+    oldest, newest = RAW_COPY_VERSIONS
+    return sys.implementation.name == "cpython" and oldest <= sys.version_info[:2] <= newest
+
+
+def write_manifest(
+    unpacked_dir: Path,
+    source_file: Path,
+    tracked_change_authors: dict[str, int] | None = None,
+    rewritten: Iterable[str] = (),
+) -> None:
+    """Record the unpacked parts; ``rewritten`` names parts whose content unpack changed."""
+    rewritten = set(rewritten)
+    parts = {}
+    with zipfile.ZipFile(source_file) as zf:
+        for info in zf.infolist():
+            path = unpacked_dir / info.filename
+            if info.is_dir() or not path.is_file():
+                continue
+            stat = path.stat()
+            parts[info.filename] = {
+                "source_crc": info.CRC,
+                "source_size": info.file_size,
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_digest(path),
+                "rewritten": info.filename in rewritten,
+            }
+
+    try:
+        target = manifest_path(unpacked_dir)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {"version": MANIFEST_VERSION, "parts": parts}
+        if tracked_change_authors is not None:
+            manifest["tracked_change_authors"] = tracked_change_authors
+        target.write_text(json.dumps(manifest))
+    except OSError:
+        pass
+
+
+def read_manifest(unpacked_dir: Path) -> dict:
+    try:
+        manifest = json.loads(manifest_path(unpacked_dir).read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def unchanged_parts(
+    unpacked_dir: Path, files: list[Path], original: zipfile.ZipFile
+) -> dict[Path, zipfile.ZipInfo]:
+    """Files whose content is still what unpack.py produced from ``original``."""
+    entries = read_manifest(unpacked_dir).get("parts")
+    if not entries:
+        return {}
+
+    reuse = {}
+    for path in files:
+        arcname = path.relative_to(unpacked_dir).as_posix()
+        entry = entries.get(arcname)
+        try:
+            info = original.getinfo(arcname)
+        except KeyError:
+            continue
+        if (
+            entry is None
+            or info.flag_bits & 0x1  # encrypted
+            or (info.CRC, info.file_size) != (entry["source_crc"], entry["source_size"])
+        ):
+            continue
+        stat = path.stat()
+        if stat.st_size != entry["size"]:
+            continue
+        if stat.st_mtime_ns == entry["mtime_ns"] or file_digest(path) == entry["sha256"]:
+            reuse[path] = info
+    return reuse
+
+
+def reusable_parts(
+    unpacked_dir: Path, files: list[Path], original: zipfile.ZipFile
+) -> dict[Path, zipfile.ZipInfo]:
+    """Unchanged parts whose original compressed stream can be copied as-is."""
+    entries = read_manifest(unpacked_dir).get("parts") or {}
+    return {
+        path: info
+        for path, info in unchanged_parts(unpacked_dir, files, original).items()
+        if not entries[info.filename].get("rewritten")
+    }
+
+
+def copy_compressed(source: BinaryIO, info: zipfile.ZipInfo, target: zipfile.ZipFile) -> None:
+    """Append ``info``'s compressed bytes from ``source`` to ``target`` as-is.
+
+    Only call this when raw_copy_supported() is true.
+    """
+    source.seek(info.header_offset)
+    header = source.read(zipfile.sizeFileHeader)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    source.seek(info.header_offset + zipfile.sizeFileHeader + name_length + extra_length)
+
+    copied = zipfile.ZipInfo(info.filename, info.date_time)
+    copied.compress_type = info.compress_type
+    copied.CRC = info.CRC
+    copied.compress_size = info.compress_size
+    copied.file_size = info.file_size
+    copied.create_system = info.create_system
+    copied.external_attr = info.external_attr
+    copied.header_offset = target.fp.tell()
+
+    # Sizes and CRC go into the local header, so no data descriptor is needed.
+    target.fp.write(copied.FileHeader())
+    remaining = info.compress_size
+    while remaining:
+        chunk = source.read(min(remaining, _CHUNK))
+        if not chunk:
+            raise zipfile.BadZipFile(f"Truncated entry {info.filename}")
+        target.fp.write(chunk)
+        remaining -= len(chunk)
+
+    target.filelist.append(copied)
+    target.NameToInfo[copied.filename] = copied
+    target.start_dir = target.fp.tell()
+    target._didModify = True
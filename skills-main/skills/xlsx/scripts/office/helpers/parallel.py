@@ -0,0 +1,39 @@
+"""Per-part worker pool shared by pack.py and unpack.py.
+
+Each XML part is independent, so parts are handed to a process pool largest-first:
+the big parts (document.xml, sheet1.xml, ...) start immediately and the many small
+ones fill in around them, which keeps all workers busy until the end.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable
+
+
+def resolve_workers(workers: int) -> int:
+    """0 means one worker per CPU."""
+    if workers < 0:
+        raise ValueError("workers must be >= 0")
+    return workers or os.cpu_count() or 1
+
+
+def largest_first(files: Iterable[Path]) -> list[Path]:
+    return sorted(files, key=lambda f: f.stat().st_size, reverse=True)
+
+
+def run_per_part(func: Callable, files: list[Path], workers: int, *args) -> list:
+    """Call ``func(file, *args)`` for every file and return the results in input order.
+
+    With one worker (or a single file) this runs inline. ``func`` must be a
+    module-level function so it can be sent to worker processes; exceptions raised
+    in a worker propagate to the caller.
+    """
+    workers = min(resolve_workers(workers), len(files))
+    if workers <= 1:
+        return [func(f, *args) for f in files]
+
+    ordered = largest_first(files)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {f: pool.submit(func, f, *args) for f in ordered}
+        return [futures[f].result() for f in files]
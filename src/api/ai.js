@@ -56,3 +56,44 @@ export async function generateOpenReport(payload) {
   return resp.json();
 }
 
+
+/**
+ * 提交批量报告生成任务（后台执行，结果直接保存为报告）
+ * @param {object} payload { items: OpenReportRequest[] } 或 { template, variables: object[] }，可选 concurrency
+ * @returns {Promise<object>} BatchStatus，含 batch_id 与各条目进度
+ */
+export async function submitBatchOpenReport(payload) {
+  const resp = await fetch(`${API_BASE_URL}/ai/batch-open-report`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(payload),
+  });
+
+  if (!resp.ok) {
+    let detail = '';
+    try {
+      const data = await resp.json();
+      detail = data.detail || JSON.stringify(data);
+    } catch {
+      detail = await resp.text();
+    }
+    throw new Error(`批量生成接口调用失败 (${resp.status}): ${detail}`);
+  }
+
+  return resp.json();
+}
+
+/**
+ * 查询批量报告生成进度
+ * @param {string} batchId
+ * @returns {Promise<object>} BatchStatus
+ */
+export async function getBatchOpenReport(batchId) {
+  const resp = await fetch(`${API_BASE_URL}/ai/batch-open-report/${batchId}`);
+  if (!resp.ok) {
+    throw new Error(`批量任务查询失败 (${resp.status})`);
+  }
+  return resp.json();
+}
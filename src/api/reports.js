@@ -94,3 +94,43 @@ export async function getReport(id) {
   return resp.json();
 }
 
+
+/**
+ * 获取服务端渲染（已清洗）的报告 HTML，服务端按内容哈希缓存。
+ * 传入 known（已持有块的 hash 列表）并设置 partial 时，只返回发生变化的块的 html，用于增量刷新预览。
+ * @param {string} id
+ * @param {{partial?: boolean, known?: string[]}} [options]
+ */
+export async function getReportHtml(id, options = {}) {
+  const params = new URLSearchParams();
+  if (options.partial) params.set('partial', 'true');
+  for (const hash of options.known || []) params.append('known', hash);
+  const query = params.toString();
+  const resp = await fetch(
+    `${API_BASE_URL}/reports/${encodeURIComponent(id)}/html${query ? `?${query}` : ''}`,
+  );
+  if (!resp.ok) {
+    throw new Error(`获取报告预览失败 (${resp.status})`);
+  }
+  return resp.json();
+}
+
+// 渲染编辑中（未保存）的 Markdown，仅返回 known 之外的块的 html
+export async function renderMarkdownBlocks(content, known = []) {
+  const resp = await fetch(`${API_BASE_URL}/reports/render`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ content, known }),
+  });
+  if (!resp.ok) {
+    throw new Error(`渲染预览失败 (${resp.status})`);
+  }
+  return resp.json();
+}
+
+// 导出报告为 Word / PDF 的下载地址（服务端按内容缓存，未修改的报告重复导出立即返回）
+export function getReportExportUrl(id, format = 'docx') {
+  return `${API_BASE_URL}/reports/${encodeURIComponent(id)}/export?format=${encodeURIComponent(format)}`;
+}